@@ -5,7 +5,11 @@
 set design(FLOW_ROOT) $::env(FLOW_ROOT)
 
 set SET_LIBS     ../common/primetime/set_libs.tcl
-set REPORTS_PATH ./reports
+if {[info exists ::env(PWR_REPORTS_PATH)]} {
+    set REPORTS_PATH $::env(PWR_REPORTS_PATH)
+} else {
+    set REPORTS_PATH ./reports
+}
 # set CONSTRAINTS  $design(FLOW_ROOT)/implementation/synthesis/last_output/netlist.sdc
 
 # create reports folder
@@ -12,7 +12,20 @@ if [ $CPUS -gt $MAX_CPUS ]; then
     export CPUS=$MAX_CPUS
 fi
 
+# Power analysis tool (can be replaced by a stand-in for local testing)
+PWR_SHELL=${PWR_SHELL:-pwr_shell}
+
+# Accept VCD paths either absolute or relative to the repository root
+case "$1" in
+    /*) VCD_FILE=$1 ;;
+    *)  VCD_FILE=$FLOW_ROOT/$1 ;;
+esac
+
+# Reports (and the tool log) go to PWR_REPORTS_PATH if set, so that several
+# analyses can run concurrently
+LOG_DIR=${PWR_REPORTS_PATH:-.}
+
 # enter the build dir
 pushd $PWR_DIR
-pwr_shell -x "set FLOW_ROOT $FLOW_ROOT; set VCD_FILE $FLOW_ROOT/$1; set NETLIST $2; set SDF_FILE $3; set TOP_MODULE $4; set PWR_ANALYSIS_MODE $5" -file scripts/pwr_script.tcl -output_log_file pwr_shell_$4.log
+$PWR_SHELL -x "set FLOW_ROOT $FLOW_ROOT; set VCD_FILE $VCD_FILE; set NETLIST $2; set SDF_FILE $3; set TOP_MODULE $4; set PWR_ANALYSIS_MODE $5" -file scripts/pwr_script.tcl -output_log_file $LOG_DIR/pwr_shell_$4.log
 popd
@@ -98,6 +98,25 @@ if { $PERFORM_POWER == 1 } {
     set SCOPES "/ /u_core_v_mini_mcu /u_core_v_mini_mcu/ao_peripheral_subsystem_i /u_core_v_mini_mcu/peripheral_subsystem_i /u_core_v_mini_mcu/memory_subsystem_i /u_heepatia_bus /u_heepatia_peripherals /u_heepatia_peripherals/gen_carus_0__u_nm_carus_wrapper/u_carus_top /u_heepatia_peripherals/gen_caesar_0__u_nm_caesar_wrapper/u_caesar_top /u_heepatia_peripherals/u_cgra_top_wrapper"
     set SCOPE_NAMES "top core_v_mini_mcu ao_peripheral_subsystem peripheral_subsystem memory_subsystem heepatia_bus accel_peripherals carus_top caesar_top cgra_top"
 
+    # Add the blocks of the first instance of each NMC present in the design
+    # (rows used by scripts/performance-analysis/power_rollup.py)
+    set NMC_SCOPES [list \
+        /u_heepatia_peripherals/gen_carus_0__u_nm_carus_wrapper/u_carus_top/u_carus_ctl carus_ctl \
+        /u_heepatia_peripherals/gen_carus_0__u_nm_carus_wrapper/u_carus_top/u_vector_subsystem/u_vector_pipeline carus_vector \
+        /u_heepatia_peripherals/gen_carus_0__u_nm_carus_wrapper/u_carus_top/u_vector_subsystem/u_vrf carus_vrf \
+        /u_heepatia_peripherals/gen_caesar_0__u_nm_caesar_wrapper/u_caesar_top/IMCaesar_ctrl_Xi caesar_ctl \
+        /u_heepatia_peripherals/gen_caesar_0__u_nm_caesar_wrapper/u_caesar_top/alu_Xi caesar_alu \
+        /u_heepatia_peripherals/gen_caesar_0__u_nm_caesar_wrapper/u_caesar_top/MEM0 caesar_mem0 \
+        /u_heepatia_peripherals/gen_caesar_0__u_nm_caesar_wrapper/u_caesar_top/MEM1 caesar_mem1 \
+    ]
+    set_scope /
+    foreach {scope name} $NMC_SCOPES {
+        if {[sizeof_collection [get_cells -quiet [string trimleft $scope /]]] > 0} {
+            lappend SCOPES $scope
+            lappend SCOPE_NAMES $name
+        }
+    }
+
     # Dump report for each scope
     foreach scope $SCOPES name $SCOPE_NAMES {
         set_scope $scope
@@ -0,0 +1,264 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: adaptive_search.py
+# Date: 17/10/2026
+# Description: Adaptive search of the CPU/NM-Carus throughput crossover over a sweep
+
+import argparse
+import sys
+import os
+import csv
+import math
+import warnings
+import numpy as np
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import ConstantKernel, Matern, WhiteKernel
+from sklearn.exceptions import ConvergenceWarning
+import test_scheduler as ts
+from build_cache import build_cache
+from results_store import results_store
+from sim_model import verilator_model
+from sweep import sweep, load_sweeps, ELEM_SIZE
+
+class adaptive_search:
+    """Adaptive sampling of a sweep to find where NM-Carus stops beating the CPU.
+
+    The candidates are all the valid points of the sweep (its cartesian
+    product). A Gaussian process models log2(cycles_per_output) of the CPU
+    and of NM-Carus as a function of log2 of the kernel parameters and of the
+    element size; their difference is the predicted log2 speedup, which is
+    zero at the crossover. After an initial Latin-hypercube sample, each
+    batch is chosen with the straddle heuristic (z * sigma - |mu|), which
+    favours points whose outcome is both uncertain and close to the
+    crossover. Points of the same batch are selected one at a time, assuming
+    the previous ones were simulated at their predicted value. The search
+    stops when the budget is exhausted or when every candidate is classified
+    with confidence (negative straddle everywhere).
+    """
+
+    # Initialize search properties
+    def __init__(self, spec: dict, out_dir: str, budget: int = None, batch_size: int = 4, num_init: int = None, seed: int = 0, z: float = 1.96):
+        self.spec = spec
+        self.out_dir = out_dir
+        self.batch_size = batch_size
+        self.seed = seed
+        self.z = z
+
+        # Candidate points
+        space = sweep(dict(spec, sample=None))
+        self.params = {name: levels for name, levels in space.params.items()}
+        self.tests = list(space.get_tests())
+        self.points = list(space.points())
+        if not self.tests:
+            raise ValueError(f"{space.app}: empty design space")
+        self.index = {(dt, params): i for i, (_, dt, _, params) in enumerate(self.tests)}
+        self.X = self.get_features(self.points)
+        self.budget = budget if budget is not None else max(1, len(self.tests) // 10)
+        self.num_init = num_init if num_init is not None else max(2, min(self.budget // 2, 2 * self.X.shape[1] + 2))
+
+        # Search state
+        self.selected: list = []    # candidate indices, in simulation order
+        self.results: dict = {}     # candidate index -> {"cpu": cycles/output, "carus": cycles/output}
+        self.kernels: dict = {}
+
+        # Output files
+        self.tests_file = os.path.join(out_dir, "adaptive-tests.txt")
+        self.report_file = os.path.join(out_dir, "adaptive-throughput.csv")
+        self.predictions_file = os.path.join(out_dir, "adaptive-predictions.csv")
+
+    # Feature matrix of design points
+    def get_features(self, points: list) -> np.ndarray:
+        """Normalized log2 of the numeric parameters and of the element size."""
+        names = [n for n, levels in self.params.items() if n != "data_type" and len(levels) > 1]
+        X = np.array([[math.log2(ELEM_SIZE[p["data_type"]])] + [math.log2(p[n]) for n in names] for p in points], dtype=float)
+        span = X.max(axis=0) - X.min(axis=0)
+        span[span == 0] = 1.0
+        return (X - X.min(axis=0)) / span
+
+    # Initial design
+    def get_initial(self) -> list:
+        """Latin-hypercube sample of the design space."""
+        lhs = sweep(dict(self.spec, sample={"method": "lhs", "count": self.num_init, "seed": self.seed}))
+        return [self.index[(dt, params)] for _, dt, _, params in lhs.get_tests()]
+
+    # Fit the surrogate models and predict the log2 speedup of all the candidates
+    def predict(self, observed: list, targets: dict, fixed: bool = False) -> (np.ndarray, np.ndarray, dict):
+        """Predict the log2 speedup of NM-Carus over the CPU and its standard deviation.
+
+        'targets' maps each mode to the log2 cycles per output of the
+        'observed' candidates. If 'fixed', the kernels of the previous fit
+        are reused without optimizing their hyperparameters. Also return the
+        predicted log2 cycles per output of each mode.
+        """
+        var = np.zeros(len(self.tests))
+        means: dict = {}
+        for mode in ("cpu", "carus"):
+            if fixed:
+                gp = GaussianProcessRegressor(self.kernels[mode], optimizer=None, normalize_y=True)
+            else:
+                kernel = ConstantKernel(1.0) * Matern(length_scale=np.ones(self.X.shape[1]), length_scale_bounds=(1e-2, 1e2), nu=2.5) \
+                    + WhiteKernel(1e-4, noise_level_bounds=(1e-8, 1e-1))
+                gp = GaussianProcessRegressor(kernel, normalize_y=True, n_restarts_optimizer=2, random_state=self.seed)
+            with warnings.catch_warnings():
+                # Hyperparameters at their bounds are expected (e.g., noise-free simulations)
+                warnings.simplefilter("ignore", ConvergenceWarning)
+                gp.fit(self.X[observed], targets[mode])
+            if not fixed:
+                self.kernels[mode] = gp.kernel_
+            means[mode], std = gp.predict(self.X, return_std=True)
+            var += std ** 2
+        return means["cpu"] - means["carus"], np.sqrt(var), means
+
+    # Log2 cycles per output of the simulated candidates
+    def get_targets(self) -> (list, dict):
+        """Return the simulated candidates and the log2 cycles per output of each mode."""
+        observed = list(self.results)
+        return observed, {mode: np.array([math.log2(self.results[i][mode]) for i in observed]) for mode in ("cpu", "carus")}
+
+    # Select the next batch
+    def select(self, num: int) -> list:
+        """Select the next 'num' candidates to simulate."""
+        observed, targets = self.get_targets()
+        mu, sigma, means = self.predict(observed, targets)
+        batch = []
+        for _ in range(num):
+            straddle = self.z * sigma - np.abs(mu)
+            straddle[self.selected + batch] = -np.inf
+            best = int(np.argmax(straddle))
+            if straddle[best] < 0:
+                break
+            batch.append(best)
+            # Assume the point was simulated at its predicted value
+            observed = observed + [best]
+            targets = {mode: np.append(targets[mode], means[mode][best]) for mode in targets}
+            mu, sigma, means = self.predict(observed, targets, fixed=True)
+        return batch
+
+    # Simulate a batch
+    def simulate(self, batch: list, make_scheduler, resume: bool) -> int:
+        """Append 'batch' to the test list and run the pending tests. Return the number of failed tests."""
+        self.selected += batch
+        with open(self.tests_file, "w") as f:
+            f.write("# [benchmark] [datatype] [num_outputs] [kernel_options]\n")
+            for i in self.selected:
+                app_name, data_type, num_outs, kernel_params = self.tests[i]
+                f.write(f"{app_name} {data_type} {num_outs} {kernel_params}\n")
+        sched = make_scheduler(self.tests_file)
+        num_failed = sched.run_throughput(self.out_dir, os.path.basename(self.report_file), resume=resume)
+
+        # Load the results of all the simulated tests
+        with open(self.report_file, "r") as f:
+            for row in csv.DictReader(f):
+                i = self.index.get((row["data_type"], row["kernel_params"]))
+                if i is not None and int(row["num_outs"]) > 0:
+                    self.results.setdefault(i, {})[row["memory_type"]] = int(row["cycles"]) / int(row["num_outs"])
+        self.results = {i: r for i, r in self.results.items() if r.get("cpu", 0) > 0 and r.get("carus", 0) > 0}
+        return num_failed
+
+    # Run the search
+    def run(self, make_scheduler, resume: bool = False) -> int:
+        """Run the search, creating a scheduler for each batch with 'make_scheduler(test_list)'.
+
+        Return the number of failed tests.
+        """
+        num_failed = self.simulate(self.get_initial()[:self.budget], make_scheduler, resume)
+        while len(self.selected) < self.budget:
+            if len(self.results) < 2:
+                raise RuntimeError("not enough successful simulations to fit the surrogate model")
+            batch = self.select(min(self.batch_size, self.budget - len(self.selected)))
+            if not batch:
+                print("### All the candidates are classified with confidence")
+                break
+            print(f"### Adaptive search: {len(self.selected)}/{self.budget} simulations, next batch of {len(batch)}")
+            num_failed = self.simulate(batch, make_scheduler, resume=True)
+        return num_failed
+
+    # Crossovers between neighbouring candidates
+    def get_crossovers(self, mu: np.ndarray) -> list:
+        """Find the pairs of candidates, adjacent along one parameter, whose predicted winner differs."""
+        levels = {n: {v: k for k, v in enumerate(l)} for n, l in self.params.items()}
+        position = {tuple(levels[n][p[n]] for n in self.params): i for i, p in enumerate(self.points)}
+        pairs = []
+        for pos, i in position.items():
+            for d in range(len(pos)):
+                j = position.get(pos[:d] + (pos[d] + 1,) + pos[d+1:])
+                if j is not None and (mu[i] > 0) != (mu[j] > 0):
+                    pairs.append((i, j))
+        return pairs
+
+    # Report the predictions
+    def report(self):
+        """Write the predicted speedup of every candidate and print the crossovers."""
+        mu, sigma, _ = self.predict(*self.get_targets())
+        with open(self.predictions_file, "w") as f:
+            writer = csv.writer(f)
+            writer.writerow(["kernel_name", "data_type", "kernel_params", "speedup", "speedup_low", "speedup_high", "winner", "simulated"])
+            for i, (app_name, data_type, _, kernel_params) in enumerate(self.tests):
+                writer.writerow([app_name.split("-", 1)[1], data_type, kernel_params,
+                                 f"{2 ** mu[i]:.4g}", f"{2 ** (mu[i] - self.z * sigma[i]):.4g}", f"{2 ** (mu[i] + self.z * sigma[i]):.4g}",
+                                 "carus" if mu[i] > 0 else "cpu", int(i in self.results)])
+        crossovers = self.get_crossovers(mu)
+        print(f"### {len(self.results)} simulations out of {len(self.tests)} candidates, {len(crossovers)} crossovers (see '{self.predictions_file}'):")
+        for i, j in crossovers:
+            print(f"    - {self.tests[i][1]} {self.tests[i][3]} ({2 ** mu[i]:.2f}x) -> {self.tests[j][1]} {self.tests[j][3]} ({2 ** mu[j]:.2f}x)")
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Adaptive search of the CPU/NM-Carus throughput crossover")
+    cmd_parser.add_argument("spec_file",
+                            help="Sweep specification with a single sweep (YAML, see sweep.py)")
+    cmd_parser.add_argument("out_dir",
+                            help="Output directory",
+                            nargs="?",
+                            default=f"{os.getcwd()}/build/performance-analysis/adaptive")
+    cmd_parser.add_argument("--budget",
+                            help="Maximum number of simulated tests (default: 10%% of the candidates).",
+                            type=int)
+    cmd_parser.add_argument("--batch-size",
+                            help="Number of tests selected at each iteration.",
+                            type=int,
+                            default=4)
+    cmd_parser.add_argument("--init",
+                            help="Number of tests of the initial Latin-hypercube sample.",
+                            type=int)
+    cmd_parser.add_argument("--seed",
+                            help="Random seed.",
+                            type=int,
+                            default=0)
+    cmd_parser.add_argument("--jobs", "-j",
+                            help="Number of workers of the build and simulation stages.",
+                            type=int,
+                            default=1)
+    cmd_parser.add_argument("--results-store",
+                            help="Also append the results to this Parquet results store (see results_store.py).")
+    cmd_parser.add_argument("--build-cache",
+                            help="Directory of the firmware build cache.",
+                            default=f"{os.getcwd()}/build/performance-analysis/build-cache")
+    cmd_parser.add_argument("--no-build-cache",
+                            help="Always rebuild the test applications.",
+                            action="store_true")
+    cmd_parser.add_argument("--resume",
+                            help="Resume an interrupted search, skipping the tests already completed.",
+                            action="store_true")
+    args = cmd_parser.parse_args()
+
+    # Load the sweep
+    sweeps = load_sweeps(args.spec_file)
+    if len(sweeps) != 1:
+        print(f"ERROR: '{args.spec_file}' must contain a single sweep", file=sys.stderr)
+        sys.exit(1)
+    search = adaptive_search(sweeps[0].spec, args.out_dir, args.budget, args.batch_size, args.init, args.seed)
+    print(f"### {len(search.tests)} candidates, budget of {search.budget} simulations")
+
+    # Run the search, reusing the build cache, model, and store across batches
+    os.makedirs(args.out_dir, exist_ok=True)
+    cache = None if args.no_build_cache else build_cache(args.build_cache)
+    store = None if args.results_store is None else results_store(args.results_store)
+    model = verilator_model(os.getcwd())
+    num_failed = search.run(lambda cfg: ts.test_scheduler(cfg, jobs=args.jobs, cache=cache, model=model, store=store), args.resume)
+    search.report()
+
+    # Exit
+    sys.exit(1 if num_failed > 0 else 0)
@@ -1,246 +1,246 @@
 import argparse
+import os
+import sys
+import json
+import hashlib
+import inspect
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import rc
-
-rc('text', usetex=True)
-rc('text.latex', preamble=r'\usepackage{siunitx}')
-
-# Parse command-line arguments
-parser = argparse.ArgumentParser(description="Plot power benchmark chart")
-parser.add_argument("power_csv",
-                    help="CSV report with power data")
-parser.add_argument("throughput_csv",
-                    help="CSV report with throughput data")
-parser.add_argument("out_dir",
-                    help="Output directory where to save charts",
-                    default=".",
-                    nargs="?",
-                    type=str)
-parser.add_argument("--log",
-                    help="Use a logarithmic scale on the y-axis",
-                    action="store_true")
-args = parser.parse_args()
-
-# Initialization
-throughput_csv = args.throughput_csv
-power_csv = args.power_csv
-out_dir = args.out_dir
-log_scale = args.log
-
-# Read CSV report with throughput data
-# CSV format: memory_type,kernel_name,data_type,num_outs,cycles,kernel_params
-thr_df = pd.read_csv(throughput_csv, sep=",", header=0)
-
-# Order by kernel, then data type, then memory type
-thr_df = thr_df.sort_values(by=["kernel_name", "data_type", "memory_type"]).reset_index(drop=True)
-
-# Compute the number of cycles per output sample
-thr_df["cycles_per_output"] = thr_df["cycles"] / thr_df["num_outs"]
-
-# Separate data by memory type
-thr_df_cpu = thr_df.loc[thr_df["memory_type"] == "cpu"].reset_index(drop=True)
-thr_df_carus = thr_df.loc[thr_df["memory_type"] == "carus"].reset_index(drop=True)
-
-# Read CSV report with power data
-# CSV format: memory_type,kernel_name,data_type,num_outs,sys_pwr,sys_cpu_pwr,sys_mem_pwr,sys_peri_pwr,nmc_pwr,nmc_ctl_pwr,nmc_comp_pwr,nmc_mem_pwr,kernel_params
-pwr_df = pd.read_csv(power_csv, sep=",", header=0)
-
-# Order by kernel, then data type, then memory type
-pwr_df = pwr_df.sort_values(by=["kernel_name", "data_type", "memory_type"]).reset_index(drop=True)
-
-# Compute power * cycles (energy) / number of output samples for each kernel and data type
-pwr_df["energy"] = (pwr_df["sys_pwr"] + pwr_df['nmc_pwr']) * thr_df["cycles_per_output"]
-
-# Separate data by memory type
-pwr_df_cpu = pwr_df.loc[pwr_df["memory_type"] == "cpu"].reset_index(drop=True)
-pwr_df_carus = pwr_df.loc[pwr_df["memory_type"] == "carus"].reset_index(drop=True)
-
-# Throughput benchmark chart
-# --------------------------
-# Compute throughput gain in each data frame
-thr_df_cpu["gain"] = thr_df_cpu["cycles_per_output"] / thr_df_cpu["cycles_per_output"]
-thr_df_carus["gain"] = thr_df_cpu["cycles_per_output"] / thr_df_carus["cycles_per_output"]
-
-# Keep only kernel, data type and throughput gain columns and reset index
-thr_df_cpu = thr_df_cpu[["kernel_name", "data_type", "gain"]]
-thr_df_carus = thr_df_carus[["kernel_name", "data_type", "gain"]]
-
-# Transform rows with the same data type into columns
-thr_df_cpu = thr_df_cpu.pivot(index="kernel_name", columns="data_type", values="gain")
-thr_df_carus = thr_df_carus.pivot(index="kernel_name", columns="data_type", values="gain")
-
-# Reorder columns
-thr_df_cpu = thr_df_cpu[["int32", "int16", "int8"]]
-thr_df_carus = thr_df_carus[["int32", "int16", "int8"]]
-
-# Reorder rows as [xor, add, mul, matmul, gemm, conv2d, relu, leaky-relu, maxpool]
-thr_df_cpu = thr_df_cpu.reindex(["xor", "add", "mul", "matmul", "gemm", "conv2d", "relu", "leaky-relu", "maxpool"])
-thr_df_carus = thr_df_carus.reindex(["xor", "add", "mul", "matmul", "gemm", "conv2d", "relu", "leaky-relu", "maxpool"])
-
-df = pd.concat([thr_df_cpu, thr_df_carus], axis=1, keys=["CPU", "NM-Carus"])
-print(df)
-
-# Plot Carus throughput bar chart
+import matplotlib
+from concurrent.futures import ProcessPoolExecutor
+from energy_analysis import energy_analysis
+
+# Version of the chart rendering, part of the hash of each chart
+CHART_VERSION = 1
+
+# Set up matplotlib in the rendering processes
+def init_renderer(text: str):
+    matplotlib.use("Agg")
+    from matplotlib import rc
+    if text == "latex":
+        rc('text', usetex=True)
+        rc('text.latex', preamble=r'\usepackage{siunitx}')
+    else:
+        rc('text', usetex=False)
+
+# Plot a gain bar chart
 # - the kernel is the x-axis
-# - the throughput gain is the y-axis
+# - the gain is the y-axis
 # - group columns by memory type
 # - ignore the CPU
-colors = ["#6d1a3680", "#6d1a36c0", "#6d1a36ff", "#00748080", "#007480c0", "#007480ff"]
-patterns = ["/", "\\", "|", "-", "+", "x"]
-df_bars = df[["NM-Carus"]]
-df_bars.plot(kind="bar", rot=0, title="Cycles per output sample: CPU only vs. CPU + NMC (higher is better)", ylabel="Throughput w.r.t. CPU", xlabel="Benchmark application", figsize=(12, 3), grid=False, width=0.8, color=colors, logy=log_scale)
-
-# Set patterns by series (broken)
-# for i, bar in enumerate(plt.gca().patches):
-#     hatch = patterns[i % len(patterns)]
-#     bar.set_hatch(hatch)
-
-# Draw horizontal grid only
-plt.gca().yaxis.grid(True)
-
-# Superpose an horizontal line at y=1 with label "CPU"
-if not log_scale:
-    plt.axhline(y=1, color="#3d3d3dff", linestyle="--")
-    plt.text(-0.63, 2, "CPU", color="#3d3d3dff", rotation=0, fontsize="small")
-
-# Set Y max value
-if log_scale:
-    plt.gca().set_ylim([1, 400])
-else:
-    plt.gca().set_ylim([0, 100])
-
-# Add 'x' to the y-axis step labels
-plt.gca().yaxis.set_major_formatter(lambda x, pos: str(int(x)) + "x")
-
-# Set legend titles
-plt.gca().set_title(plt.gca().get_title(), fontsize="large", color="#3d3d3dff")
-plt.gca().set_xlabel(plt.gca().get_xlabel(), fontweight="bold")
-plt.gca().set_ylabel(plt.gca().get_ylabel(), fontweight="bold")
-
-# Legend as one row
-if log_scale:
-    plt.gca().legend(title="(Memory type, SW data type)", loc="upper left", ncol=3)
-else:
-    plt.gca().legend(title="(Memory type, SW data type)")
-
-# Save chart to file
-chart_file = f"{out_dir}/throughput-bench.png"
-print(f"Saving energy benchmark chart to {chart_file}...")
-plt.savefig(chart_file, dpi=600, bbox_inches="tight")
-
-
-# Energy benchmark chart
-# ----------------------
-# Compute energy gain vs. CPU in each data frame
-pwr_df_cpu["gain"] = pwr_df_cpu["energy"] / pwr_df_cpu["energy"]
-pwr_df_carus["gain"] = pwr_df_cpu["energy"] / pwr_df_carus["energy"]
-
-# Keep only kernel, data type and energy gain columns
-energy_df_cpu = pwr_df_cpu[["kernel_name", "data_type", "gain"]]
-energy_df_carus = pwr_df_carus[["kernel_name", "data_type", "gain"]]
-
-# Transform rows with the same data type into columns
-energy_df_cpu = energy_df_cpu.pivot(index="kernel_name", columns="data_type", values="gain")
-energy_df_carus = energy_df_carus.pivot(index="kernel_name", columns="data_type", values="gain")
-
-# Reorder columns
-energy_df_cpu = energy_df_cpu[["int32", "int16", "int8"]]
-energy_df_carus = energy_df_carus[["int32", "int16", "int8"]]
-
-# Reorder rows as [xor, add, mul, matmul, gemm, conv2d, relu, leaky-relu, maxpool]
-energy_df_cpu = energy_df_cpu.reindex(["xor", "add", "mul", "matmul", "gemm", "conv2d", "relu", "leaky-relu", "maxpool"])
-energy_df_carus = energy_df_carus.reindex(["xor", "add", "mul", "matmul", "gemm", "conv2d", "relu", "leaky-relu", "maxpool"])
-
-# Combine data frames, grouping columns by memory type
-energy_df = pd.concat([energy_df_cpu, energy_df_carus], axis=1, keys=["CPU", "NM-Carus"])
-print(energy_df)
-
-# Plot Carus throughput bar chart
-# - the kernel is the x-axis
-# - the throughput gain is the y-axis
-# - group columns by memory type
-# - ignore the CPU
-colors = ["#6d1a3680", "#6d1a36c0", "#6d1a36ff", "#00748080", "#007480c0", "#007480ff"]
-df_bars = energy_df[["NM-Carus"]]
-df_bars.plot(kind="bar", rot=0, title="Energy per output sample: CPU only vs. CPU + NMC (higher is better)", ylabel="Energy efficiency w.r.t. CPU", xlabel="Benchmark application", figsize=(12, 3), grid=False, width=0.8, color=colors, logy=log_scale)
-
-# Draw horizontal grid only
-plt.gca().yaxis.grid(True)
-
-# Set suptitle
-# plt.suptitle("heepatia Energy Efficiency Improvement", fontweight="bold", fontsize="x-large", color="#3d3d3dff")
-
-# Superpose an horizontal line at y=1 with label "CPU"
-if not log_scale:
-    plt.axhline(y=1, color="#3d3d3dff", linestyle="--")
-    plt.text(-0.62, 2, "CPU", color="#3d3d3dff", rotation=0, fontsize="small")
-
-# Set Y max value
-if log_scale:
-    plt.gca().set_ylim([1, 400])
-else:
-    plt.gca().set_ylim([0, 100])
-
-# Add 'x' to the y-axis step labels
-plt.gca().yaxis.set_major_formatter(lambda x, pos: str(int(x)) + "x")
-
-# Set legend titles
-plt.gca().set_title(plt.gca().get_title(), fontsize="large", color="#3d3d3dff")
-plt.gca().set_xlabel(plt.gca().get_xlabel(), fontweight="bold")
-plt.gca().set_ylabel(plt.gca().get_ylabel(), fontweight="bold")
-
-# Legend as one row
-if log_scale:
-    plt.gca().legend(title="(Memory type, SW data type)", loc="upper left", ncol=3)
-else:
-    plt.gca().legend(title="(Memory type, SW data type)")
-
-# Save chart to file
-chart_file = f"{out_dir}/energy-bench.png"
-print(f"Saving energy benchmark chart to {chart_file}...")
-plt.savefig(chart_file, dpi=600, bbox_inches="tight")
-
-
-# Power breakdown chart
-# ---------------------
-# Select matmul kernel 8-bit power data
-pwr_df_matmul = pwr_df.loc[pwr_df["kernel_name"] == "matmul"].reset_index(drop=True)
-pwr_df_matmul = pwr_df_matmul.loc[pwr_df_matmul["data_type"] == "int8"].reset_index(drop=True)
-
-# Plot power breakdown bars
-plot_data = pwr_df_matmul[["memory_type", "nmc_mem_pwr", "nmc_comp_pwr", "nmc_ctl_pwr", "sys_mem_pwr", "sys_cpu_pwr", "sys_peri_pwr"]]
-
-# Scale power data by 1000
-plot_data.loc[:, ("nmc_mem_pwr", "nmc_comp_pwr", "nmc_ctl_pwr", "sys_mem_pwr", "sys_cpu_pwr", "sys_peri_pwr")] *= 1000
-
-fig, ax = plt.subplots()
-
-# Set colors
-colors = ["#007480ff", "#007480c0", "#00748080", "#434343ff", "#434343c0", "#43434380"]
-plot_data.set_index("memory_type").plot(kind="bar", stacked=True, color=colors, ax=ax, ylabel="Power [mW]", xlabel="Compute device", title="System power breakdown for 8-bit matrix multiplication")
-
-# Print legend in reverse order
-handles, labels = ax.get_legend_handles_labels()
-ax.legend(reversed(handles), reversed(labels))
-
-# Do not tilt x-axis labels and make them bold
-plt.xticks(rotation=0)
-plt.gca().set_xticklabels(plt.gca().get_xticklabels(), fontweight="bold")
-
-plt.gca().set_ylim([0, 11])
-
-# Sum of values
-total_values = plot_data.sum(axis=1, numeric_only=True)
-
-# Total values labels
-for i, total in enumerate(total_values):
-  ax.text(i, total + 0.1, round(total, 1), ha="center", va="bottom", color="#3d3d3dff")
-
-# Draw horizontal grid only
-plt.gca().yaxis.grid(True)
-
-chart_file = f"{out_dir}/power-breakdown.png"
-print(f"Saving power breakdown chart to {chart_file}...")
-plt.savefig(chart_file, dpi=600, bbox_inches="tight")
+def plot_gains(df: pd.DataFrame, title: str, ylabel: str, cpu_label_x: float, chart_file: str, log_scale: bool, dpi: int):
+    import matplotlib.pyplot as plt
+    colors = ["#6d1a3680", "#6d1a36c0", "#6d1a36ff", "#00748080", "#007480c0", "#007480ff"]
+    df_bars = df[["NM-Carus"]]
+    df_bars.plot(kind="bar", rot=0, title=title, ylabel=ylabel, xlabel="Benchmark application", figsize=(12, 3), grid=False, width=0.8, color=colors, logy=log_scale)
+
+    # Set patterns by series (broken)
+    # patterns = ["/", "\\", "|", "-", "+", "x"]
+    # for i, bar in enumerate(plt.gca().patches):
+    #     hatch = patterns[i % len(patterns)]
+    #     bar.set_hatch(hatch)
+
+    # Draw horizontal grid only
+    plt.gca().yaxis.grid(True)
+
+    # Superpose an horizontal line at y=1 with label "CPU"
+    if not log_scale:
+        plt.axhline(y=1, color="#3d3d3dff", linestyle="--")
+        plt.text(cpu_label_x, 2, "CPU", color="#3d3d3dff", rotation=0, fontsize="small")
+
+    # Set Y max value
+    if log_scale:
+        plt.gca().set_ylim([1, 400])
+    else:
+        plt.gca().set_ylim([0, 100])
+
+    # Add 'x' to the y-axis step labels
+    plt.gca().yaxis.set_major_formatter(lambda x, pos: str(int(x)) + "x")
+
+    # Set legend titles
+    plt.gca().set_title(plt.gca().get_title(), fontsize="large", color="#3d3d3dff")
+    plt.gca().set_xlabel(plt.gca().get_xlabel(), fontweight="bold")
+    plt.gca().set_ylabel(plt.gca().get_ylabel(), fontweight="bold")
+
+    # Footnote on the kernels marked by mark_predicted()
+    if any(str(k).endswith("*") for k in df.index):
+        plt.gcf().text(0.01, -0.12, "* cycles predicted by the cycle model, not simulated", fontsize="small", color="#3d3d3dff")
+
+    # Legend as one row
+    if log_scale:
+        plt.gca().legend(title="(Memory type, SW data type)", loc="upper left", ncol=3)
+    else:
+        plt.gca().legend(title="(Memory type, SW data type)")
+
+    # Save chart to file
+    plt.savefig(chart_file, dpi=dpi, bbox_inches="tight")
+    plt.close("all")
+
+# Plot the power breakdown chart
+def plot_power_breakdown(plot_data: pd.DataFrame, chart_file: str, dpi: int):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+
+    # Set colors
+    colors = ["#007480ff", "#007480c0", "#00748080", "#434343ff", "#434343c0", "#43434380"]
+    plot_data.set_index("memory_type").plot(kind="bar", stacked=True, color=colors, ax=ax, ylabel="Power [mW]", xlabel="Compute device", title="System power breakdown for 8-bit matrix multiplication")
+
+    # Print legend in reverse order
+    handles, labels = ax.get_legend_handles_labels()
+    ax.legend(reversed(handles), reversed(labels))
+
+    # Do not tilt x-axis labels and make them bold
+    plt.xticks(rotation=0)
+    plt.gca().set_xticklabels(plt.gca().get_xticklabels(), fontweight="bold")
+
+    plt.gca().set_ylim([0, 11])
+
+    # Sum of values
+    total_values = plot_data.sum(axis=1, numeric_only=True)
+
+    # Total values labels
+    for i, total in enumerate(total_values):
+      ax.text(i, total + 0.1, round(total, 1), ha="center", va="bottom", color="#3d3d3dff")
+
+    # Draw horizontal grid only
+    plt.gca().yaxis.grid(True)
+
+    plt.savefig(chart_file, dpi=dpi, bbox_inches="tight")
+    plt.close("all")
+
+# Hash of the data, rendering options, and plotting code of a chart
+# - the source of the plotting function and of init_renderer is hashed
+# - bump CHART_VERSION on changes to the rendering they do not contain
+def get_chart_hash(data: pd.DataFrame, options: dict, plot) -> str:
+    hasher = hashlib.sha256(data.to_csv().encode("utf-8"))
+    hasher.update(json.dumps(dict(options, version=CHART_VERSION), sort_keys=True).encode("utf-8"))
+    for func in [init_renderer, plot]:
+        hasher.update(inspect.getsource(func).encode("utf-8"))
+    return hasher.hexdigest()
+
+# Gains of a memory type, with kernels as rows and data types as columns
+def get_gains(gain_df: pd.DataFrame, mode: str, gain: str) -> pd.DataFrame:
+    mode_df = gain_df.loc[gain_df["memory_type"] == mode]
+    mode_df = mode_df.pivot(index="kernel_name", columns="data_type", values=gain)
+    # Reorder rows as [xor, add, mul, matmul, gemm, conv2d, relu, leaky-relu, maxpool]
+    return mode_df.reindex(index=["xor", "add", "mul", "matmul", "gemm", "conv2d", "relu", "leaky-relu", "maxpool"], columns=["int32", "int16", "int8"])
+
+# Mark the kernels whose cycles were predicted by the cycle model
+def mark_predicted(df: pd.DataFrame, gain_df: pd.DataFrame) -> pd.DataFrame:
+    predicted = set(gain_df.loc[gain_df["predicted"], "kernel_name"])
+    return df.rename(index=lambda kernel: f"{kernel}*" if kernel in predicted else kernel)
+
+if __name__ == "__main__":
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description="Plot power benchmark chart")
+    parser.add_argument("power_csv",
+                        help="CSV report with power data")
+    parser.add_argument("throughput_csv",
+                        help="CSV report with throughput data")
+    parser.add_argument("out_dir",
+                        help="Output directory where to save charts",
+                        default=".",
+                        nargs="?",
+                        type=str)
+    parser.add_argument("--log",
+                        help="Use a logarithmic scale on the y-axis",
+                        action="store_true")
+    parser.add_argument("--text",
+                        help="Text rendering: 'latex' (needs a TeX installation) or 'mathtext' (matplotlib, much faster)",
+                        choices=["latex", "mathtext"],
+                        default="latex")
+    parser.add_argument("--format",
+                        help="Chart file format",
+                        choices=["png", "svg", "pdf"],
+                        default="png")
+    parser.add_argument("--dpi",
+                        help="Resolution of raster charts",
+                        type=int,
+                        default=600)
+    parser.add_argument("--jobs", "-j",
+                        help="Number of charts rendered in parallel",
+                        type=int,
+                        default=3)
+    parser.add_argument("--force",
+                        help="Render charts even if their data has not changed",
+                        action="store_true")
+    args = parser.parse_args()
+
+    # Initialization
+    throughput_csv = args.throughput_csv
+    power_csv = args.power_csv
+    out_dir = args.out_dir
+    log_scale = args.log
+
+    # Read CSV report with throughput data
+    # CSV format: memory_type,kernel_name,data_type,num_outs,cycles,kernel_params,cycles_dma_in,cycles_compute,cycles_dma_out,cycles_tiling,nmc_instances,predicted
+    thr_df = pd.read_csv(throughput_csv, sep=",", header=0)
+
+    # Read CSV report with power data
+    # CSV format: memory_type,kernel_name,data_type,num_outs,sys_pwr,sys_cpu_pwr,sys_mem_pwr,sys_peri_pwr,nmc_pwr,nmc_ctl_pwr,nmc_comp_pwr,nmc_mem_pwr,kernel_params
+    pwr_df = pd.read_csv(power_csv, sep=",", header=0)
+
+    # Compute throughput and energy gains w.r.t. the CPU, matching the two reports by test
+    gain_df = energy_analysis().analyse(thr_df, pwr_df)
+
+    # Throughput benchmark chart
+    # --------------------------
+    df = pd.concat([get_gains(gain_df, "cpu", "throughput_gain"), get_gains(gain_df, "carus", "throughput_gain")], axis=1, keys=["CPU", "NM-Carus"])
+    df = mark_predicted(df, gain_df)
+    print(df)
+
+    # Energy benchmark chart
+    # ----------------------
+    energy_df = pd.concat([get_gains(gain_df, "cpu", "energy_gain"), get_gains(gain_df, "carus", "energy_gain")], axis=1, keys=["CPU", "NM-Carus"])
+    energy_df = mark_predicted(energy_df, gain_df)
+    print(energy_df)
+
+    # Power breakdown chart
+    # ---------------------
+    # Select matmul kernel 8-bit power data
+    pwr_df_matmul = pwr_df.loc[pwr_df["kernel_name"] == "matmul"].reset_index(drop=True)
+    pwr_df_matmul = pwr_df_matmul.loc[pwr_df_matmul["data_type"] == "int8"].reset_index(drop=True)
+
+    # Plot power breakdown bars
+    plot_data = pwr_df_matmul[["memory_type", "nmc_mem_pwr", "nmc_comp_pwr", "nmc_ctl_pwr", "sys_mem_pwr", "sys_cpu_pwr", "sys_peri_pwr"]].copy()
+
+    # Scale power data by 1000
+    plot_data.loc[:, ("nmc_mem_pwr", "nmc_comp_pwr", "nmc_ctl_pwr", "sys_mem_pwr", "sys_cpu_pwr", "sys_peri_pwr")] *= 1000
+
+    # Render the charts whose data or options changed
+    # ------------------------------------------------
+    charts = [
+        ("throughput-bench", "throughput benchmark", df, plot_gains,
+         ("Cycles per output sample: CPU only vs. CPU + NMC (higher is better)", "Throughput w.r.t. CPU", -0.63), (log_scale,)),
+        ("energy-bench", "energy benchmark", energy_df, plot_gains,
+         ("Energy per output sample: CPU only vs. CPU + NMC (higher is better)", "Energy efficiency w.r.t. CPU", -0.62), (log_scale,)),
+        ("power-breakdown", "power breakdown", plot_data, plot_power_breakdown, (), ()),
+    ]
+    options = {"text": args.text, "format": args.format, "dpi": args.dpi, "log": log_scale}
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs), initializer=init_renderer, initargs=(args.text,)) as pool:
+        futures = {}
+        for name, label, data, plot, plot_args, plot_opts in charts:
+            chart_file = f"{out_dir}/{name}.{args.format}"
+            hash_file = f"{chart_file}.sha256"
+            chart_hash = get_chart_hash(data, dict(options, chart=name, args=plot_args + plot_opts), plot)
+            if not args.force and os.path.isfile(chart_file) and os.path.isfile(hash_file):
+                with open(hash_file, "r") as f:
+                    if f.read().strip() == chart_hash:
+                        print(f"Skipping {label} chart {chart_file} (data and plotting code unchanged)")
+                        continue
+            print(f"Saving {label} chart to {chart_file}...")
+            futures[pool.submit(plot, data, *plot_args, chart_file, *plot_opts, args.dpi)] = (chart_file, hash_file, chart_hash)
+
+        # Record the hash of the rendered charts
+        failed = False
+        for future, (chart_file, hash_file, chart_hash) in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"ERROR: failed to render {chart_file}: {e}", file=sys.stderr)
+                failed = True
+                continue
+            with open(hash_file, "w") as f:
+                f.write(chart_hash + "\n")
+
+    sys.exit(1 if failed else 0)
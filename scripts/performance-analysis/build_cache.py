@@ -0,0 +1,215 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: build_cache.py
+# Date: 17/10/2026
+# Description: Content-addressed cache of firmware images built by the test scheduler
+
+import os
+import sys
+import json
+import time
+import glob
+import fcntl
+import fnmatch
+import hashlib
+import shutil
+import subprocess
+
+# Source trees (relative to the repository root) shared by all applications
+SHARED_SRC_DIRS = [
+    os.path.join("sw", "nmc"),          # data generation helpers (c_gen.py, ...)
+    os.path.join("sw", "external"),     # heepatia drivers and runtime
+    os.path.join("sw", "device"),       # X-HEEP drivers and runtime
+    os.path.join("sw", "linker"),       # linker scripts
+]
+
+# Files regenerated by the application makefiles (see their 'clean' rule).
+# Their content is fully determined by datagen.py and the kernel parameters.
+GENERATED_FILES = [
+    "data.h",
+    "*_data.h",
+    "caesar_commands.h",
+    "caesar_instructions*",
+    "data_*.bin",           # matrices in the 'blob' data format
+    "*.cache",              # datagen cache keys (e.g., data.h.cache)
+]
+
+# Environment variables read by the build (by the makefile or by datagen.py)
+# that change the firmware
+BUILD_ENV_VARS = [
+    "CARUS_NUM",            # NM-Carus instances (generated heepatia.h)
+    "CAESAR_NUM",           # NM-Caesar instances (generated heepatia.h)
+    "DATA_FORMAT",          # data format of the matrices (see sw/nmc/c_gen.py)
+    "DATA_COMPRESSION",     # compression of the matrices (default of the tiling datagens)
+]
+
+# Compiler used by each TOOLCHAIN option of the top-level makefile
+TOOLCHAIN_COMPILERS = {
+    "OHW": "riscv32-corev-gcc",
+    "POS": "clang",
+    "GCC": "riscv32-unknown-elf-gcc",
+}
+
+class build_cache:
+    """Content-addressed firmware cache with size-bounded LRU eviction.
+
+    Entries are keyed by a hash of the application sources, the shared
+    software libraries, the kernel parameters, the CDEFS, the environment
+    variables in BUILD_ENV_VARS, and the toolchain version. Each entry stores the 'main.*' files that 'make app' copies to
+    'build/sw/app'. The index (and the hit/miss counters) is shared by all the
+    scheduler workers and protected by a file lock.
+    """
+
+    # Initialize cache properties
+    def __init__(self, cache_dir: str, max_size_mb: int = 2048):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size_mb * 1024 * 1024
+        self.index_file = os.path.join(self.cache_dir, "index.json")
+        self.lock_file = os.path.join(self.cache_dir, ".lock")
+        self.toolchain_version: str = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # Hash all the files in a directory tree
+    def hash_tree(self, hasher, root_dir: str, top: str, skip_generated: bool = False):
+        """Feed the relative path and content of every file in 'top' to 'hasher'."""
+        top_dir = os.path.join(root_dir, top)
+        for dirpath, dirnames, filenames in os.walk(top_dir, followlinks=True):
+            dirnames.sort()
+            for f in sorted(filenames):
+                if skip_generated and any(fnmatch.fnmatch(f, p) for p in GENERATED_FILES):
+                    continue
+                if f.endswith((".pyc", ".o", ".d")):
+                    continue
+                path = os.path.join(dirpath, f)
+                hasher.update(os.path.relpath(path, root_dir).encode("utf-8"))
+                with open(path, "rb") as fp:
+                    hasher.update(hashlib.sha256(fp.read()).digest())
+
+    # Get the version string of the compiler
+    def get_toolchain_version(self) -> str:
+        """Get the version of the compiler selected by TOOLCHAIN."""
+        if self.toolchain_version is None:
+            compiler = TOOLCHAIN_COMPILERS.get(os.environ.get("TOOLCHAIN", "OHW"), "riscv32-corev-gcc")
+            try:
+                out = subprocess.run([compiler, "--version"], check=True, capture_output=True)
+                self.toolchain_version = out.stdout.decode("utf-8").splitlines()[0]
+            except (OSError, subprocess.CalledProcessError, IndexError):
+                self.toolchain_version = f"{compiler} (unknown version)"
+        return self.toolchain_version
+
+    # Compute the cache key of a build
+    def get_key(self, root_dir: str, app_name: str, kernel_params: str, cdefs: str) -> str:
+        """Compute the cache key of an application build."""
+        hasher = hashlib.sha256()
+        self.hash_tree(hasher, root_dir, os.path.join("sw", "applications", app_name), skip_generated=True)
+        for src_dir in SHARED_SRC_DIRS:
+            self.hash_tree(hasher, root_dir, src_dir)
+        hasher.update(f"KERNEL_PARAMS={kernel_params}\0CDEFS={cdefs}\0".encode("utf-8"))
+        for var in BUILD_ENV_VARS:
+            hasher.update(f"{var}={os.environ.get(var, '')}\0".encode("utf-8"))
+        hasher.update(self.get_toolchain_version().encode("utf-8"))
+        return hasher.hexdigest()
+
+    # Load the cache index
+    def load_index(self) -> dict:
+        """Load the cache index (call with the lock held)."""
+        if not os.path.exists(self.index_file):
+            return {"entries": {}, "hits": 0, "misses": 0, "evictions": 0}
+        with open(self.index_file, "r") as f:
+            return json.load(f)
+
+    # Store the cache index
+    def store_index(self, index: dict):
+        """Atomically store the cache index (call with the lock held)."""
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp_file, self.index_file)
+
+    # Run a function on the index with the cache lock held
+    def update_index(self, func):
+        """Apply 'func' to the index with the lock held and store the result."""
+        with open(self.lock_file, "w") as lf:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+            index = self.load_index()
+            ret = func(index)
+            self.store_index(index)
+        return ret
+
+    # Restore cached build products
+    def restore(self, key: str, app_dir: str) -> bool:
+        """Copy the cached firmware to 'app_dir'. Return False on a cache miss."""
+        def _restore(index: dict) -> bool:
+            entry = index["entries"].get(key)
+            entry_dir = os.path.join(self.cache_dir, key)
+            if entry is None or not os.path.isdir(entry_dir):
+                index["entries"].pop(key, None)
+                index["misses"] += 1
+                return False
+            os.makedirs(app_dir, exist_ok=True)
+            for f in glob.glob(os.path.join(entry_dir, "main.*")):
+                shutil.copy(f, app_dir)
+            entry["last_used"] = time.time()
+            index["hits"] += 1
+            return True
+        return self.update_index(_restore)
+
+    # Store build products
+    def store(self, key: str, app_dir: str):
+        """Add the firmware in 'app_dir' to the cache and evict old entries."""
+        files = glob.glob(os.path.join(app_dir, "main.*"))
+        if not files:
+            return
+
+        def _store(index: dict):
+            entry_dir = os.path.join(self.cache_dir, key)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.makedirs(entry_dir)
+            for f in files:
+                shutil.copy(f, entry_dir)
+            index["entries"][key] = {
+                "size": sum(os.path.getsize(f) for f in files),
+                "last_used": time.time(),
+            }
+            self.evict(index)
+        self.update_index(_store)
+
+    # Evict least recently used entries
+    def evict(self, index: dict):
+        """Evict least recently used entries until the cache fits in its size (call with the lock held)."""
+        entries = index["entries"]
+        total_size = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total_size <= self.max_size or len(entries) == 1:
+                break
+            total_size -= entries[key]["size"]
+            del entries[key]
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            index["evictions"] += 1
+
+    # Get the cache statistics
+    def get_stats(self) -> dict:
+        """Get cumulative hit/miss/eviction counters and the cache size."""
+        def _stats(index: dict) -> dict:
+            return {
+                "hits": index["hits"],
+                "misses": index["misses"],
+                "evictions": index["evictions"],
+                "entries": len(index["entries"]),
+                "size": sum(e["size"] for e in index["entries"].values()),
+            }
+        return self.update_index(_stats)
+
+    # Print the statistics of the current session
+    def print_stats(self, start_stats: dict, file=sys.stdout):
+        """Print the statistics accumulated since 'start_stats' was taken."""
+        stats = self.get_stats()
+        hits = stats["hits"] - start_stats["hits"]
+        misses = stats["misses"] - start_stats["misses"]
+        evictions = stats["evictions"] - start_stats["evictions"]
+        lookups = hits + misses
+        hit_rate = 100 * hits / lookups if lookups > 0 else 0.0
+        print(f"### Build cache: {hits} hits, {misses} misses ({hit_rate:.1f}% hit rate), {evictions} evictions", file=file)
+        print(f"    - {stats['entries']} entries, {stats['size'] / (1024 * 1024):.1f} MiB / {self.max_size / (1024 * 1024):.0f} MiB", file=file)
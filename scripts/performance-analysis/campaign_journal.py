@@ -0,0 +1,91 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: campaign_journal.py
+# Date: 17/10/2026
+# Description: Append-only journal of the tests completed in a benchmark campaign
+
+import os
+import json
+import time
+
+class campaign_journal:
+    """Append-only journal of a benchmark campaign.
+
+    Each line is a JSON record describing one test: its key (application,
+    data type, kernel parameters, and number of NMC instances if more than
+    one), its status ('done' or 'failed'), the
+    report entries it produced, and the error message on failure. Records are
+    flushed to disk as soon as a test finishes, so that a crashed campaign can
+    be resumed from the last completed test. Later records override earlier
+    ones with the same key.
+    """
+
+    # Initialize the journal
+    def __init__(self, journal_file: str, resume: bool = False):
+        self.journal_file = journal_file
+        self.records: dict = {}
+        if resume:
+            self.load()
+        elif os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+
+    # Build the journal key of a test
+    @staticmethod
+    def get_key(test_data: dict) -> str:
+        """Build the key identifying a test in the journal."""
+        key = f"{test_data['app_name']}|{test_data['data_type']}|{test_data['kernel_params']}"
+        # Single-instance keys are unchanged, so older journals can be resumed
+        num_instances = test_data.get("nmc_instances", 1)
+        return key if num_instances == 1 else f"{key}|x{num_instances}"
+
+    # Load the records of a previous run
+    def load(self):
+        """Load the records of a previous run, ignoring a truncated last line."""
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.records[record["key"]] = record
+
+    # Append a record
+    def append(self, record: dict):
+        """Append a record and flush it to disk."""
+        record["time"] = time.time()
+        self.records[record["key"]] = record
+        os.makedirs(os.path.dirname(os.path.abspath(self.journal_file)), exist_ok=True)
+        with open(self.journal_file, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # Record a completed test
+    def add_done(self, test_data: dict, reports: list):
+        """Record a test that completed successfully with its report entries."""
+        self.append({"key": self.get_key(test_data), "status": "done", "reports": reports})
+
+    # Record a failed test
+    def add_failed(self, test_data: dict, error: str):
+        """Record a test that failed."""
+        self.append({"key": self.get_key(test_data), "status": "failed", "error": error})
+
+    # Check if a test was completed
+    def is_done(self, test_data: dict) -> bool:
+        """Check whether a test completed successfully in this or a previous run."""
+        record = self.records.get(self.get_key(test_data))
+        return record is not None and record["status"] == "done"
+
+    # Get the report entries of a completed test
+    def get_reports(self, test_data: dict) -> list:
+        """Get the report entries of a completed test."""
+        return self.records[self.get_key(test_data)]["reports"]
+
+    # Get the failed tests
+    def get_failed(self) -> list:
+        """Get the records of the failed tests."""
+        return [r for r in self.records.values() if r["status"] == "failed"]
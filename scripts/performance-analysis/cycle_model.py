@@ -0,0 +1,269 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: cycle_model.py
+# Date: 17/10/2026
+# Description: Analytical cycle model of the benchmark kernels calibrated on throughput reports
+
+import argparse
+import sys
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sweep import ELEM_SIZE, SWEEP_CONSTANTS, SWEEP_FUNCTIONS
+
+# Cost terms of each kernel, as expressions of the kernel parameters, of
+# 'num_outs', and of the constants and functions of sweep.py. Every term
+# enters the model twice: as is (cost per item) and multiplied by the element
+# size (cost per byte, e.g., for packed SIMD operations).
+CYCLE_TERMS = {
+    # Element-wise kernels
+    "xor": {"elems": "vl"},
+    "add": {"elems": "vl"},
+    "mul": {"elems": "vl"},
+    "relu": {"elems": "row_a * col_a", "rows": "row_a"},
+    "leaky-relu": {"elems": "row_a * col_a", "rows": "row_a"},
+    # Matrix kernels
+    "matmul": {"macs": "row_a * col_a * col_b", "outs": "row_a * col_b", "rows": "row_a * col_a"},
+    "gemm": {"macs": "row_a * col_a * col_b", "outs": "row_a * col_b", "rows": "row_a * col_a"},
+    "conv2d": {"macs": "num_outs * row_f * row_f", "outs": "num_outs", "rows": "row_a * row_f"},
+    "maxpool": {"elems": "row_a * col_a", "outs": "num_outs", "rows": "row_a"},
+    # Tiled kernels (sched_benchmark): one tile per vector register
+    "add-tiling": {"elems": "vl", "tiles": "ceil(vl * elem_size / carus_vreg_size)"},
+    "matmul-tiling": {"macs": "row_a * col_a * col_b", "outs": "row_a * col_b", "tiles": "ceil(col_b * elem_size / carus_vreg_size) * row_a"},
+}
+
+# Cost terms of the kernels not listed above
+DEFAULT_TERMS = {"outs": "num_outs"}
+
+# Parse kernel parameters
+def parse_kernel_params(kernel_params: str) -> dict:
+    """Convert e.g. '--row_a 8 --col_a 16' to {'row_a': 8, 'col_a': 16} (numeric options only)."""
+    params = {}
+    for name, value in re.findall(r"--([\w-]+)\s+(-?\d+(?:\.\d+)?)", kernel_params or ""):
+        params[name.replace("-", "_")] = float(value) if "." in value else int(value)
+    return params
+
+# Clock period of the simulations
+def get_clock_period_ns(root_dir: str) -> float:
+    """Read the simulation clock period from tb/tb_top.sv (as 'make' does for TB_SYSCLK)."""
+    with open(os.path.join(root_dir, "tb", "tb_top.sv"), "r") as f:
+        m = re.search(r"const time SIM_CLK_PERIOD = (\d+)\s*(ps|ns)", f.read())
+    if m is None:
+        raise ValueError("could not read SIM_CLK_PERIOD from tb/tb_top.sv")
+    return int(m.group(1)) * (1e-3 if m.group(2) == "ps" else 1.0)
+
+# Throughput report rows predicted by the cycle model
+def is_predicted(df: pd.DataFrame) -> pd.Series:
+    """Flag the rows whose 'predicted' column is set (reports without the column were all simulated)."""
+    if "predicted" not in df.columns:
+        return pd.Series(False, index=df.index)
+    flags = df["predicted"].astype(str).str.strip().str.lower().replace({"true": "1", "false": "0"})
+    return pd.to_numeric(flags, errors="coerce").fillna(0) != 0
+
+class cycle_model:
+    """Calibrated analytical model of the kernel execution cycles.
+
+    For each kernel and execution mode, the number of cycles is modelled as
+
+        cycles = c0 + sum_t (a_t + b_t * elem_size) * term_t
+
+    where the terms (e.g., number of MACs, output samples, tiles) are given
+    by CYCLE_TERMS as functions of the kernel shape. Kernels split across
+    several NMC instances are modelled separately for each number of
+    instances. The coefficients are
+    fitted with non-negative least squares on the throughput reports, first
+    on a random subset to measure the error on the held-out simulations,
+    then on all of them. Predictions are trusted by the scheduler only for
+    the kernels whose held-out error is below a threshold.
+    """
+
+    # Initialize model properties
+    def __init__(self, model_file: str = None, clock_period_ns: float = 10.0):
+        self.clock_period_ns = clock_period_ns
+        self.models: dict = {}      # "kernel|mode[|instances]" -> {"terms", "intercept", "coef", "error", "max_error", "num_samples"}
+        if model_file is not None:
+            self.load(model_file)
+
+    # Model key of a kernel
+    @staticmethod
+    def get_key(kernel: str, mode: str, num_instances: int = 1) -> str:
+        """Build the key of a kernel model (single-instance keys have no instance count)."""
+        return f"{kernel}|{mode}" if num_instances == 1 else f"{kernel}|{mode}|{num_instances}"
+
+    # Feature vector of a test
+    def get_features(self, terms: dict, data_type: str, num_outs: int, kernel_params: str) -> np.ndarray:
+        """Evaluate the cost terms of a test."""
+        names = dict(SWEEP_CONSTANTS, **SWEEP_FUNCTIONS, **parse_kernel_params(kernel_params))
+        names["num_outs"] = num_outs
+        names["elem_size"] = ELEM_SIZE[data_type]
+        values = [float(eval(expr, {"__builtins__": {}}, names)) for expr in terms.values()]
+        return np.array(values + [v * names["elem_size"] for v in values])
+
+    # Fit the model on throughput reports
+    def fit(self, reports: pd.DataFrame, holdout: float = 0.2, seed: int = 0):
+        """Fit the coefficients of every kernel and mode found in the reports."""
+        rng = np.random.default_rng(seed)
+        self.models = {}
+        if "nmc_instances" not in reports.columns:
+            reports = reports.assign(nmc_instances=1)
+        for (kernel, mode, num_instances), df in reports.groupby(["kernel_name", "memory_type", "nmc_instances"]):
+            terms = CYCLE_TERMS.get(kernel, DEFAULT_TERMS)
+            try:
+                X = np.array([self.get_features(terms, r.data_type, r.num_outs, r.kernel_params) for r in df.itertuples()])
+            except (NameError, KeyError) as e:
+                print(f"WARNING: skipping kernel '{kernel}' ({mode}): missing parameter {e}", file=sys.stderr)
+                continue
+            y = df["cycles"].to_numpy(dtype=float)
+
+            # Held-out error (needs a few samples on each side)
+            error = max_error = None
+            num_test = int(round(holdout * len(y)))
+            if num_test >= 1 and len(y) - num_test >= 2:
+                order = rng.permutation(len(y))
+                test, train = order[:num_test], order[num_test:]
+                reg = LinearRegression(positive=True).fit(X[train], y[train])
+                rel = np.abs(reg.predict(X[test]) - y[test]) / np.maximum(y[test], 1.0)
+                error, max_error = float(rel.mean()), float(rel.max())
+
+            # Final fit on all the samples
+            reg = LinearRegression(positive=True).fit(X, y)
+            self.models[self.get_key(kernel, mode, int(num_instances))] = {
+                "terms": terms,
+                "intercept": float(reg.intercept_),
+                "coef": reg.coef_.tolist(),
+                "error": error,
+                "max_error": max_error,
+                "num_samples": len(y),
+            }
+
+    # Predict the cycles of a test
+    def predict(self, kernel: str, mode: str, data_type: str, num_outs: int, kernel_params: str, num_instances: int = 1) -> float:
+        """Predict the execution cycles of a kernel in the given mode."""
+        model = self.models.get(self.get_key(kernel, mode, num_instances))
+        if model is None:
+            raise KeyError(f"no cycle model for kernel '{kernel}' ({mode}, {num_instances} instances)")
+        x = self.get_features(model["terms"], data_type, num_outs, kernel_params)
+        return max(0.0, model["intercept"] + float(np.dot(model["coef"], x)))
+
+    # Predict the execution time of a test
+    def predict_us(self, kernel: str, mode: str, data_type: str, num_outs: int, kernel_params: str, num_instances: int = 1) -> float:
+        """Predict the execution time of a kernel in microseconds."""
+        return self.predict(kernel, mode, data_type, num_outs, kernel_params, num_instances) * self.clock_period_ns * 1e-3
+
+    # Check whether a kernel is predicted accurately
+    def is_trusted(self, kernel: str, mode: str, max_error: float, num_instances: int = 1) -> bool:
+        """Check whether the held-out error of a kernel is known and below 'max_error'."""
+        model = self.models.get(self.get_key(kernel, mode, num_instances))
+        return model is not None and model["error"] is not None and model["max_error"] <= max_error
+
+    # Predict the report entries of a test
+    def predict_test(self, test_data: dict, max_error: float) -> list:
+        """Predict the throughput report entries of a test (CPU and NMC), or None if not accurate enough."""
+        modes = ["cpu"] + ([test_data["memory_type"]] if test_data["memory_type"] != "cpu" else [])
+        num_instances = test_data.get("nmc_instances", 1)
+        if not all(self.is_trusted(test_data["kernel_name"], mode, max_error, num_instances) for mode in modes):
+            return None
+        rpt = {
+            "kernel_name": test_data["kernel_name"],
+            "data_type": test_data["data_type"],
+            "num_outs": test_data["num_outs"],
+            "kernel_params": test_data["kernel_params"],
+            "nmc_instances": num_instances,
+            "predicted": True,
+        }
+        return [dict(rpt, memory_type=mode, cycles=int(round(self.predict(rpt["kernel_name"], mode, rpt["data_type"], rpt["num_outs"], rpt["kernel_params"], num_instances)))) for mode in modes]
+
+    # Store the model
+    def save(self, model_file: str):
+        """Store the model as JSON."""
+        with open(model_file, "w") as f:
+            json.dump({"clock_period_ns": self.clock_period_ns, "models": self.models}, f, indent=1)
+
+    # Load the model
+    def load(self, model_file: str):
+        """Load a model."""
+        with open(model_file, "r") as f:
+            data = json.load(f)
+        self.clock_period_ns = data.get("clock_period_ns", self.clock_period_ns)
+        self.models = data["models"]
+
+    # Print the fit quality
+    def print_error(self, file=sys.stdout):
+        """Print the held-out error of each kernel and mode."""
+        for key, model in sorted(self.models.items()):
+            kernel, mode, *instances = key.split("|")
+            if instances:
+                mode = f"{mode}, {instances[0]} instances"
+            if model["error"] is None:
+                err = "not enough samples for a held-out error"
+            else:
+                err = f"{100 * model['error']:.1f}% mean, {100 * model['max_error']:.1f}% max held-out error"
+            print(f"    - {kernel} ({mode}, {model['num_samples']} samples): {err}", file=file)
+
+# Load throughput reports
+def load_reports(report_files: list) -> pd.DataFrame:
+    """Load and concatenate throughput CSV reports, keeping the last simulated result of each test.
+
+    Rows predicted by a previous model are skipped, so a model is never fitted on its own output.
+    """
+    df = pd.concat([pd.read_csv(f, sep=",", header=0, keep_default_na=False) for f in report_files], ignore_index=True)
+    df = df[pd.to_numeric(df["cycles"], errors="coerce").notna() & ~is_predicted(df)]
+    df = df.astype({"cycles": float, "num_outs": int})
+    df["nmc_instances"] = pd.to_numeric(df["nmc_instances"], errors="coerce").fillna(1).astype(int) if "nmc_instances" in df.columns else 1
+    return df.drop_duplicates(["memory_type", "kernel_name", "data_type", "num_outs", "kernel_params", "nmc_instances"], keep="last")
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Analytical cycle model of the benchmark kernels")
+    subparsers = cmd_parser.add_subparsers(dest="cmd", required=True)
+    fit_parser = subparsers.add_parser("fit", help="Fit the model on throughput reports")
+    fit_parser.add_argument("model",
+                            help="Output model (JSON)")
+    fit_parser.add_argument("reports",
+                            help="Throughput CSV reports",
+                            nargs="+")
+    fit_parser.add_argument("--holdout",
+                            help="Fraction of the simulations held out to measure the error.",
+                            type=float,
+                            default=0.2)
+    fit_parser.add_argument("--clock-period",
+                            help="Clock period in ns (default: SIM_CLK_PERIOD of tb/tb_top.sv).",
+                            type=float)
+    pred_parser = subparsers.add_parser("predict", help="Predict the cycles of a test")
+    pred_parser.add_argument("model",
+                             help="Model (JSON)")
+    pred_parser.add_argument("--nmc-instances",
+                             help="Number of NMC instances the kernel is split across.",
+                             type=int,
+                             default=1)
+    pred_parser.add_argument("test",
+                             help="Test, in the test list format (e.g., carus-gemm int8 8192 --row_a 8 --col_a 8 --col_b 1024)",
+                             nargs=argparse.REMAINDER)
+    args = cmd_parser.parse_args()
+
+    if args.cmd == "fit":
+        # Fit the model
+        clock_period_ns = args.clock_period if args.clock_period is not None else get_clock_period_ns(os.getcwd())
+        model = cycle_model(clock_period_ns=clock_period_ns)
+        model.fit(load_reports(args.reports), args.holdout)
+        model.save(args.model)
+        print(f"### Cycle model ({clock_period_ns:g} ns clock period):")
+        model.print_error()
+    else:
+        # Predict a test
+        if len(args.test) < 3:
+            cmd_parser.error("the test must include the benchmark, data type, and number of outputs")
+        model = cycle_model(args.model)
+        app_name, data_type, num_outs = args.test[:3]
+        kernel_params = " ".join(args.test[3:])
+        memory_type, kernel = os.path.basename(app_name).split("-", 1)
+        for mode in ["cpu"] + ([memory_type] if memory_type != "cpu" else []):
+            cycles = model.predict(kernel, mode, data_type, int(num_outs), kernel_params, args.nmc_instances)
+            print(f"{mode}: {cycles:.0f} cycles, {model.predict_us(kernel, mode, data_type, int(num_outs), kernel_params, args.nmc_instances):.2f} us")
+
+    sys.exit(0)
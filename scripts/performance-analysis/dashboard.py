@@ -0,0 +1,485 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: dashboard.py
+# Date: 17/10/2026
+# Description: Self-contained HTML dashboard of the benchmark campaign results
+
+import argparse
+import sys
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from cycle_model import get_clock_period_ns, is_predicted
+from energy_analysis import energy_analysis
+from power_rollup import POWER_METRICS
+from results_store import results_store
+
+# Columns of the summary table (the confidence intervals are added to each metric)
+SUMMARY_METRICS = [
+    "cycles_per_output",
+    "throughput_gain",
+    "power",
+    "energy_per_output",
+    "energy_gain",
+    "edp_gain",
+]
+
+# Power breakdown: each total split into its categories (the remainder is
+# reported as 'other')
+POWER_HIERARCHY = {
+    "sys_pwr": ["sys_cpu_pwr", "sys_mem_pwr", "sys_peri_pwr"],
+    "nmc_pwr": ["nmc_ctl_pwr", "nmc_comp_pwr", "nmc_mem_pwr"],
+}
+
+# Encode a data frame in columnar form
+def encode_columns(df: pd.DataFrame, float_digits: int = 6) -> dict:
+    """Encode each column as a list of values; string columns are dictionary-encoded.
+
+    Floating-point values are rounded to 'float_digits' significant digits
+    and missing values are encoded as null.
+    """
+    table = {"length": len(df), "columns": {}}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            arr = values.to_numpy(dtype=float)
+            data = [None if not np.isfinite(v) else float(f"{v:.{float_digits}g}") for v in arr]
+            data = [int(v) if v is not None and v.is_integer() and abs(v) < 2**53 else v for v in data]
+            table["columns"][col] = {"values": data}
+        else:
+            codes, uniques = pd.factorize(values.astype(str), sort=True)
+            table["columns"][col] = {"dict": uniques.tolist(), "codes": codes.tolist()}
+    return table
+
+# Test label
+def get_test_label(df: pd.DataFrame) -> pd.Series:
+    """Identify tests as '<kernel> <data type> <kernel parameters>', with ' xN' on N NMC instances."""
+    labels = df["kernel_name"].astype(str) + " " + df["data_type"].astype(str) + " " + df["kernel_params"].fillna("").astype(str)
+    instances = df["nmc_instances"] if "nmc_instances" in df.columns else pd.Series(1, index=df.index)
+    instances = pd.to_numeric(instances, errors="coerce").fillna(1).astype(int)
+    return labels.str.strip() + (" x" + instances.astype(str)).where(instances > 1, "")
+
+class dashboard:
+    """Benchmark dashboard generated from campaign results.
+
+    The dashboard is a single HTML file that needs no server. It embeds:
+    - the energy analysis of the latest revision (see energy_analysis.py),
+      shown as a filterable, sortable table, where the tests whose cycles
+      were predicted by the cycle model are marked;
+    - every throughput and power run, dictionary-encoded by column, from
+      which the page draws the trend of each test across git revisions;
+    - the power breakdown of each test of the latest revision, following
+      the categories of power_rollup.py.
+    """
+
+    # Initialize dashboard properties
+    def __init__(self, thr_df: pd.DataFrame, pwr_df: pd.DataFrame, clock_period_ns: float = 10.0):
+        self.thr_df = self.normalize(thr_df)
+        self.pwr_df = self.normalize(pwr_df)
+        for col in POWER_METRICS:
+            if col not in self.pwr_df.columns:
+                self.pwr_df[col] = np.nan
+        self.clock_period_ns = clock_period_ns
+
+    # Fill the columns of reports without run information
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Tag CSV reports as a single run of the local checkout."""
+        df = df.copy()
+        for col, default in [("git_rev", "local"), ("campaign", "local"), ("time", time.time()), ("hw_config", "")]:
+            if col not in df.columns:
+                df[col] = default
+        df["kernel_params"] = df["kernel_params"].fillna("").astype(str)
+        return df
+
+    # Revisions, oldest first
+    def get_revisions(self) -> pd.DataFrame:
+        """Order the git revisions by the time of their first run."""
+        runs = pd.concat([self.thr_df[["git_rev", "time"]], self.pwr_df[["git_rev", "time"]]], ignore_index=True)
+        revs = runs.groupby("git_rev")["time"].min().sort_values().reset_index()
+        revs["date"] = pd.to_datetime(revs["time"], unit="s").dt.strftime("%Y-%m-%d %H:%M")
+        return revs
+
+    # Summary of the latest revision
+    def get_summary(self, git_rev: str) -> pd.DataFrame:
+        """Energy analysis of the runs of 'git_rev'."""
+        thr = self.thr_df[self.thr_df["git_rev"] == git_rev]
+        pwr = self.pwr_df[self.pwr_df["git_rev"] == git_rev]
+        if thr.empty:
+            return pd.DataFrame(columns=["test", "memory_type"] + SUMMARY_METRICS)
+        df = energy_analysis(self.clock_period_ns).analyse(thr, pwr)
+        df.insert(0, "test", get_test_label(df))
+        columns = ["test", "kernel_name", "data_type", "memory_type", "num_outs", "predicted"]
+        for metric in SUMMARY_METRICS:
+            columns += [metric, f"{metric}_ci"]
+        return df[columns]
+
+    # Power breakdown of the latest revision
+    def get_breakdown(self, git_rev: str) -> pd.DataFrame:
+        """Mean power of each category, with the part of each total not covered by its categories."""
+        pwr = self.pwr_df[self.pwr_df["git_rev"] == git_rev].copy()
+        pwr["test"] = get_test_label(pwr)
+        df = pwr.groupby(["test", "memory_type"], sort=True)[POWER_METRICS].mean().reset_index()
+        for total, parts in POWER_HIERARCHY.items():
+            df[total.replace("_pwr", "_other_pwr")] = (df[total] - df[parts].sum(axis=1)).clip(lower=0.0)
+        return df
+
+    # Runs of each test
+    def get_runs(self) -> tuple:
+        """Throughput and power runs, reduced to the columns the trends need."""
+        thr = self.thr_df[pd.to_numeric(self.thr_df["cycles"], errors="coerce").notna()]
+        thr = pd.DataFrame({
+            "test": get_test_label(thr),
+            "memory_type": thr["memory_type"],
+            "git_rev": thr["git_rev"],
+            "cycles_per_output": thr["cycles"].astype(float) / thr["num_outs"].astype(float),
+            "predicted": is_predicted(thr),
+        })
+        pwr = pd.DataFrame({
+            "test": get_test_label(self.pwr_df),
+            "memory_type": self.pwr_df["memory_type"],
+            "git_rev": self.pwr_df["git_rev"],
+            "power": self.pwr_df["sys_pwr"] + self.pwr_df["nmc_pwr"],
+        })
+        return thr, pwr
+
+    # Embedded data
+    def get_data(self) -> dict:
+        """Collect all the tables embedded in the page."""
+        revs = self.get_revisions()
+        latest = revs["git_rev"].iloc[-1] if not revs.empty else None
+        thr_runs, pwr_runs = self.get_runs()
+        return {
+            "generated": time.strftime("%Y-%m-%d %H:%M"),
+            "latest": latest,
+            "revisions": encode_columns(revs[["git_rev", "date"]]),
+            "summary": encode_columns(self.get_summary(latest)),
+            "breakdown": encode_columns(self.get_breakdown(latest)),
+            "throughput_runs": encode_columns(thr_runs),
+            "power_runs": encode_columns(pwr_runs),
+            "power_hierarchy": POWER_HIERARCHY,
+        }
+
+    # Write the dashboard
+    def write(self, out_file: str, title: str = "HEEPtimize benchmark dashboard"):
+        """Write the self-contained HTML page."""
+        # '</' cannot appear inside a <script> element
+        data = json.dumps(self.get_data(), separators=(",", ":")).replace("</", "<\\/")
+        html = HTML_TEMPLATE.replace("@TITLE@", title).replace("@DATA@", data)
+        with open(out_file, "w") as f:
+            f.write(html)
+
+# Page template: vanilla JavaScript and inline SVG, no external resources
+HTML_TEMPLATE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>@TITLE@</title>
+<style>
+body { font-family: sans-serif; margin: 1.5em; color: #3d3d3d; }
+h1 { font-size: 1.4em; } h2 { font-size: 1.15em; margin-top: 2em; color: #6d1a36; }
+table { border-collapse: collapse; font-size: 0.85em; }
+th, td { border-bottom: 1px solid #ddd; padding: 3px 8px; text-align: right; white-space: nowrap; }
+th { cursor: pointer; background: #f3f3f3; position: sticky; top: 0; }
+td.text, th.text { text-align: left; }
+.ci { color: #999; font-size: 0.85em; }
+.pred { color: #c77d00; font-size: 0.85em; }
+.controls { margin: 0.6em 0; }
+.controls input, .controls select { margin-right: 1em; }
+.scroll { max-height: 32em; overflow-y: auto; display: inline-block; }
+.legend span { display: inline-block; margin-right: 1em; font-size: 0.85em; }
+.legend i { display: inline-block; width: 0.9em; height: 0.9em; margin-right: 0.3em; vertical-align: middle; }
+svg text { font-size: 11px; fill: #3d3d3d; }
+</style>
+</head>
+<body>
+<h1>@TITLE@</h1>
+<p id="info"></p>
+
+<h2>Throughput and energy (latest revision)</h2>
+<div class="controls">
+  Filter: <input id="sum-filter" placeholder="kernel, data type, parameters">
+  Memory type: <select id="sum-mode"><option value="">all</option></select>
+</div>
+<div class="scroll"><table id="sum-table"></table></div>
+
+<h2>Trends across revisions</h2>
+<div class="controls">
+  Test: <select id="trend-test"></select>
+  Metric: <select id="trend-metric">
+    <option value="cycles_per_output">cycles per output</option>
+    <option value="power">power [mW]</option>
+  </select>
+</div>
+<div id="trend-chart"></div>
+
+<h2>Power breakdown (latest revision)</h2>
+<div class="controls">Filter: <input id="pwr-filter" placeholder="kernel, data type, parameters"></div>
+<div class="legend" id="pwr-legend"></div>
+<div class="scroll"><table id="pwr-table"></table></div>
+
+<script>
+const DATA = @DATA@;
+const MODE_COLORS = { cpu: "#434343", carus: "#007480", caesar: "#6d1a36", cgra: "#c77d00" };
+const PWR_COLORS = ["#434343", "#6b6b6b", "#939393", "#bbbbbb", "#007480", "#3a98a1", "#74bcc2", "#b0dde0"];
+
+// Decode a columnar table into an array of rows
+function rows(table) {
+  const names = Object.keys(table.columns);
+  const out = new Array(table.length);
+  for (let i = 0; i < table.length; i++) {
+    const row = {};
+    for (const n of names) {
+      const c = table.columns[n];
+      row[n] = c.dict ? c.dict[c.codes[i]] : c.values[i];
+    }
+    out[i] = row;
+  }
+  return out;
+}
+
+function fmt(v, digits = 4) {
+  if (v === null || v === undefined) return "-";
+  if (typeof v !== "number") return v;
+  if (v !== 0 && (Math.abs(v) < 1e-3 || Math.abs(v) >= 1e6)) return v.toExponential(digits - 1);
+  return Number(v.toPrecision(digits)).toString();
+}
+
+function el(tag, attrs = {}, text) {
+  const e = document.createElement(tag);
+  for (const [k, v] of Object.entries(attrs)) e.setAttribute(k, v);
+  if (text !== undefined) e.textContent = text;
+  return e;
+}
+
+function svg(tag, attrs = {}, text) {
+  const e = document.createElementNS("http://www.w3.org/2000/svg", tag);
+  for (const [k, v] of Object.entries(attrs)) e.setAttribute(k, v);
+  if (text !== undefined) e.textContent = text;
+  return e;
+}
+
+function matches(row, filter) {
+  return !filter || row.test.toLowerCase().includes(filter.toLowerCase()) || row.memory_type.includes(filter);
+}
+
+// Summary table
+const summary = rows(DATA.summary);
+const SUM_COLS = [
+  ["test", "test"], ["memory_type", "mode"], ["num_outs", "outputs"],
+  ["cycles_per_output", "cycles/output"], ["throughput_gain", "throughput gain"],
+  ["power", "power [W]"], ["energy_per_output", "energy/output [J]"],
+  ["energy_gain", "energy gain"], ["edp_gain", "EDP gain"],
+];
+let sumSort = { key: "test", dir: 1 };
+function drawSummary() {
+  const filter = document.getElementById("sum-filter").value;
+  const mode = document.getElementById("sum-mode").value;
+  const table = document.getElementById("sum-table");
+  table.replaceChildren();
+  const head = el("tr");
+  for (const [key, label] of SUM_COLS) {
+    const th = el("th", { class: typeof summary[0]?.[key] === "string" ? "text" : "" }, label + (sumSort.key === key ? (sumSort.dir > 0 ? " ▲" : " ▼") : ""));
+    th.onclick = () => { sumSort = { key, dir: sumSort.key === key ? -sumSort.dir : 1 }; drawSummary(); };
+    head.appendChild(th);
+  }
+  table.appendChild(head);
+  const sel = summary.filter(r => matches(r, filter) && (!mode || r.memory_type === mode));
+  sel.sort((a, b) => {
+    const x = a[sumSort.key], y = b[sumSort.key];
+    if (x === y) return 0;
+    if (x === null) return 1;
+    if (y === null) return -1;
+    return (x < y ? -1 : 1) * sumSort.dir;
+  });
+  for (const r of sel) {
+    const tr = el("tr");
+    for (const [key] of SUM_COLS) {
+      const td = el("td", { class: typeof r[key] === "string" ? "text" : "" }, fmt(r[key]));
+      const ci = r[key + "_ci"];
+      if (ci) td.appendChild(el("span", { class: "ci" }, " ±" + fmt(ci, 2)));
+      if (key === "test" && r.predicted === "True") td.appendChild(el("span", { class: "pred", title: "cycles predicted by the cycle model, not simulated" }, " predicted"));
+      tr.appendChild(td);
+    }
+    table.appendChild(tr);
+  }
+}
+
+// Trends: mean of the runs of each revision (hollow points include runs predicted by the cycle model)
+const revisions = rows(DATA.revisions);
+const runs = { cycles_per_output: rows(DATA.throughput_runs), power: rows(DATA.power_runs) };
+function drawTrend() {
+  const test = document.getElementById("trend-test").value;
+  const metric = document.getElementById("trend-metric").value;
+  const scale = metric === "power" ? 1000 : 1;
+  const revIndex = new Map(revisions.map((r, i) => [r.git_rev, i]));
+  const series = {};
+  for (const r of runs[metric]) {
+    if (r.test !== test || r[metric] === null) continue;
+    const s = (series[r.memory_type] ??= {});
+    const i = revIndex.get(r.git_rev);
+    (s[i] ??= []).push(r[metric] * scale);
+    if (r.predicted === "True") (s.predicted ??= new Set()).add(i);
+  }
+  const W = 900, H = 300, L = 70, R = 110, T = 15, B = 45;
+  const chart = svg("svg", { width: W, height: H });
+  const points = Object.entries(series).map(([mode, s]) =>
+    [mode, Object.entries(s).filter(([i]) => i !== "predicted").map(([i, v]) => [Number(i), v.reduce((a, b) => a + b, 0) / v.length, v.length, s.predicted?.has(Number(i)) ?? false]).sort((a, b) => a[0] - b[0])]);
+  const values = points.flatMap(([, p]) => p.map(q => q[1]));
+  const holder = document.getElementById("trend-chart");
+  holder.replaceChildren();
+  if (!values.length) { holder.textContent = "No runs of this test."; return; }
+  let lo = Math.min(...values), hi = Math.max(...values);
+  if (lo === hi) { lo *= 0.9; hi = hi * 1.1 || 1; }
+  const pad = (hi - lo) * 0.08; lo = Math.max(0, lo - pad); hi += pad;
+  const n = Math.max(revisions.length - 1, 1);
+  const x = i => L + (W - L - R) * (revisions.length > 1 ? i / n : 0.5);
+  const y = v => T + (H - T - B) * (1 - (v - lo) / (hi - lo));
+  chart.appendChild(svg("line", { x1: L, y1: H - B, x2: W - R, y2: H - B, stroke: "#999" }));
+  chart.appendChild(svg("line", { x1: L, y1: T, x2: L, y2: H - B, stroke: "#999" }));
+  for (let k = 0; k <= 4; k++) {
+    const v = lo + (hi - lo) * k / 4;
+    chart.appendChild(svg("line", { x1: L, y1: y(v), x2: W - R, y2: y(v), stroke: "#eee" }));
+    chart.appendChild(svg("text", { x: L - 5, y: y(v) + 4, "text-anchor": "end" }, fmt(v, 3)));
+  }
+  const step = Math.ceil(revisions.length / 12);
+  revisions.forEach((r, i) => {
+    if (i % step) return;
+    const t = svg("text", { x: x(i), y: H - B + 14, "text-anchor": "middle" }, r.git_rev.slice(0, 8));
+    t.appendChild(svg("title", {}, r.git_rev + " (" + r.date + ")"));
+    chart.appendChild(t);
+  });
+  points.forEach(([mode, p], k) => {
+    const color = MODE_COLORS[mode] || PWR_COLORS[k % PWR_COLORS.length];
+    chart.appendChild(svg("polyline", { points: p.map(q => x(q[0]) + "," + y(q[1])).join(" "), fill: "none", stroke: color, "stroke-width": 2 }));
+    for (const [i, v, count, predicted] of p) {
+      const c = svg("circle", { cx: x(i), cy: y(v), r: 3.5, fill: predicted ? "#fff" : color, stroke: color });
+      c.appendChild(svg("title", {}, mode + " @ " + revisions[i].git_rev.slice(0, 12) + ": " + fmt(v) + " (" + count + " runs" + (predicted ? ", predicted" : "") + ")"));
+      chart.appendChild(c);
+    }
+    chart.appendChild(svg("text", { x: W - R + 10, y: T + 14 * (k + 1), fill: color }, mode));
+  });
+  holder.appendChild(chart);
+}
+
+// Power breakdown: one stacked bar per test and memory type
+const breakdown = rows(DATA.breakdown);
+const PWR_PARTS = Object.entries(DATA.power_hierarchy).flatMap(([total, parts]) => [...parts, total.replace("_pwr", "_other_pwr")]);
+function drawBreakdown() {
+  const filter = document.getElementById("pwr-filter").value;
+  const table = document.getElementById("pwr-table");
+  table.replaceChildren();
+  const sel = breakdown.filter(r => matches(r, filter));
+  const max = Math.max(...sel.map(r => PWR_PARTS.reduce((a, p) => a + (r[p] || 0), 0)), 1e-12);
+  const head = el("tr");
+  for (const label of ["test", "mode", "total [mW]", ""]) head.appendChild(el("th", { class: "text" }, label));
+  table.appendChild(head);
+  const W = 500;
+  for (const r of sel) {
+    const tr = el("tr");
+    tr.appendChild(el("td", { class: "text" }, r.test));
+    tr.appendChild(el("td", { class: "text" }, r.memory_type));
+    const total = PWR_PARTS.reduce((a, p) => a + (r[p] || 0), 0);
+    tr.appendChild(el("td", {}, fmt(total * 1000)));
+    const bar = svg("svg", { width: W, height: 14 });
+    let offset = 0;
+    PWR_PARTS.forEach((p, k) => {
+      const w = (r[p] || 0) / max * W;
+      if (w <= 0) return;
+      const rect = svg("rect", { x: offset, y: 1, width: w, height: 12, fill: PWR_COLORS[k % PWR_COLORS.length] });
+      rect.appendChild(svg("title", {}, p + ": " + fmt(r[p] * 1000) + " mW (" + fmt(100 * r[p] / total, 3) + "%)"));
+      bar.appendChild(rect);
+      offset += w;
+    });
+    const td = el("td", { class: "text" });
+    td.appendChild(bar);
+    tr.appendChild(td);
+    table.appendChild(tr);
+  }
+}
+
+// Set up the controls
+document.getElementById("info").textContent =
+  "Latest revision: " + (DATA.latest || "-") + " — " + revisions.length + " revisions, " +
+  DATA.throughput_runs.length + " throughput runs, " + DATA.power_runs.length + " power runs — generated " + DATA.generated;
+const modeSel = document.getElementById("sum-mode");
+for (const m of [...new Set(summary.map(r => r.memory_type))].sort()) modeSel.appendChild(el("option", { value: m }, m));
+// Power tests may use other kernel parameters than throughput tests
+const testSel = document.getElementById("trend-test");
+function fillTests() {
+  const metric = document.getElementById("trend-metric").value;
+  const current = testSel.value;
+  const tests = [...new Set(runs[metric].map(r => r.test))].sort();
+  testSel.replaceChildren();
+  for (const t of tests) testSel.appendChild(el("option", { value: t }, t));
+  if (tests.includes(current)) testSel.value = current;
+}
+fillTests();
+const legend = document.getElementById("pwr-legend");
+PWR_PARTS.forEach((p, k) => {
+  const s = el("span", {}, p.replace("_pwr", ""));
+  s.prepend(el("i", { style: "background:" + PWR_COLORS[k % PWR_COLORS.length] }));
+  legend.appendChild(s);
+});
+document.getElementById("sum-filter").oninput = drawSummary;
+modeSel.onchange = drawSummary;
+testSel.onchange = drawTrend;
+document.getElementById("trend-metric").onchange = () => { fillTests(); drawTrend(); };
+document.getElementById("pwr-filter").oninput = drawBreakdown;
+drawSummary();
+drawTrend();
+drawBreakdown();
+</script>
+</body>
+</html>
+"""
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Generate an HTML dashboard of the benchmark results")
+    cmd_parser.add_argument("out_file",
+                            help="Output HTML file")
+    cmd_parser.add_argument("--results-store",
+                            help="Results store with the history of the campaigns.")
+    cmd_parser.add_argument("--throughput", "-t",
+                            help="Throughput CSV reports, added as runs of the local checkout.",
+                            nargs="+",
+                            default=[])
+    cmd_parser.add_argument("--power", "-p",
+                            help="Power CSV reports, added as runs of the local checkout.",
+                            nargs="+",
+                            default=[])
+    cmd_parser.add_argument("--title",
+                            help="Page title.",
+                            default="HEEPtimize benchmark dashboard")
+    cmd_parser.add_argument("--clock-period",
+                            help="Clock period in ns (default: SIM_CLK_PERIOD of tb/tb_top.sv).",
+                            type=float)
+    args = cmd_parser.parse_args()
+
+    # Load the results
+    thr_frames, pwr_frames = [], []
+    if args.results_store is not None:
+        store = results_store(args.results_store)
+        thr_frames.append(store.load("throughput"))
+        pwr_frames.append(store.load("power"))
+    thr_frames += [pd.read_csv(f, sep=",", header=0, keep_default_na=False) for f in args.throughput]
+    pwr_frames += [pd.read_csv(f, sep=",", header=0, keep_default_na=False) for f in args.power]
+    thr_frames = [f for f in thr_frames if not f.empty]
+    pwr_frames = [f for f in pwr_frames if not f.empty]
+    if not thr_frames:
+        cmd_parser.error("no throughput results: give --results-store or --throughput")
+    thr_df = pd.concat(thr_frames, ignore_index=True)
+    pwr_df = pd.concat(pwr_frames, ignore_index=True) if pwr_frames else \
+        pd.DataFrame(columns=["memory_type", "kernel_name", "data_type", "num_outs", "kernel_params"] + POWER_METRICS)
+
+    # Generate the dashboard
+    clock_period_ns = args.clock_period if args.clock_period is not None else get_clock_period_ns(os.getcwd())
+    dash = dashboard(thr_df, pwr_df, clock_period_ns)
+    dash.write(args.out_file, args.title)
+    print(f"### Dashboard of {len(thr_df)} throughput and {len(pwr_df)} power runs written to '{args.out_file}'")
+
+    sys.exit(0)
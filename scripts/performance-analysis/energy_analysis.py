@@ -0,0 +1,238 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: energy_analysis.py
+# Date: 17/10/2026
+# Description: Throughput gain, energy per output, and EDP of the benchmarks with confidence intervals
+
+import argparse
+import sys
+import os
+import numpy as np
+import pandas as pd
+from scipy import stats
+from cycle_model import get_clock_period_ns, is_predicted
+from results_store import results_store
+
+# Columns identifying a test in the throughput reports (the number of NMC
+# instances is 1 in the reports written before multi-instance support)
+TEST_KEY = ["memory_type", "kernel_name", "data_type", "kernel_params", "nmc_instances"]
+
+# Columns matching a power result to a throughput result. The power test
+# lists use smaller problem sizes than the throughput ones (the average power
+# of a kernel does not depend on its size, to first order), so the kernel
+# parameters are only matched on request.
+POWER_KEY = ["memory_type", "kernel_name", "data_type", "nmc_instances"]
+
+# Reference execution mode of the gains
+REFERENCE_MODE = "cpu"
+
+# Output metrics, with the measurement their number of runs comes from
+METRIC_SOURCES = {
+    "cycles_per_output": "cycles_per_output",
+    "power": "power",
+    "energy_per_output": "energy",
+    "edp": "energy",
+    "throughput_gain": "cycles_per_output",
+    "energy_gain": "energy",
+    "edp_gain": "energy",
+}
+
+# Fill the key columns of older reports
+def normalize_key(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize the kernel parameters and the number of NMC instances of a report."""
+    df = df.copy()
+    df["kernel_params"] = df["kernel_params"].fillna("").astype(str)
+    instances = df["nmc_instances"] if "nmc_instances" in df.columns else pd.Series(1, index=df.index)
+    df["nmc_instances"] = pd.to_numeric(instances, errors="coerce").fillna(1).astype(int)
+    return df
+
+# Mean, standard error, and number of samples of a metric
+def get_stats(df: pd.DataFrame, key: list, metric: str) -> pd.DataFrame:
+    """Aggregate the repeated runs of each key."""
+    grouped = df.groupby(key, dropna=False, sort=False)[metric]
+    out = grouped.agg(["mean", "std", "count"]).reset_index()
+    out = out.rename(columns={"mean": metric, "count": f"{metric}_runs"})
+    # A single run has no measurable spread
+    out[f"{metric}_se"] = (out.pop("std") / np.sqrt(out[f"{metric}_runs"])).fillna(0.0)
+    return out
+
+# Relative standard error of a product or ratio of independent metrics
+def get_rel_se(df: pd.DataFrame, metrics: list, powers: list = None) -> pd.Series:
+    """First-order propagation of the standard errors of prod(metric ** power)."""
+    powers = powers or [1] * len(metrics)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = [(p * df[f"{m}_se"] / df[m].abs()) ** 2 for m, p in zip(metrics, powers)]
+    return np.sqrt(sum(terms))
+
+class energy_analysis:
+    """Energy efficiency of the benchmark applications.
+
+    The throughput and power results are first aggregated over the repeated
+    runs of each test (mean and standard error), then joined on their key
+    columns, so the order of the reports and missing tests do not matter.
+    For each test and execution mode the analysis computes:
+    - cycles_per_output: cycles per output sample;
+    - power: total average power (system + NMC), in W;
+    - energy_per_output: energy per output sample, in J;
+    - edp: energy-delay product per output sample, in J*s;
+    - throughput_gain, energy_gain, edp_gain: improvement with respect to
+      the CPU running the same kernel, data type, and parameters, on the
+      same hardware configuration (number of NMC instances).
+    Tests whose cycles were predicted by the cycle model (cycle_model.py)
+    instead of simulated are flagged in the 'predicted' column.
+    Every metric comes with a '<metric>_ci' column, the half-width of its
+    confidence interval. Standard errors are propagated to the derived
+    metrics at first order, assuming independent measurements, and scaled by
+    the Student t quantile of the smallest number of runs involved. Tests run
+    once have no measurable spread, and a zero-width interval.
+    """
+
+    # Initialize analysis properties
+    def __init__(self, clock_period_ns: float = 10.0, confidence: float = 0.95, match_params: bool = False):
+        self.clock_period_ns = clock_period_ns
+        self.confidence = confidence
+        self.power_key = POWER_KEY + (["kernel_params"] if match_params else [])
+
+    # Confidence interval half-width
+    def get_ci(self, se: pd.Series, runs: pd.Series) -> pd.Series:
+        """Scale standard errors by the Student t quantile for 'runs' samples."""
+        dof = np.maximum(runs.to_numpy(dtype=float) - 1, 1)
+        return se * stats.t.ppf(0.5 + self.confidence / 2, dof)
+
+    # Aggregate the throughput results
+    def get_throughput(self, thr_df: pd.DataFrame) -> pd.DataFrame:
+        """Cycles per output sample of each test, over its repeated runs.
+
+        A test is flagged as 'predicted' if any of its runs comes from the cycle model.
+        """
+        df = normalize_key(thr_df[pd.to_numeric(thr_df["cycles"], errors="coerce").notna()])
+        df["cycles_per_output"] = df["cycles"].astype(float) / df["num_outs"].astype(float)
+        df["predicted"] = is_predicted(df)
+        out = get_stats(df, TEST_KEY, "cycles_per_output")
+        info = df.groupby(TEST_KEY, dropna=False, sort=False).agg(num_outs=("num_outs", "first"), predicted=("predicted", "any")).reset_index()
+        return out.merge(info, on=TEST_KEY)
+
+    # Aggregate the power results
+    def get_power(self, pwr_df: pd.DataFrame) -> pd.DataFrame:
+        """Total average power of each test, over its repeated runs."""
+        df = normalize_key(pwr_df)
+        df["power"] = df["sys_pwr"].astype(float) + df["nmc_pwr"].astype(float)
+        return get_stats(df, self.power_key, "power")
+
+    # Analyse the results
+    def analyse(self, thr_df: pd.DataFrame, pwr_df: pd.DataFrame) -> pd.DataFrame:
+        """Join the throughput and power results and compute the derived metrics.
+
+        Tests without power results are kept, with undefined energy metrics.
+        """
+        df = self.get_throughput(thr_df).merge(self.get_power(pwr_df), on=self.power_key, how="left")
+        period = self.clock_period_ns * 1e-9
+
+        # Energy and energy-delay product per output sample
+        df["energy_per_output"] = df["power"] * df["cycles_per_output"] * period
+        df["edp"] = df["energy_per_output"] * df["cycles_per_output"] * period
+        df["energy_per_output_se"] = df["energy_per_output"] * get_rel_se(df, ["power", "cycles_per_output"])
+        df["edp_se"] = df["edp"] * get_rel_se(df, ["power", "cycles_per_output"], [1, 2])
+
+        # Gains with respect to the CPU
+        metrics = ["cycles_per_output", "energy_per_output", "edp"]
+        ref = df[df["memory_type"] == REFERENCE_MODE][TEST_KEY[1:] + metrics + [f"{m}_se" for m in metrics]]
+        ref = ref.rename(columns={f"{m}{s}": f"{m}_ref{s}" for m in metrics for s in ["", "_se"]})
+        df = df.merge(ref, on=TEST_KEY[1:], how="left")
+        for gain, metric in zip(["throughput_gain", "energy_gain", "edp_gain"], metrics):
+            df[gain] = df[f"{metric}_ref"] / df[metric]
+            rel_se = get_rel_se(df, [metric, f"{metric}_ref"])
+            # The reference row is the test itself: the gain is exactly 1
+            df[f"{gain}_se"] = np.where(df["memory_type"] == REFERENCE_MODE, 0.0, df[gain] * rel_se)
+
+        # Confidence intervals, with the runs of the least repeated measurement involved
+        runs = {
+            "cycles_per_output": df["cycles_per_output_runs"],
+            "power": df["power_runs"].fillna(1),
+            # Single runs (e.g., of deterministic cycle counts) do not limit the degrees of freedom
+            "energy": pd.concat([df["cycles_per_output_runs"].where(df["cycles_per_output_runs"] > 1), df["power_runs"]], axis=1).min(axis=1).fillna(1),
+        }
+        for metric, source in METRIC_SOURCES.items():
+            df[f"{metric}_ci"] = self.get_ci(df[f"{metric}_se"], runs[source])
+
+        columns = TEST_KEY + ["num_outs", "predicted", "cycles_per_output_runs", "power_runs"]
+        for metric in METRIC_SOURCES:
+            columns += [metric, f"{metric}_ci"]
+        return df[columns].sort_values(["kernel_name", "data_type", "nmc_instances", "memory_type"]).reset_index(drop=True)
+
+# Load and concatenate CSV reports
+def load_reports(report_files: list) -> pd.DataFrame:
+    """Load CSV reports; each file (or repeated row) is a run of its tests."""
+    return pd.concat([pd.read_csv(f, sep=",", header=0, keep_default_na=False) for f in report_files], ignore_index=True)
+
+# Load the results of a revision from the results store
+def load_store(store: results_store, kind: str, git_rev: str = None) -> pd.DataFrame:
+    """Load all the runs of 'git_rev' (default: the revision of the latest campaign)."""
+    df = store.load(kind)
+    if df.empty:
+        raise ValueError(f"no {kind} results in '{store.store_dir}'")
+    if git_rev is None:
+        git_rev = df.sort_values("time")["git_rev"].iloc[-1]
+    df = df[df["git_rev"] == git_rev]
+    if df.empty:
+        raise ValueError(f"no {kind} results for revision '{git_rev}' in '{store.store_dir}'")
+    return df
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Compute the energy efficiency of the benchmark applications")
+    cmd_parser.add_argument("out_file",
+                            help="Output CSV file")
+    cmd_parser.add_argument("--throughput", "-t",
+                            help="Throughput CSV reports (repeated runs are aggregated).",
+                            nargs="+",
+                            default=[])
+    cmd_parser.add_argument("--power", "-p",
+                            help="Power CSV reports (repeated runs are aggregated).",
+                            nargs="+",
+                            default=[])
+    cmd_parser.add_argument("--results-store",
+                            help="Read the runs of a revision from this results store instead of CSV reports.")
+    cmd_parser.add_argument("--git-rev",
+                            help="Revision read from the results store (default: the one of the latest campaign).")
+    cmd_parser.add_argument("--match-params",
+                            help="Match power and throughput results on the kernel parameters too.",
+                            action="store_true")
+    cmd_parser.add_argument("--confidence",
+                            help="Confidence level of the intervals.",
+                            type=float,
+                            default=0.95)
+    cmd_parser.add_argument("--clock-period",
+                            help="Clock period in ns (default: SIM_CLK_PERIOD of tb/tb_top.sv).",
+                            type=float)
+    args = cmd_parser.parse_args()
+
+    # Load the results
+    if args.results_store is not None:
+        store = results_store(args.results_store)
+        thr_df = load_store(store, "throughput", args.git_rev)
+        pwr_df = load_store(store, "power", args.git_rev)
+    elif args.throughput and args.power:
+        thr_df = load_reports(args.throughput)
+        pwr_df = load_reports(args.power)
+    else:
+        cmd_parser.error("either --results-store or both --throughput and --power are required")
+
+    # Analyse
+    clock_period_ns = args.clock_period if args.clock_period is not None else get_clock_period_ns(os.getcwd())
+    analysis = energy_analysis(clock_period_ns, args.confidence, args.match_params)
+    df = analysis.analyse(thr_df, pwr_df)
+    missing = df[df["power"].isna()]
+    if not missing.empty:
+        print(f"WARNING: {len(missing)} throughput results without power results:", file=sys.stderr)
+        for r in missing.itertuples():
+            instances = f" ({r.nmc_instances} instances)" if r.nmc_instances > 1 else ""
+            print(f"    - {r.memory_type} {r.kernel_name} {r.data_type} {r.kernel_params}{instances}", file=sys.stderr)
+    if df["predicted"].any():
+        print(f"WARNING: {df['predicted'].sum()} tests with cycles predicted by the cycle model, not simulated", file=sys.stderr)
+    df.to_csv(args.out_file, index=False)
+    print(f"### Energy analysis of {len(df)} tests written to '{args.out_file}'")
+
+    sys.exit(0)
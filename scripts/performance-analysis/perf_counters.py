@@ -0,0 +1,87 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: perf_counters.py
+# Date: 17/10/2026
+# Description: Decoder of the performance counter records printed by the applications
+
+import argparse
+import sys
+import re
+
+# Performance counter record (see sw/external/lib/drivers/perf-cnt/perf_cnt.h)
+PERF_RECORD = re.compile(r"^@perf\s+(\w+)\s+(\w+)\s+(\d+)\s*$", re.MULTILINE)
+
+# Load phases: the transfer of the input data before the kernel runs, not
+# part of its total
+LOAD_PHASES = [
+    "flash",
+    "decompress",
+]
+
+# Standard phases, reported in the throughput CSV
+PERF_PHASES = [
+    "dma_in",
+    "compute",
+    "dma_out",
+    "tiling",
+] + LOAD_PHASES
+
+# Messages of the applications without performance counter records
+LEGACY_RECORDS = {
+    "carus": re.compile(r"- NM-Carus kernel execution time: (\d+) cycles\n"),
+    "cpu": re.compile(r"CPU: (\d+)\n"),
+}
+
+# Decode the performance counter records
+def decode_counters(sim_out: str) -> dict:
+    """Decode the per-phase cycle counters of each execution mode.
+
+    Return a dictionary mapping each mode to a dictionary of phase cycles.
+    Records with the same mode and phase are summed. If the 'total' phase is
+    known and 'tiling' is not reported, the tiling overhead is computed as
+    the part of the total not covered by the other phases (except the load
+    phases, which are not part of the total). Modes without
+    records fall back to the legacy messages, which only give the total.
+    """
+    counters: dict = {}
+    for mode, phase, cycles in PERF_RECORD.findall(sim_out):
+        phases = counters.setdefault(mode, {})
+        phases[phase] = phases.get(phase, 0) + int(cycles)
+
+    # Tiling overhead
+    for phases in counters.values():
+        if "total" in phases and "tiling" not in phases and len(phases) > 1:
+            phases["tiling"] = max(0, phases["total"] - sum(c for p, c in phases.items() if p != "total" and p not in LOAD_PHASES))
+
+    # Legacy messages
+    for mode, regex in LEGACY_RECORDS.items():
+        if mode not in counters:
+            match = regex.search(sim_out)
+            if match is not None:
+                counters[mode] = {"total": int(match.group(1))}
+    return counters
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Print the per-phase cycle breakdown of a simulation log")
+    cmd_parser.add_argument("log_file",
+                            help="Simulation output (e.g., UART log)")
+    args = cmd_parser.parse_args()
+
+    # Decode the log
+    with open(args.log_file, "r") as f:
+        counters = decode_counters(f.read())
+    if not counters:
+        print(f"ERROR: no performance counters found in '{args.log_file}'", file=sys.stderr)
+        sys.exit(1)
+    for mode, phases in counters.items():
+        total = phases.get("total")
+        print(f"### {mode}: {total if total is not None else '-'} cycles")
+        for phase, cycles in phases.items():
+            if phase != "total":
+                share = f" ({100 * cycles / total:.1f}%)" if total and phase not in LOAD_PHASES else ""
+                print(f"    - {phase}: {cycles}{share}")
+
+    sys.exit(0)
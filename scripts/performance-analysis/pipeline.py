@@ -0,0 +1,154 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: pipeline.py
+# Date: 17/10/2026
+# Description: Staged pipeline with bounded queues used by the test scheduler
+
+import sys
+import time
+import queue
+import threading
+
+# End-of-stream marker passed between stages
+_DONE = object()
+
+class pipeline_stage:
+    """Stage of a pipeline.
+
+    'func(slot, item)' is called on every item that reaches the stage, from one
+    of 'workers' threads. 'slot' is the index of the calling worker, so that
+    each worker can own private resources (e.g., a checkout or a run
+    directory). The return value is passed to the next stage. At most
+    'queue_size' items wait in front of the stage: when the queue is full, the
+    upstream stage blocks until a worker becomes free.
+    """
+
+    # Initialize stage properties
+    def __init__(self, name: str, func, workers: int = 1, queue_size: int = None):
+        if workers < 1:
+            raise ValueError(f"stage '{name}' needs at least one worker")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size if queue_size is not None else workers
+        self.reset()
+
+    # Reset the stage statistics
+    def reset(self):
+        """Reset the utilisation counters."""
+        self.busy_time = 0.0        # time spent in 'func'
+        self.blocked_time = 0.0     # time spent waiting for room downstream
+        self.num_items = 0
+        self.num_failed = 0
+
+class stage_pipeline:
+    """Pipeline of stages connected by bounded queues.
+
+    Items enter the first stage in order and leave the last stage in
+    completion order. When a stage raises an exception, the item is dropped
+    from the pipeline and reported with the error; the other items are not
+    affected. Utilisation statistics are collected for every stage.
+    """
+
+    # Initialize pipeline properties
+    def __init__(self, stages: list):
+        if not stages:
+            raise ValueError("a pipeline needs at least one stage")
+        self.stages = stages
+        self.wall_time = 0.0
+        self.lock = threading.Lock()
+
+    # Run the pipeline
+    def run(self, items: list, on_done):
+        """Push '(key, value)' pairs through the pipeline.
+
+        'on_done(key, result, error)' is called from the calling thread for
+        every item, with the output of the last stage or the exception that
+        stopped the item.
+        """
+        for stage in self.stages:
+            stage.reset()
+        queues = [queue.Queue(maxsize=max(1, s.queue_size)) for s in self.stages]
+        results = queue.Queue()
+        start = time.perf_counter()
+
+        # Stage worker: process items until the end-of-stream marker
+        def _worker(idx: int, slot: int):
+            stage = self.stages[idx]
+            out_queue = queues[idx + 1] if idx + 1 < len(self.stages) else results
+            while True:
+                entry = queues[idx].get()
+                if entry is _DONE:
+                    # Let the other workers of this stage see the marker too
+                    queues[idx].put(_DONE)
+                    return
+                key, value = entry
+                t0 = time.perf_counter()
+                try:
+                    value = stage.func(slot, value)
+                except Exception as e:
+                    with self.lock:
+                        stage.busy_time += time.perf_counter() - t0
+                        stage.num_items += 1
+                        stage.num_failed += 1
+                    results.put((key, None, e))
+                    continue
+                t1 = time.perf_counter()
+                out_queue.put((key, value, None) if out_queue is results else (key, value))
+                with self.lock:
+                    stage.busy_time += t1 - t0
+                    stage.blocked_time += time.perf_counter() - t1
+                    stage.num_items += 1
+
+        # Feed the first stage (blocks when its queue is full)
+        def _feeder():
+            for item in items:
+                queues[0].put(item)
+            queues[0].put(_DONE)
+
+        # Start the stage workers; when all the workers of a stage are done,
+        # forward the end-of-stream marker to the next stage
+        threads = []
+        for idx, stage in enumerate(self.stages):
+            workers = [threading.Thread(target=_worker, args=(idx, slot), name=f"{stage.name}-{slot}", daemon=True) for slot in range(stage.workers)]
+            threads.append(workers)
+            for w in workers:
+                w.start()
+        def _closer():
+            for idx, workers in enumerate(threads):
+                for w in workers:
+                    w.join()
+                if idx + 1 < len(self.stages):
+                    queues[idx + 1].put(_DONE)
+            results.put(_DONE)
+        feeder = threading.Thread(target=_feeder, daemon=True)
+        closer = threading.Thread(target=_closer, daemon=True)
+        feeder.start()
+        closer.start()
+
+        # Collect the results in the calling thread
+        while True:
+            entry = results.get()
+            if entry is _DONE:
+                break
+            on_done(*entry)
+        feeder.join()
+        closer.join()
+        self.wall_time = time.perf_counter() - start
+
+    # Print the utilisation of each stage
+    def print_utilisation(self, file=sys.stdout):
+        """Print the fraction of the wall time each stage spent busy, blocked, and idle."""
+        if self.wall_time == 0:
+            return
+        print(f"### Pipeline utilisation (wall time {self.wall_time:.1f} s):", file=file)
+        for stage in self.stages:
+            capacity = self.wall_time * stage.workers
+            busy = 100 * stage.busy_time / capacity
+            blocked = 100 * stage.blocked_time / capacity
+            idle = max(0.0, 100 - busy - blocked)
+            failed = f", {stage.num_failed} failed" if stage.num_failed > 0 else ""
+            print(f"    - {stage.name} ({stage.workers} worker{'s' if stage.workers > 1 else ''}, queue {stage.queue_size}): "
+                  f"{busy:.1f}% busy, {blocked:.1f}% blocked, {idle:.1f}% idle - {stage.num_items} tests{failed}", file=file)
@@ -11,24 +11,86 @@ import argparse
 import sys
 import os
 import test_scheduler as ts
+from build_cache import build_cache
+from results_store import results_store
+from regression import regression_checker, print_diff
+from power_estimator import power_estimator
 
 # Parse command line arguments
 cmd_parser = argparse.ArgumentParser(description="Test scheduler")
 cmd_parser.add_argument("cfg", 
-                        help="Configuration file")
+                        help="Test list, or sweep specification (.yaml, see sweep.py)")
 cmd_parser.add_argument("wave_dir",
                         help="Log directory.")
 cmd_parser.add_argument("report_csv",
                         help="Output power report CSV file.",
                         nargs="?",
                         default=f"{os.getcwd()}/power.csv")
+cmd_parser.add_argument("--power-jobs",
+                        help="Maximum number of concurrent PrimePower analyses.",
+                        type=int,
+                        default=1)
+cmd_parser.add_argument("--build-jobs",
+                        help="Number of concurrent firmware builds, each in its own worktree.",
+                        type=int,
+                        default=1)
+cmd_parser.add_argument("--queue-size",
+                        help="Maximum number of tests waiting in front of each pipeline stage (default: number of stage workers).",
+                        type=int)
+cmd_parser.add_argument("--vcd-activity",
+                        help="Extract the measurement window and the per-hierarchy toggle counts of each VCD file.",
+                        action="store_true")
+cmd_parser.add_argument("--trim-vcd",
+                        help="Analyse a copy of each VCD file trimmed to the measurement window.",
+                        action="store_true")
+cmd_parser.add_argument("--vcd-trigger",
+                        help="Signal whose first high interval is the measurement window (default: the dump window).")
+cmd_parser.add_argument("--power-estimator",
+                        help="Calibration table of the toggle-rate power estimator (see power_estimator.py). "
+                             "Estimate the power of each test instead of running PrimePower.")
+cmd_parser.add_argument("--results-store",
+                        help="Also append the results to this Parquet results store (see results_store.py).")
+cmd_parser.add_argument("--check-regressions",
+                        help="Compare the results with the previous runs in the results store and fail on regressions (see regression.py).",
+                        action="store_true")
+cmd_parser.add_argument("--build-cache",
+                        help="Directory of the firmware build cache.",
+                        default=f"{os.getcwd()}/build/performance-analysis/build-cache")
+cmd_parser.add_argument("--cache-size",
+                        help="Maximum size of the firmware build cache in MiB.",
+                        type=int,
+                        default=2048)
+cmd_parser.add_argument("--no-build-cache",
+                        help="Always rebuild the test applications.",
+                        action="store_true")
+cmd_parser.add_argument("--trace",
+                        help="Write the wall time, CPU time, peak memory, and output size of every stage to this Chrome trace-event JSON file (see stage_trace.py).")
+cmd_parser.add_argument("--resume",
+                        help="Resume an interrupted campaign, skipping the tests already completed.",
+                        action="store_true")
 args = cmd_parser.parse_args()
+if args.check_regressions and args.results_store is None:
+    cmd_parser.error("--check-regressions requires --results-store")
 
 # Initialize test scheduler
 report_dir = os.path.dirname(args.report_csv)
 report_file = os.path.basename(args.report_csv)
-sched = ts.test_scheduler(args.cfg)
-sched.run_power(args.wave_dir, report_dir, report_file)
+cache = None if args.no_build_cache else build_cache(args.build_cache, args.cache_size)
+store = None if args.results_store is None else results_store(args.results_store)
+estimator = None if args.power_estimator is None else power_estimator(args.power_estimator)
+sched = ts.test_scheduler(args.cfg, cache=cache, pwr_jobs=args.power_jobs,
+                          build_jobs=args.build_jobs, queue_size=args.queue_size,
+                          vcd_activity=args.vcd_activity, trim_vcd=args.trim_vcd, vcd_trigger=args.vcd_trigger,
+                          estimator=estimator, store=store, trace_file=args.trace)
+num_failed = sched.run_power(args.wave_dir, report_dir, report_file, resume=args.resume)
+
+# Check the campaign for regressions
+num_regressions = 0
+if args.check_regressions:
+    kind = "power" if estimator is None else "power_estimate"
+    diff = regression_checker(store).check(kind, store.run_info["campaign"])
+    print_diff(kind, diff)
+    num_regressions = (diff["status"] == "regression").sum()
 
 # Exit
-sys.exit(0)
+sys.exit(1 if num_failed > 0 or num_regressions > 0 else 0)
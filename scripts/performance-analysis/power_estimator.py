@@ -0,0 +1,217 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: power_estimator.py
+# Date: 17/10/2026
+# Description: Toggle-rate power estimator calibrated on PrimePower results
+
+import argparse
+import sys
+import os
+import glob
+import json
+import numpy as np
+from vcd_reader import vcd_reader
+from power_rollup import POWER_CATEGORIES, POWER_METRICS
+
+# Activity reports written by the power campaign (see test_scheduler.get_vcd_activity)
+ACTIVITY_GLOB = os.path.join("**", "activity-*.json")
+
+class power_estimator:
+    """Linear power model driven by per-hierarchy toggle rates.
+
+    For each execution mode ('cpu' or 'carus') and power metric, the model is
+
+        P = P0 + sum_h k_h * toggles_h / duration
+
+    where toggles_h is the number of bit toggles of hierarchy h in the
+    measurement window of the VCD file. The coefficients are fitted with
+    ridge-regularized least squares on the activity reports of past power
+    campaigns, which store the toggle counts next to the power computed by
+    get_power from the PrimePower reports; their error is measured by
+    k-fold cross-validation. Estimating a configuration only
+    requires streaming its VCD file, so hundreds of configurations can be
+    screened before sending the interesting ones to PrimePower.
+    """
+
+    # Initialize estimator properties
+    def __init__(self, calibration_file: str = None, ridge: float = 1e-6):
+        self.ridge = ridge
+        self.features: list = []
+        self.models: dict = {}      # mode -> metric -> {"intercept", "coef"}
+        self.error: dict = {}       # mode -> metric -> mean relative cross-validated error (None if too few samples)
+        self.num_samples: dict = {}
+        if calibration_file is not None:
+            self.load(calibration_file)
+
+    # Feature vector of an activity report
+    def get_features(self, activity: dict) -> np.ndarray:
+        """Toggle rate (toggles/ns) of each calibrated hierarchy."""
+        duration = activity["duration_ns"]
+        if duration <= 0:
+            raise ValueError(f"'{activity.get('vcd_file')}': empty measurement window")
+        return np.array([activity["toggles"].get(h, 0) / duration for h in self.features], dtype=float)
+
+    # Ridge fit of one power metric
+    def solve(self, X: np.ndarray, y: np.ndarray) -> tuple:
+        """Fit the static power and the coefficients of the toggle rates 'X'. Return (intercept, coef)."""
+        # Normalize the features to make the regularization scale-free
+        scale = X.max(axis=0)
+        scale[scale == 0] = 1.0
+        A = np.hstack([np.ones((len(X), 1)), X / scale])
+        R = self.ridge * np.eye(A.shape[1])
+        R[0, 0] = 0.0   # do not penalize the static power
+        w = np.linalg.solve(A.T @ A + R, A.T @ y)
+        return float(w[0]), w[1:] / scale
+
+    # Fit the model on calibration samples
+    def fit(self, samples: list, folds: int = 5, seed: int = 0):
+        """Fit the coefficients on activity reports with a 'power' entry.
+
+        The error of each metric is measured by k-fold cross-validation: each
+        sample is estimated by a model fitted on the other folds (one sample
+        per fold if there are fewer samples than folds). The final model is
+        then fitted on all the samples.
+        """
+        rng = np.random.default_rng(seed)
+        samples = [s for s in samples if "power" in s and s["duration_ns"] > 0]
+        self.features = sorted({h for s in samples for h in s["toggles"]})
+        self.models = {}
+        self.error = {}
+        self.num_samples = {}
+        for mode in sorted({s["mode"] for s in samples}):
+            mode_samples = [s for s in samples if s["mode"] == mode]
+            X = np.array([self.get_features(s) for s in mode_samples])
+            Y = np.array([[s["power"][metric] for metric in POWER_METRICS] for s in mode_samples], dtype=float)
+
+            # Cross-validated estimates (needs at least two training samples per fold)
+            pred = None
+            if len(X) >= 3 and folds >= 2:
+                fold = rng.permutation(len(X)) % min(folds, len(X))
+                pred = np.empty_like(Y)
+                for k in np.unique(fold):
+                    test = fold == k
+                    for j in range(len(POWER_METRICS)):
+                        intercept, coef = self.solve(X[~test], Y[~test, j])
+                        pred[test, j] = np.maximum(0.0, intercept + X[test] @ coef)
+
+            self.models[mode] = {}
+            self.error[mode] = {}
+            for j, metric in enumerate(POWER_METRICS):
+                intercept, coef = self.solve(X, Y[:, j])
+                self.models[mode][metric] = {"intercept": intercept, "coef": coef.tolist()}
+                if pred is None:
+                    self.error[mode][metric] = None
+                    continue
+                y = Y[:, j]
+                nz = np.abs(y) > 0
+                self.error[mode][metric] = float(np.mean(np.abs(pred[nz, j] - y[nz]) / np.abs(y[nz]))) if nz.any() else 0.0
+            self.num_samples[mode] = len(mode_samples)
+
+    # Estimate the power of an execution
+    def estimate(self, mode: str, activity: dict) -> dict:
+        """Estimate the power metrics of 'mode' from an activity report."""
+        if mode not in self.models:
+            raise ValueError(f"power estimator not calibrated for mode '{mode}'")
+        x = self.get_features(activity)
+        pwr_data: dict = {}
+        for metric in POWER_METRICS:
+            model = self.models[mode][metric]
+            pwr_data[metric] = max(0.0, model["intercept"] + float(np.dot(model["coef"], x)))
+        return pwr_data
+
+    # Store the calibration table
+    def save(self, calibration_file: str):
+        """Store the calibration table as JSON."""
+        with open(calibration_file, "w") as f:
+            json.dump({
+                "features": self.features,
+                "models": self.models,
+                "error": self.error,
+                "num_samples": self.num_samples,
+            }, f, indent=1)
+
+    # Load the calibration table
+    def load(self, calibration_file: str):
+        """Load a calibration table."""
+        with open(calibration_file, "r") as f:
+            calibration = json.load(f)
+        self.features = calibration["features"]
+        self.models = calibration["models"]
+        self.error = calibration.get("error", {})
+        self.num_samples = calibration.get("num_samples", {})
+
+    # Print the fit quality
+    def print_error(self, file=sys.stdout):
+        """Print the mean relative cross-validated error of each metric."""
+        for mode, errors in self.error.items():
+            print(f"### Power estimator, {mode} mode ({self.num_samples.get(mode, 0)} samples):", file=file)
+            for metric, err in errors.items():
+                if err is None:
+                    print(f"    - {metric}: not enough samples for a cross-validated error", file=file)
+                else:
+                    print(f"    - {metric}: {100 * err:.1f}% mean relative cross-validated error", file=file)
+
+# Load the calibration samples of one or more power campaigns
+def load_samples(report_dirs: list) -> list:
+    """Load the activity reports with PrimePower results found in 'report_dirs'."""
+    samples = []
+    for report_dir in report_dirs:
+        for activity_file in sorted(glob.glob(os.path.join(report_dir, ACTIVITY_GLOB), recursive=True)):
+            with open(activity_file, "r") as f:
+                activity = json.load(f)
+            if "power" in activity and "mode" in activity:
+                samples.append(activity)
+    return samples
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Toggle-rate power estimator")
+    subparsers = cmd_parser.add_subparsers(dest="cmd", required=True)
+    fit_parser = subparsers.add_parser("fit", help="Fit a calibration table on past power campaigns")
+    fit_parser.add_argument("calibration",
+                            help="Output calibration table (JSON)")
+    fit_parser.add_argument("report_dirs",
+                            help="Power campaign report directories",
+                            nargs="+")
+    fit_parser.add_argument("--ridge",
+                            help="Ridge regularization factor.",
+                            type=float,
+                            default=1e-6)
+    fit_parser.add_argument("--folds",
+                            help="Number of cross-validation folds used to measure the error.",
+                            type=int,
+                            default=5)
+    est_parser = subparsers.add_parser("estimate", help="Estimate the power of VCD files")
+    est_parser.add_argument("calibration",
+                            help="Calibration table (JSON)")
+    est_parser.add_argument("mode",
+                            help="Execution mode",
+                            choices=sorted(POWER_CATEGORIES))
+    est_parser.add_argument("vcd_files",
+                            help="VCD files",
+                            nargs="+")
+    est_parser.add_argument("--trigger",
+                            help="Signal whose first high interval is the measurement window (default: the dump window).")
+    args = cmd_parser.parse_args()
+
+    if args.cmd == "fit":
+        # Fit the model
+        samples = load_samples(args.report_dirs)
+        if not samples:
+            print("ERROR: no calibration samples found (run the power campaign with --vcd-activity)", file=sys.stderr)
+            sys.exit(1)
+        estimator = power_estimator(ridge=args.ridge)
+        estimator.fit(samples, args.folds)
+        estimator.save(args.calibration)
+        estimator.print_error()
+    else:
+        # Estimate the power of each VCD file
+        estimator = power_estimator(args.calibration)
+        for vcd_file in args.vcd_files:
+            activity = vcd_reader(vcd_file).get_activity(estimator.features, trigger=args.trigger, strict=False)
+            pwr_data = estimator.estimate(args.mode, activity)
+            print(f"{vcd_file}: {(pwr_data['sys_pwr'] + pwr_data['nmc_pwr'])*1000:.4} mW (system: {pwr_data['sys_pwr']*1000:.4} mW, NMC: {pwr_data['nmc_pwr']*1000:.4} mW)")
+
+    sys.exit(0)
@@ -0,0 +1,171 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: power_rollup.py
+# Date: 17/10/2026
+# Description: Roll-up of PrimePower CSV reports into power categories
+
+import argparse
+import sys
+import os
+import re
+import glob
+import pandas as pd
+
+# Power metrics of the power report
+POWER_METRICS = [
+    "sys_pwr",
+    "sys_cpu_pwr",
+    "sys_mem_pwr",
+    "sys_peri_pwr",
+    "nmc_pwr",
+    "nmc_ctl_pwr",
+    "nmc_comp_pwr",
+    "nmc_mem_pwr",
+]
+
+# Rows of the PrimePower CSV shared by the categories below
+_CPU = [r"u_core_v_mini_mcu/cpu_subsystem_i"]
+_BUS = [r"u_core_v_mini_mcu/system_bus_i"]
+_AO_PERI = [
+    r"u_core_v_mini_mcu/ao_peripheral_subsystem_i/boot_rom_i",          # Boot ROM
+    r"u_core_v_mini_mcu/ao_peripheral_subsystem_i/soc_ctrl_i",          # SoC control registers
+    r"u_core_v_mini_mcu/ao_peripheral_subsystem_i/power_manager_i",     # Power manager
+]
+_PERI = [
+    r"u_core_v_mini_mcu/ao_peripheral_subsystem_i/fast_intr_ctrl_i",    # fast interrupt controller (DMA)
+    r"u_core_v_mini_mcu/ao_peripheral_subsystem_i/dma_i",               # DMA
+    r"u_core_v_mini_mcu/peripheral_subsystem_i/rv_plic_i",              # PLIC
+]
+# SRAM banks used with an NMC: .text, .data, and interleaved banks 0-2
+# (bank 5 is replaced by the NMC)
+_NMC_SRAM = [r"u_core_v_mini_mcu/memory_subsystem_i/gen_sram_[0-4]__ram_i"]
+
+# Hierarchy-to-category mapping for each execution mode: every metric is the
+# sum of the TOTAL_POWER of the CSV rows whose name fully matches one of its
+# regular expressions. Each expression must match at least one row. NMC
+# wrappers are matched for any number of instances; the NMC blocks are the
+# rows named by the SCOPE_NAMES of pwr_script.tcl, for the first instance only.
+POWER_CATEGORIES = {
+    "cpu": {
+        "sys_pwr": _CPU + [r"u_core_v_mini_mcu/memory_subsystem_i"] + _BUS + _AO_PERI + _PERI,
+        "sys_cpu_pwr": _CPU,
+        "sys_mem_pwr": [r"u_core_v_mini_mcu/memory_subsystem_i"],   # all SRAM banks
+        "sys_peri_pwr": _PERI,
+    },
+    "carus": {
+        "sys_pwr": _CPU + _BUS + [r"heepatia_bus"] + _NMC_SRAM + _AO_PERI + _PERI,
+        "sys_cpu_pwr": _CPU,
+        "sys_mem_pwr": _NMC_SRAM,
+        "sys_peri_pwr": _PERI,
+        "nmc_pwr": [r"u_heepatia_peripherals/gen_carus_\d+__u_nm_carus_wrapper"],
+        "nmc_ctl_pwr": [r"carus_ctl"],
+        "nmc_comp_pwr": [r"carus_vector"],
+        "nmc_mem_pwr": [r"carus_vrf"],
+    },
+    "caesar": {
+        "sys_pwr": _CPU + _BUS + [r"heepatia_bus"] + _NMC_SRAM + _AO_PERI + _PERI,
+        "sys_cpu_pwr": _CPU,
+        "sys_mem_pwr": _NMC_SRAM,
+        "sys_peri_pwr": _PERI,
+        "nmc_pwr": [r"u_heepatia_peripherals/gen_caesar_\d+__u_nm_caesar_wrapper"],
+        "nmc_ctl_pwr": [r"caesar_ctl"],
+        "nmc_comp_pwr": [r"caesar_alu"],
+        "nmc_mem_pwr": [r"caesar_mem\d+"],
+    },
+    # The OE-CGRA is a bus master next to the SRAM (all banks are in use)
+    "cgra": {
+        "sys_pwr": _CPU + [r"u_core_v_mini_mcu/memory_subsystem_i"] + _BUS + [r"heepatia_bus"] + _AO_PERI + _PERI,
+        "sys_cpu_pwr": _CPU,
+        "sys_mem_pwr": [r"u_core_v_mini_mcu/memory_subsystem_i"],
+        "sys_peri_pwr": _PERI,
+        "nmc_pwr": [r"u_heepatia_peripherals/u_cgra_top_wrapper"],
+        "nmc_comp_pwr": [r"u_heepatia_peripherals/u_cgra_top_wrapper/cgra_top_i"],
+        "nmc_mem_pwr": [r"u_heepatia_peripherals/u_cgra_top_wrapper/cgra_context_memory_i"],
+    },
+}
+
+# Build the table mapping CSV rows to metrics
+def get_row_map(modes: list, cells: list) -> pd.DataFrame:
+    """Match the category expressions of 'modes' against the CSV row names.
+
+    Return a table with one line per (mode, metric, expression, row) match.
+    """
+    entries = []
+    for mode in modes:
+        if mode not in POWER_CATEGORIES:
+            raise ValueError(f"invalid mode '{mode}'")
+        for metric, patterns in POWER_CATEGORIES[mode].items():
+            for pattern in patterns:
+                regex = re.compile(pattern)
+                entries += [(mode, metric, f"{metric}:{pattern}", cell) for cell in cells if regex.fullmatch(cell)]
+    return pd.DataFrame(entries, columns=["mode", "metric", "pattern", "CELL"])
+
+# Roll up many power reports at once
+def rollup_power(reports: list) -> pd.DataFrame:
+    """Compute the power metrics of several PrimePower CSV reports.
+
+    'reports' is a list of (key, mode, csv_file) tuples. Return a table
+    indexed by key with one column per power metric (in W).
+    """
+    modes = pd.Series([mode for _, mode, _ in reports])
+
+    # Load all the reports into a single table (one block per report)
+    frames = [pd.read_csv(csv_file, index_col=0, header=0)["TOTAL_POWER"].rename_axis("CELL").reset_index() for _, _, csv_file in reports]
+    power_data = pd.concat(frames, keys=range(len(reports)), names=["report", None]).reset_index(level=0)
+    power_data["mode"] = power_data["report"].map(modes)
+    # Consider the first occurrence of each row, as '.loc' did
+    power_data = power_data.drop_duplicates(["report", "CELL"])
+
+    # Assign every row to its categories and sum them in a single pass
+    row_map = get_row_map(sorted(set(modes)), power_data["CELL"].unique().tolist())
+    matched = power_data.merge(row_map, on=["mode", "CELL"])
+
+    # Check that every expression matched at least one row of each report
+    expected = {mode: sum(len(p) for p in POWER_CATEGORIES[mode].values()) for mode in set(modes)}
+    found = matched.groupby("report")["pattern"].nunique().reindex(range(len(reports)), fill_value=0)
+    for i, (_, mode, csv_file) in enumerate(reports):
+        if found[i] < expected[mode]:
+            patterns = {f"{m}:{p}" for m, ps in POWER_CATEGORIES[mode].items() for p in ps}
+            absent = sorted(patterns - set(matched.loc[matched["report"] == i, "pattern"]))
+            raise KeyError(f"'{csv_file}': no row matching {', '.join(absent)}")
+
+    rollup = matched.groupby(["report", "metric"])["TOTAL_POWER"].sum().unstack(fill_value=0.0)
+    rollup = rollup.reindex(index=range(len(reports)), columns=POWER_METRICS, fill_value=0.0)
+    rollup.index = pd.Index([key for key, _, _ in reports], tupleize_cols=False)
+    rollup.columns.name = None
+    return rollup
+
+# Roll up all the power reports of a campaign
+def rollup_campaign(report_dir: str) -> pd.DataFrame:
+    """Roll up the PrimePower reports (<app>/<test>/<mode>/power.csv) of a power campaign."""
+    reports = []
+    for csv_file in sorted(glob.glob(os.path.join(report_dir, "*", "*", "*", "power.csv"))):
+        test_dir, mode = os.path.split(os.path.dirname(csv_file))
+        app_dir, test = os.path.split(test_dir)
+        if mode in POWER_CATEGORIES:
+            reports.append(((os.path.basename(app_dir), test, mode), mode, csv_file))
+    if not reports:
+        return pd.DataFrame(columns=["app_name", "test", "memory_type"] + POWER_METRICS)
+    rollup = rollup_power(reports)
+    rollup.index = pd.MultiIndex.from_tuples(rollup.index, names=["app_name", "test", "memory_type"])
+    return rollup.reset_index()
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Roll up the PrimePower reports of a power campaign")
+    cmd_parser.add_argument("report_dir",
+                            help="Power campaign report directory")
+    cmd_parser.add_argument("out_csv",
+                            help="Output CSV file",
+                            nargs="?",
+                            default=f"{os.getcwd()}/power-rollup.csv")
+    args = cmd_parser.parse_args()
+
+    # Roll up the reports
+    rollup = rollup_campaign(args.report_dir)
+    rollup.to_csv(args.out_csv, index=False)
+    print(f"### Rolled up {len(rollup)} power reports into '{args.out_csv}'")
+
+    sys.exit(0)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: pwr_shell_stub.py
+# Date: 17/10/2026
+# Description: Stand-in for PrimePower (pwr_shell) to test the power flow locally
+
+# Usage (from the repository root):
+#   make benchmark-power PWR_SHELL=$(pwd)/scripts/performance-analysis/pwr_shell_stub.py
+#
+# The stub accepts the same command line as pwr_shell in run_pwr_flow.sh and
+# writes a power.csv report with the same format as gen_pwr_csv.tcl into
+# PWR_REPORTS_PATH (or ./reports). Power figures are pseudo-random, but
+# deterministic for a given VCD file. Set PWR_SHELL_STUB_DELAY to a number of
+# seconds to emulate the runtime of the real tool.
+
+import argparse
+import hashlib
+import os
+import random
+import re
+import sys
+import time
+
+# Hierarchy rows reported by the stub
+STUB_ROWS = [
+    "top",
+    "u_core_v_mini_mcu/cpu_subsystem_i",
+    "u_core_v_mini_mcu/memory_subsystem_i",
+    "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_0__ram_i",
+    "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_1__ram_i",
+    "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_2__ram_i",
+    "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_3__ram_i",
+    "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_4__ram_i",
+    "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_5__ram_i",
+    "u_core_v_mini_mcu/system_bus_i",
+    "u_core_v_mini_mcu/ao_peripheral_subsystem_i/boot_rom_i",
+    "u_core_v_mini_mcu/ao_peripheral_subsystem_i/soc_ctrl_i",
+    "u_core_v_mini_mcu/ao_peripheral_subsystem_i/power_manager_i",
+    "u_core_v_mini_mcu/ao_peripheral_subsystem_i/fast_intr_ctrl_i",
+    "u_core_v_mini_mcu/ao_peripheral_subsystem_i/dma_i",
+    "u_core_v_mini_mcu/peripheral_subsystem_i/rv_plic_i",
+    "heepatia_bus",
+    "u_heepatia_peripherals/gen_carus_0__u_nm_carus_wrapper",
+    "carus_ctl",
+    "carus_vector",
+    "carus_vrf",
+    "u_heepatia_peripherals/gen_caesar_0__u_nm_caesar_wrapper",
+    "caesar_ctl",
+    "caesar_alu",
+    "caesar_mem0",
+    "caesar_mem1",
+    "u_heepatia_peripherals/u_cgra_top_wrapper",
+    "u_heepatia_peripherals/u_cgra_top_wrapper/cgra_top_i",
+    "u_heepatia_peripherals/u_cgra_top_wrapper/cgra_context_memory_i",
+]
+
+def main():
+    cmd_parser = argparse.ArgumentParser(description="PrimePower stand-in")
+    cmd_parser.add_argument("-x", dest="cmds", default="", help="Tcl commands to run before the script")
+    cmd_parser.add_argument("-file", dest="script", help="Tcl script (ignored)")
+    cmd_parser.add_argument("-output_log_file", dest="log_file", help="Log file")
+    args = cmd_parser.parse_args()
+
+    # Parse 'set VAR value' commands
+    tcl_vars = dict(re.findall(r"set\s+(\S+)\s+([^;]*)", args.cmds))
+    tcl_vars = {k: v.strip() for k, v in tcl_vars.items()}
+    vcd_file = tcl_vars.get("VCD_FILE", "")
+    if not os.path.isfile(vcd_file):
+        print(f"Error: VCD file '{vcd_file}' not found", file=sys.stderr)
+        sys.exit(1)
+
+    # Emulate the tool runtime
+    time.sleep(float(os.environ.get("PWR_SHELL_STUB_DELAY", "0")))
+
+    # Deterministic pseudo-random power figures
+    hasher = hashlib.sha256(os.path.basename(vcd_file).encode("utf-8"))
+    hasher.update(str(os.path.getsize(vcd_file)).encode("utf-8"))
+    rng = random.Random(hasher.hexdigest())
+
+    # Write the power report
+    reports_path = os.environ.get("PWR_REPORTS_PATH", "./reports")
+    os.makedirs(reports_path, exist_ok=True)
+    with open(os.path.join(reports_path, "power.csv"), "w") as f:
+        f.write("CELL,INTERNAL_POWER,SWITCHING_POWER,LEAKAGE_POWER,TOTAL_POWER,RELATIVE_POWER\n")
+        for row in STUB_ROWS:
+            int_pwr = rng.uniform(1e-5, 1e-3)
+            sw_pwr = rng.uniform(1e-5, 1e-3)
+            leak_pwr = rng.uniform(1e-7, 1e-5)
+            f.write(f"{row},{int_pwr},{sw_pwr},{leak_pwr},{int_pwr + sw_pwr + leak_pwr},0.0\n")
+
+    if args.log_file is not None:
+        with open(args.log_file, "w") as f:
+            f.write(f"pwr_shell stub: analysed '{vcd_file}'\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: regression.py
+# Date: 17/10/2026
+# Description: Detection of cycle and power regressions against the history of the results store
+
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+from results_store import results_store, KEY_COLUMNS, KINDS
+
+# Metrics checked for each campaign kind (higher is worse)
+REGRESSION_METRICS = {
+    "throughput": ["cycles"],
+    "power": ["sys_pwr", "nmc_pwr"],
+    "power_estimate": ["sys_pwr", "nmc_pwr"],
+}
+
+# Metrics of the deterministic Verilator model (no run-to-run noise)
+DETERMINISTIC_METRICS = ["cycles"]
+
+# Columns identifying a baseline: the test, its number of outputs, and the
+# hardware configuration (results of any git revision are comparable)
+BASELINE_KEY = [c for c in KEY_COLUMNS if c != "git_rev"] + ["num_outs"]
+
+# Scale factor of the median absolute deviation to estimate the standard deviation
+MAD_SCALE = 1.4826
+
+class regression_checker:
+    """Compare a campaign against the previous results of each test.
+
+    The baseline of a test is the median of its last 'window' results in the
+    results store, for the same kernel, data type, parameters, number of
+    outputs, memory type, and hardware configuration. The spread of the
+    baseline is estimated with the median absolute deviation, which is not
+    affected by isolated outliers (or with the standard deviation when more
+    than half of the samples are equal). A metric regresses when it is more than
+    'threshold' (relative) above the baseline and, if the baseline has any
+    spread, more than 'z' standard deviations above it. Cycle counts of the
+    Verilator model are deterministic, so for them the relative threshold
+    alone decides.
+    """
+
+    # Initialize checker properties
+    def __init__(self, store: results_store, window: int = 10, threshold: float = 0.01, z: float = 3.0):
+        self.store = store
+        self.window = window
+        self.threshold = threshold
+        self.z = z
+
+    # Compare a campaign with its baseline
+    def check(self, kind: str, campaign: str = None) -> pd.DataFrame:
+        """Compare the results of 'campaign' (the latest one if None) with the previous runs.
+
+        Return one row per test and metric, with the baseline median, its
+        estimated standard deviation and number of samples, the new value,
+        the relative change, and a status ('regression', 'improvement',
+        'unchanged', or 'new' if the test has no history), sorted from the
+        worst regression to the best improvement.
+        """
+        metrics = REGRESSION_METRICS[kind]
+        df = self.store.load(kind)
+        columns = BASELINE_KEY + ["metric", "baseline", "sigma", "samples", "value", "delta", "z", "status"]
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+        for col in BASELINE_KEY:
+            if col not in df.columns:
+                df[col] = ""
+        df = df.sort_values("time")
+        if campaign is None:
+            campaign = df["campaign"].iloc[-1]
+        new = df[df["campaign"] == campaign]
+        if new.empty:
+            return pd.DataFrame(columns=columns)
+
+        # Baseline: the last runs of each test before the campaign
+        old = df[(df["campaign"] != campaign) & (df["time"] < new["time"].min())]
+        old = old.groupby(BASELINE_KEY, dropna=False, sort=False).tail(self.window)
+        old = old.melt(id_vars=BASELINE_KEY, value_vars=metrics, var_name="metric")
+        groups = old.groupby(BASELINE_KEY + ["metric"], dropna=False)["value"]
+        old["median"] = groups.transform("median")
+        old["abs_dev"] = (old["value"] - old["median"]).abs()
+        stats = old.groupby(BASELINE_KEY + ["metric"], dropna=False).agg(
+            baseline=("median", "first"),
+            sigma=("abs_dev", "median"),
+            std=("value", "std"),
+            samples=("value", "count"),
+        ).reset_index()
+        # Fall back to the standard deviation when most samples are equal
+        stats["sigma"] = (stats["sigma"] * MAD_SCALE).where(stats["sigma"] > 0, stats["std"].fillna(0.0))
+
+        # New results (the last one of each test, if repeated)
+        new = new.drop_duplicates(BASELINE_KEY, keep="last")
+        new = new.melt(id_vars=BASELINE_KEY, value_vars=metrics, var_name="metric")
+        diff = new.merge(stats, on=BASELINE_KEY + ["metric"], how="left")
+
+        # Relative change and significance
+        with np.errstate(divide="ignore", invalid="ignore"):
+            diff["delta"] = np.where(diff["baseline"] != 0, (diff["value"] - diff["baseline"]) / diff["baseline"].abs(),
+                                     np.where(diff["value"] == diff["baseline"], 0.0, np.sign(diff["value"]) * np.inf))
+            diff["z"] = np.where(diff["sigma"] > 0, (diff["value"] - diff["baseline"]) / diff["sigma"], np.nan)
+        significant = diff["metric"].isin(DETERMINISTIC_METRICS) | diff["z"].isna() | (diff["z"].abs() > self.z)
+        diff["status"] = "unchanged"
+        diff.loc[(diff["delta"] > self.threshold) & significant, "status"] = "regression"
+        diff.loc[(diff["delta"] < -self.threshold) & significant, "status"] = "improvement"
+        diff.loc[diff["baseline"].isna(), "status"] = "new"
+
+        # Rank by relative change
+        diff = diff.sort_values("delta", ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+        return diff[columns]
+
+# Print a diff table
+def print_diff(kind: str, diff: pd.DataFrame, all_tests: bool = False, file=sys.stdout):
+    """Print the regressions and improvements of a campaign (all the tests if 'all_tests')."""
+    counts = diff["status"].value_counts()
+    print(f"### {kind}: {counts.get('regression', 0)} regressions, {counts.get('improvement', 0)} improvements, "
+          f"{counts.get('unchanged', 0)} unchanged, {counts.get('new', 0)} new", file=file)
+    rows = diff if all_tests else diff[diff["status"].isin(["regression", "improvement"])]
+    if rows.empty:
+        return
+    table = pd.DataFrame({
+        "test": rows["kernel_name"] + " " + rows["data_type"] + " " + rows["kernel_params"].astype(str),
+        "mode": rows["memory_type"],
+        "metric": rows["metric"],
+        "baseline": rows["baseline"].map(lambda b: "-" if pd.isna(b) else f"{b:.6g}"),
+        "value": rows["value"].map("{:.6g}".format),
+        "delta": rows["delta"].map(lambda d: "-" if pd.isna(d) else f"{d:+.2%}"),
+        "z": rows["z"].map(lambda z: "-" if pd.isna(z) else f"{z:+.1f}"),
+        "status": rows["status"],
+    })
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(table.to_string(index=False), file=file)
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Check the latest campaigns for cycle and power regressions")
+    cmd_parser.add_argument("store_dir",
+                            help="Results store directory")
+    cmd_parser.add_argument("--kind", "-k",
+                            help="Campaign kind to check (default: throughput and power). Can be repeated.",
+                            choices=KINDS,
+                            action="append")
+    cmd_parser.add_argument("--campaign",
+                            help="Campaign to check (default: the latest one of each kind).")
+    cmd_parser.add_argument("--window",
+                            help="Number of previous results of each test in the baseline.",
+                            type=int,
+                            default=10)
+    cmd_parser.add_argument("--threshold",
+                            help="Minimum relative change reported as a regression.",
+                            type=float,
+                            default=0.01)
+    cmd_parser.add_argument("--z",
+                            help="Minimum change in baseline standard deviations reported as a regression.",
+                            type=float,
+                            default=3.0)
+    cmd_parser.add_argument("--all",
+                            help="Print all the tests, not only the changed ones.",
+                            action="store_true")
+    cmd_parser.add_argument("--csv",
+                            help="Write the diff tables to this CSV file.")
+    args = cmd_parser.parse_args()
+
+    # Check each campaign kind
+    checker = regression_checker(results_store(args.store_dir), args.window, args.threshold, args.z)
+    num_regressions = 0
+    diffs = []
+    for kind in (args.kind or ["throughput", "power"]):
+        diff = checker.check(kind, args.campaign)
+        print_diff(kind, diff, args.all)
+        num_regressions += (diff["status"] == "regression").sum()
+        diffs.append(diff.assign(kind=kind))
+    if args.csv is not None:
+        pd.concat(diffs, ignore_index=True).to_csv(args.csv, index=False)
+
+    # Exit
+    sys.exit(1 if num_regressions > 0 else 0)
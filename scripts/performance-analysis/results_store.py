@@ -0,0 +1,251 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: results_store.py
+# Date: 17/10/2026
+# Description: Append-only Parquet store of throughput and power campaign results
+
+import argparse
+import sys
+import os
+import glob
+import time
+import uuid
+import subprocess
+import pandas as pd
+
+# Columns identifying a test result
+KEY_COLUMNS = [
+    "memory_type",
+    "kernel_name",
+    "data_type",
+    "kernel_params",
+    "hw_config",
+    "git_rev",
+]
+
+# Columns matching a power result to a throughput result, as
+# energy_analysis.POWER_KEY, on the same hardware configuration (the kernel
+# parameters are only matched on request)
+JOIN_KEY = ["memory_type", "kernel_name", "data_type", "nmc_instances", "hw_config"]
+
+# Campaign kinds, each stored in its own dataset
+KINDS = ["throughput", "power", "power_estimate"]
+
+# Get the revision of a checkout
+def get_git_rev(root_dir: str) -> str:
+    """Get the current commit, with a '+dirty' suffix if there are uncommitted changes."""
+    try:
+        rev = subprocess.run(["git", "-C", root_dir, "rev-parse", "HEAD"], check=True, capture_output=True).stdout.decode("utf-8").strip()
+        status = subprocess.run(["git", "-C", root_dir, "status", "--porcelain", "--untracked-files=no"], check=True, capture_output=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return rev + ("+dirty" if status.strip() else "")
+
+# Fill the columns of the rows written by older versions of the scheduler
+def normalize_instances(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """Default the number of NMC instances to 1 and add the missing 'columns' as undefined."""
+    df = df.copy()
+    instances = df["nmc_instances"] if "nmc_instances" in df.columns else pd.Series(1, index=df.index)
+    df["nmc_instances"] = pd.to_numeric(instances, errors="coerce").fillna(1).astype(int)
+    df["kernel_params"] = df["kernel_params"].fillna("").astype(str)
+    for col in columns:
+        if col not in df.columns:
+            df[col] = float("nan")
+    return df
+
+class results_store:
+    """Append-only columnar store of campaign results.
+
+    Each campaign kind ('throughput', 'power', or 'power_estimate' for the
+    screening campaigns of power_estimator.py) is a directory of Parquet
+    files. Report entries are buffered and written as a new file every
+    'batch_size' rows, so existing files are never rewritten. Every row is
+    tagged with the hardware configuration hash, the git revision, the
+    campaign identifier, and the time of the run. 'compact' merges the files
+    of a dataset to keep queries over thousands of runs fast.
+    """
+
+    # Initialize store properties
+    def __init__(self, store_dir: str, batch_size: int = 64):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("the results store requires pyarrow (see environment.yml)") from e
+        self.store_dir = os.path.abspath(store_dir)
+        self.batch_size = batch_size
+        self.buffers: dict = {kind: [] for kind in KINDS}
+        self.run_info: dict = {}
+
+    # Set the metadata of the current campaign
+    def start_campaign(self, hw_config: str, git_rev: str):
+        """Set the hardware configuration and revision attached to the next rows."""
+        self.run_info = {
+            "hw_config": hw_config,
+            "git_rev": git_rev,
+            "campaign": f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}",
+        }
+
+    # Buffer report entries
+    def append(self, kind: str, rows: list):
+        """Add report entries to the store (written by batch)."""
+        if kind not in KINDS:
+            raise ValueError(f"invalid results kind '{kind}'")
+        now = time.time()
+        self.buffers[kind] += [dict(row, **self.run_info, time=now) for row in rows]
+        if len(self.buffers[kind]) >= self.batch_size:
+            self.flush(kind)
+
+    # Write the buffered entries
+    def flush(self, kind: str = None):
+        """Write the buffered entries of 'kind' (all kinds if None) to a new file."""
+        for k in ([kind] if kind is not None else KINDS):
+            if not self.buffers[k]:
+                continue
+            kind_dir = os.path.join(self.store_dir, k)
+            os.makedirs(kind_dir, exist_ok=True)
+            part = os.path.join(kind_dir, f"part-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet")
+            tmp_part = part + ".tmp"
+            pd.DataFrame(self.buffers[k]).to_parquet(tmp_part, index=False)
+            os.replace(tmp_part, part)
+            self.buffers[k] = []
+
+    # Get the files of a dataset
+    def get_parts(self, kind: str) -> list:
+        """List the Parquet files of a dataset."""
+        return sorted(glob.glob(os.path.join(self.store_dir, kind, "*.parquet")))
+
+    # Load a dataset
+    def load(self, kind: str, filters: list = None, columns: list = None) -> pd.DataFrame:
+        """Load the rows of a dataset.
+
+        'filters' is a list of (column, op, value) predicates pushed down to
+        the Parquet reader. Files written with different columns (e.g., by an
+        older version of the scheduler) are concatenated.
+        """
+        frames = [pd.read_parquet(part, filters=filters, columns=columns) for part in self.get_parts(kind)]
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=columns if columns is not None else KEY_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    # Latest result of each test
+    def latest(self, kind: str, filters: list = None) -> pd.DataFrame:
+        """Get the most recent row of each key (and number of NMC instances, if recorded)."""
+        df = self.load(kind, filters)
+        if df.empty:
+            return df
+        key = KEY_COLUMNS + (["nmc_instances"] if "nmc_instances" in df.columns else [])
+        return df.sort_values("time").drop_duplicates(key, keep="last").reset_index(drop=True)
+
+    # History of a test
+    def history(self, kind: str, **key) -> pd.DataFrame:
+        """Get all the runs matching the given key columns, oldest first."""
+        filters = [(col, "==", value) for col, value in key.items()] or None
+        df = self.load(kind, filters)
+        if df.empty:
+            return df
+        return df.sort_values("time").reset_index(drop=True)
+
+    # Join throughput and power results
+    def join(self, filters: list = None, match_params: bool = False, file=sys.stderr) -> pd.DataFrame:
+        """Join the latest throughput and power results of each test.
+
+        The power campaigns simulate smaller problems than the throughput
+        ones, so, as in energy_analysis.py, results are matched on JOIN_KEY
+        and the kernel parameters only if 'match_params' is set; the power of
+        a key is the mean of the latest result of each of its power tests.
+        The git revision may differ between the two campaigns. The number of
+        outputs is taken from the throughput results, and the energy per
+        output sample is computed from the cycles and the average power (in
+        cycles * W). Results without a match are kept, with an undefined
+        energy, tagged in the 'matched' column, and listed on 'file'.
+        """
+        on = JOIN_KEY + (["kernel_params"] if match_params else [])
+        thr = self.latest("throughput", filters)
+        pwr = self.latest("power", filters)
+        if thr.empty and pwr.empty:
+            return pd.DataFrame(columns=on)
+        thr = normalize_instances(thr, ["cycles", "num_outs", "time"])
+        pwr = normalize_instances(pwr, ["sys_pwr", "nmc_pwr", "time", "campaign"])
+
+        # Latest result of each throughput test, mean power of each key
+        thr = thr.sort_values("time").drop_duplicates([c for c in KEY_COLUMNS if c != "git_rev"] + ["nmc_instances"], keep="last")
+        run_info = ["git_rev", "campaign", "time"]
+        metrics = [c for c in pwr.select_dtypes("number").columns if c not in on + run_info + ["num_outs"]]
+        pwr = pwr.sort_values("time").groupby(on, dropna=False, sort=False).agg(
+            **{c: (c, "mean") for c in metrics}, **{c: (c, "last") for c in run_info}).reset_index()
+
+        df = thr.merge(pwr, on=on, how="outer", suffixes=("_thr", "_pwr"), indicator="matched")
+        df["matched"] = df["matched"].map({"both": "both", "left_only": "throughput", "right_only": "power"})
+        df["cycles_per_output"] = df["cycles"] / df["num_outs"]
+        df["energy"] = (df["sys_pwr"] + df["nmc_pwr"]) * df["cycles_per_output"]
+
+        # Report the results without a match
+        for kind, other in [("throughput", "power"), ("power", "throughput")]:
+            missing = df[df["matched"] == kind]
+            if missing.empty:
+                continue
+            print(f"WARNING: {len(missing)} {kind} results without {other} results:", file=file)
+            for r in missing.itertuples():
+                instances = f" ({r.nmc_instances} instances)" if r.nmc_instances > 1 else ""
+                params = f" {r.kernel_params}" if kind == "throughput" or match_params else ""
+                print(f"    - {r.memory_type} {r.kernel_name} {r.data_type}{params}{instances}", file=file)
+        return df.reset_index(drop=True)
+
+    # Merge the files of a dataset
+    def compact(self, kind: str):
+        """Rewrite all the files of a dataset as a single file."""
+        parts = self.get_parts(kind)
+        if len(parts) < 2:
+            return
+        df = self.load(kind)
+        self.buffers[kind], buffered = df.to_dict("records"), self.buffers[kind]
+        self.flush(kind)
+        self.buffers[kind] = buffered
+        for part in parts:
+            os.remove(part)
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Query the campaign results store")
+    cmd_parser.add_argument("store_dir",
+                            help="Results store directory")
+    subparsers = cmd_parser.add_subparsers(dest="cmd", required=True)
+    latest_parser = subparsers.add_parser("latest", help="Print the latest result of each test")
+    latest_parser.add_argument("kind", choices=KINDS)
+    history_parser = subparsers.add_parser("history", help="Print all the runs of a test")
+    history_parser.add_argument("kind", choices=KINDS)
+    for col in KEY_COLUMNS:
+        history_parser.add_argument(f"--{col.replace('_', '-')}", dest=col)
+    join_parser = subparsers.add_parser("join", help="Join the latest throughput and power results")
+    join_parser.add_argument("--match-params",
+                             help="Match power and throughput results on the kernel parameters too.",
+                             action="store_true")
+    compact_parser = subparsers.add_parser("compact", help="Merge the files of each dataset")
+    for p in [latest_parser, join_parser]:
+        p.add_argument("--csv", help="Write the result to this CSV file")
+    history_parser.add_argument("--csv", help="Write the result to this CSV file")
+    args = cmd_parser.parse_args()
+
+    store = results_store(args.store_dir)
+    if args.cmd == "compact":
+        for kind in KINDS:
+            store.compact(kind)
+        sys.exit(0)
+    if args.cmd == "latest":
+        df = store.latest(args.kind)
+    elif args.cmd == "history":
+        df = store.history(args.kind, **{col: getattr(args, col) for col in KEY_COLUMNS if getattr(args, col) is not None})
+    else:
+        df = store.join(match_params=args.match_params)
+
+    # Print or export the result
+    if args.csv is not None:
+        df.to_csv(args.csv, index=False)
+    else:
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(df)
+
+    sys.exit(0)
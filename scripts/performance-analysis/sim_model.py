@@ -0,0 +1,163 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: sim_model.py
+# Date: 17/10/2026
+# Description: Compiled Verilator model shared by all the throughput tests
+
+import os
+import sys
+import glob
+import json
+import hashlib
+import subprocess
+import stage_trace
+
+# Inputs (relative to the repository root) that determine the hardware model
+HW_CONFIG_SRCS = [
+    "config",
+    "hw/ip",
+    "tb",
+    "heepatia.core",
+]
+
+# Makefile variables that change the generated hardware
+HW_CONFIG_VARS = [
+    "CARUS_NUM",
+    "CAESAR_NUM",
+    "MEMORY_BANKS",
+    "MEMORY_BANKS_IL",
+    "BUS",
+    "X_HEEP_CFG",
+    "FUSESOC_FLAGS",
+]
+
+# Name of the Verilator executable generated by FuseSoC
+MODEL_BIN = "Vtb_system"
+
+class verilator_model:
+    """Compiled Verilator model shared by all the throughput tests.
+
+    The model is built once per hardware configuration with
+    'make verilator-build'. The configuration hash and the fingerprint (SHA-256)
+    of the resulting executable are stored next to the scheduler reports, so
+    that later campaigns on the same hardware skip the build entirely. Each
+    test then launches the executable directly, passing the firmware as a
+    plusarg, from a private run directory where the UART DPI writes its log.
+    """
+
+    # Initialize model properties
+    def __init__(self, root_dir: str, state_file: str = None):
+        self.root_dir = os.path.abspath(root_dir)
+        self.state_file = state_file if state_file is not None else os.path.join(self.root_dir, "build", "performance-analysis", "verilator-model.json")
+        self.binary: str = None
+        self.fingerprint: str = None
+        self.stat: tuple = None
+
+    # Hash the hardware configuration
+    def get_config_hash(self) -> str:
+        """Hash the sources and variables that determine the hardware model."""
+        hasher = hashlib.sha256()
+        for src in HW_CONFIG_SRCS:
+            path = os.path.join(self.root_dir, src)
+            files = [path] if os.path.isfile(path) else sorted(glob.glob(os.path.join(path, "**", "*"), recursive=True))
+            for f in files:
+                if not os.path.isfile(f):
+                    continue
+                hasher.update(os.path.relpath(f, self.root_dir).encode("utf-8"))
+                with open(f, "rb") as fp:
+                    hasher.update(hashlib.sha256(fp.read()).digest())
+        for var in HW_CONFIG_VARS:
+            hasher.update(f"{var}={os.environ.get(var, '')}\0".encode("utf-8"))
+        return hasher.hexdigest()
+
+    # Find the model executable
+    def find_binary(self) -> str:
+        """Find the Verilator executable in the FuseSoC build directory."""
+        bins = sorted(glob.glob(os.path.join(self.root_dir, "build", "epfl_heepatia_heepatia_*", "sim-verilator", MODEL_BIN)))
+        return bins[0] if bins else None
+
+    # Compute the fingerprint of the model executable
+    def get_fingerprint(self, binary: str) -> str:
+        """Compute the SHA-256 of the model executable."""
+        hasher = hashlib.sha256()
+        with open(binary, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    # Build the model (only if the hardware configuration changed)
+    def build(self) -> bool:
+        """Build the model if needed. Return True if the model was rebuilt.
+
+        Raise RuntimeError if the model cannot be built.
+        """
+        config_hash = self.get_config_hash()
+        binary = self.find_binary()
+
+        # Reuse the model built for the same hardware configuration
+        if binary is not None and os.path.exists(self.state_file):
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+            if state.get("config_hash") == config_hash and state.get("binary") == binary and state.get("fingerprint") == self.get_fingerprint(binary):
+                self.set_binary(binary, state["fingerprint"])
+                return False
+
+        # Build the model
+        try:
+            stage_trace.run(["make", "verilator-build"], check=True, capture_output=True, cwd=self.root_dir)
+        except subprocess.CalledProcessError as e:
+            print("\n### ERROR: failed to build the Verilator model", file=sys.stderr)
+            print(e.stderr.decode("utf-8") if e.stderr is not None else "", file=sys.stderr)
+            raise RuntimeError("failed to build the Verilator model") from e
+        binary = self.find_binary()
+        if binary is None:
+            raise RuntimeError(f"Verilator model '{MODEL_BIN}' not found after build")
+        self.set_binary(binary, self.get_fingerprint(binary))
+
+        # Record the configuration the model was built for
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        with open(self.state_file, "w") as f:
+            json.dump({"config_hash": config_hash, "binary": binary, "fingerprint": self.fingerprint}, f, indent=1)
+        return True
+
+    # Set the model executable
+    def set_binary(self, binary: str, fingerprint: str):
+        """Set the model executable and remember its size and timestamp."""
+        self.binary = binary
+        self.fingerprint = fingerprint
+        st = os.stat(binary)
+        self.stat = (st.st_size, st.st_mtime_ns)
+
+    # Check that the model did not change under our feet
+    def check(self):
+        """Check that the model executable was not rebuilt since it was fingerprinted."""
+        st = os.stat(self.binary)
+        if (st.st_size, st.st_mtime_ns) != self.stat:
+            raise RuntimeError(f"Verilator model '{self.binary}' changed after it was fingerprinted ({self.fingerprint[:12]})")
+
+    # Run a firmware on the model
+    def run(self, firmware: str, run_dir: str, max_cycles: int = 2000000, log_level: str = "LOG_NORMAL", boot_mode: str = "force") -> str:
+        """Simulate a firmware and return the simulator and UART output."""
+        self.check()
+        os.makedirs(run_dir, exist_ok=True)
+        uart_log = os.path.join(run_dir, "uart.log")
+        if os.path.exists(uart_log):
+            os.remove(uart_log)
+        sim_out = stage_trace.run([
+            self.binary,
+            f"--log_level={log_level}",
+            "--trace=false",
+            "--no_err=true",    # as 'make verilator-opt' (see heepatia.core)
+            f"+firmware={os.path.abspath(firmware)}",
+            f"+boot_mode={boot_mode}",
+            f"+max_cycles={max_cycles}",
+        ], check=True, capture_output=True, cwd=run_dir)
+
+        # Append the UART log, as 'make verilator-opt' does
+        out = sim_out.stdout.decode("utf-8")
+        if os.path.exists(uart_log):
+            with open(uart_log, "r") as f:
+                out += f.read()
+        return out
@@ -0,0 +1,193 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: stage_trace.py
+# Date: 17/10/2026
+# Description: Wall time, CPU time, and memory instrumentation of the campaign stages (Chrome trace)
+
+import argparse
+import sys
+import os
+import json
+import time
+import threading
+import contextlib
+import subprocess
+
+# Open spans of each thread, innermost last
+_local = threading.local()
+
+# Launcher of the instrumented commands: it forks the command and reports
+# its CPU time and peak resident set size (including the processes it waits
+# for, e.g., the tools launched by 'make') on file descriptor argv[1]. The
+# scheduler does not wait for the command directly because Linux charges the
+# resident set of the parent at exec time to the peak RSS of its child. A
+# command killed by a signal exits with 128 + the signal number, as in a shell.
+_LAUNCHER = """
+import os, sys
+fd = int(sys.argv[1])
+pid = os.fork()
+if pid == 0:
+    os.close(fd)
+    try:
+        os.execvp(sys.argv[2], sys.argv[2:])
+    except OSError as e:
+        print(f"{sys.argv[2]}: {e.strerror}", file=sys.stderr)
+        os._exit(127)
+_, status, ru = os.wait4(pid, 0)
+os.write(fd, f"{ru.ru_utime + ru.ru_stime} {ru.ru_maxrss}".encode())
+os._exit(128 + os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status))
+"""
+
+# Run a command, accounting its resources to the open spans of this thread
+def run(args: list, check: bool = False, capture_output: bool = False, cwd: str = None, **kwargs) -> subprocess.CompletedProcess:
+    """Drop-in replacement of subprocess.run() for the instrumented stages.
+
+    The CPU time and peak resident set size of the command, and the size of
+    its captured output, are added to every open span of the calling thread.
+    """
+    if capture_output:
+        kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+    read_fd, write_fd = os.pipe()
+    try:
+        with subprocess.Popen([sys.executable, "-c", _LAUNCHER, str(write_fd)] + list(args), pass_fds=(write_fd,), cwd=cwd, **kwargs) as p:
+            os.close(write_fd)
+            write_fd = None
+            stdout, stderr = p.communicate()
+        usage = os.read(read_fd, 256).split()
+    finally:
+        os.close(read_fd)
+        if write_fd is not None:
+            os.close(write_fd)
+    for span in getattr(_local, "stack", []):
+        if usage:
+            span["child_cpu_s"] += float(usage[0])
+            # ru_maxrss is in KiB on Linux
+            span["child_peak_rss_mb"] = max(span["child_peak_rss_mb"], int(usage[1]) / 1024)
+        span["stdout_bytes"] += len(stdout or b"") + len(stderr or b"")
+        span["commands"] += 1
+    if check and p.returncode != 0:
+        raise subprocess.CalledProcessError(p.returncode, args, stdout, stderr)
+    return subprocess.CompletedProcess(args, p.returncode, stdout, stderr)
+
+# Record the size of an output file in the open spans of this thread
+def add_output(path: str, name: str = None):
+    """Add the size of 'path' (if it exists) to the outputs of the open spans."""
+    if not os.path.isfile(path):
+        return
+    size = os.path.getsize(path)
+    for span in getattr(_local, "stack", []):
+        span["outputs"][name or os.path.basename(path)] = size
+        span["output_bytes"] += size
+
+class stage_tracer:
+    """Instrumentation of the stages of a campaign.
+
+    Each span records its wall time, the CPU time of its thread, and the CPU
+    time, peak resident set size, and output size of the commands it runs
+    through run(). Spans are nested per thread. The trace is written in the
+    Chrome trace-event format (one track per pipeline worker), which can be
+    opened in chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    # Initialize tracer properties
+    def __init__(self, trace_file: str = None):
+        self.trace_file = trace_file
+        self.start = time.perf_counter()
+        self.events: list = []
+        self.tids: dict = {}
+        self.totals: dict = {}
+        self.lock = threading.Lock()
+
+    # Trace a block
+    @contextlib.contextmanager
+    def span(self, name: str, cat: str = "stage", **args):
+        """Record the 'with' block as a span named 'name'; 'args' are attached to the trace event."""
+        span = {"child_cpu_s": 0.0, "child_peak_rss_mb": 0.0, "stdout_bytes": 0, "output_bytes": 0, "commands": 0, "outputs": {}}
+        stack = _local.__dict__.setdefault("stack", [])
+        stack.append(span)
+        start, thread_start = time.perf_counter(), time.thread_time()
+        try:
+            yield span
+        finally:
+            end, thread_cpu = time.perf_counter(), time.thread_time() - thread_start
+            stack.pop()
+            self.add_span(name, cat, start, end, thread_cpu, span, args)
+
+    # Record a completed span
+    def add_span(self, name: str, cat: str, start: float, end: float, thread_cpu: float, span: dict, args: dict):
+        """Add a complete ('X') trace event and update the totals of 'name'."""
+        thread = threading.current_thread().name
+        with self.lock:
+            tid = self.tids.setdefault(thread, len(self.tids) + 1)
+            self.events.append({
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": round((start - self.start) * 1e6),
+                "dur": round((end - start) * 1e6),
+                "pid": 1,
+                "tid": tid,
+                "args": dict(args, wall_s=round(end - start, 6), cpu_s=round(thread_cpu, 6), **span),
+            })
+            totals = self.totals.setdefault((cat, name), {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "child_cpu_s": 0.0, "child_peak_rss_mb": 0.0, "output_bytes": 0})
+            totals["count"] += 1
+            totals["wall_s"] += end - start
+            totals["cpu_s"] += thread_cpu
+            totals["child_cpu_s"] += span["child_cpu_s"]
+            totals["child_peak_rss_mb"] = max(totals["child_peak_rss_mb"], span["child_peak_rss_mb"])
+            totals["output_bytes"] += span["output_bytes"] + span["stdout_bytes"]
+
+    # Totals of each span name
+    def get_totals(self, cat: str = None) -> dict:
+        """Get the totals of the spans of category 'cat' (all if None), by name."""
+        with self.lock:
+            return {name: dict(t) for (c, name), t in self.totals.items() if cat is None or c == cat}
+
+    # Write the trace
+    def write(self, trace_file: str = None):
+        """Write the events recorded so far as a Chrome trace-event JSON file."""
+        trace_file = trace_file or self.trace_file
+        if trace_file is None:
+            return
+        with self.lock:
+            meta = [{"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": "test_scheduler"}}]
+            meta += [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread}} for thread, tid in self.tids.items()]
+            meta += [{"name": "thread_sort_index", "ph": "M", "pid": 1, "tid": tid, "args": {"sort_index": tid}} for tid in self.tids.values()]
+            events = meta + sorted(self.events, key=lambda e: e["ts"])
+        os.makedirs(os.path.dirname(os.path.abspath(trace_file)), exist_ok=True)
+        with open(trace_file, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+# Summarize a trace file
+def summarize_trace(trace_file: str) -> list:
+    """Aggregate the spans of a trace by category and name, most expensive first."""
+    with open(trace_file, "r") as f:
+        events = [e for e in json.load(f)["traceEvents"] if e.get("ph") == "X"]
+    totals: dict = {}
+    for e in events:
+        t = totals.setdefault((e["cat"], e["name"]), {"cat": e["cat"], "name": e["name"], "count": 0, "wall_s": 0.0, "cpu_s": 0.0, "child_cpu_s": 0.0, "child_peak_rss_mb": 0.0, "output_bytes": 0})
+        args = e.get("args", {})
+        t["count"] += 1
+        t["wall_s"] += args.get("wall_s", e["dur"] * 1e-6)
+        t["cpu_s"] += args.get("cpu_s", 0.0)
+        t["child_cpu_s"] += args.get("child_cpu_s", 0.0)
+        t["child_peak_rss_mb"] = max(t["child_peak_rss_mb"], args.get("child_peak_rss_mb", 0.0))
+        t["output_bytes"] += args.get("output_bytes", 0) + args.get("stdout_bytes", 0)
+    return sorted(totals.values(), key=lambda t: t["wall_s"], reverse=True)
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Summarize a campaign trace written with --trace")
+    cmd_parser.add_argument("trace_file",
+                            help="Chrome trace-event JSON file")
+    args = cmd_parser.parse_args()
+
+    # Print the totals of each span
+    print(f"{'category':<10} {'span':<24} {'count':>6} {'wall [s]':>10} {'CPU [s]':>10} {'child CPU [s]':>14} {'peak RSS [MiB]':>15} {'output [MiB]':>13}")
+    for t in summarize_trace(args.trace_file):
+        print(f"{t['cat']:<10} {t['name']:<24} {t['count']:>6} {t['wall_s']:>10.1f} {t['cpu_s']:>10.1f} {t['child_cpu_s']:>14.1f} "
+              f"{t['child_peak_rss_mb']:>15.1f} {t['output_bytes'] / 2**20:>13.2f}")
+
+    sys.exit(0)
@@ -0,0 +1,200 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: sweep.py
+# Date: 17/10/2026
+# Description: Design-space sweep specifications expanding into test lists
+
+import argparse
+import sys
+import os
+import math
+import itertools
+import types
+import numpy as np
+import yaml
+
+# Size of the data types in bytes
+ELEM_SIZE = {
+    "int32": 4,
+    "int16": 2,
+    "int8": 1,
+}
+
+# Constants available in the constraint and output expressions
+# (NM-Carus memory, see config/heepatia-cfg.hjson)
+SWEEP_CONSTANTS = {
+    "carus_vrf_size": 0x10000,      # bytes
+    "carus_num_vregs": 32,
+    "carus_vreg_size": 0x10000 // 32,
+}
+
+# Functions available in the expressions
+SWEEP_FUNCTIONS = {
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "ceil": math.ceil,
+    "floor": math.floor,
+    "log2": math.log2,
+}
+
+# Extensions of the sweep specification files
+SWEEP_EXTENSIONS = (".yaml", ".yml")
+
+# Expand the values of a parameter
+def get_levels(name: str, spec) -> list:
+    """Expand a parameter specification into its list of values.
+
+    A parameter is a list of values, a single value, {range: [start, stop,
+    step]} (stop excluded, as Python's range), or {pow2: [min, max]} (powers
+    of two between min and max, included).
+    """
+    if isinstance(spec, list):
+        levels = spec
+    elif isinstance(spec, dict) and "range" in spec:
+        levels = list(range(*spec["range"]))
+    elif isinstance(spec, dict) and "pow2" in spec:
+        low, high = spec["pow2"]
+        levels = [1 << e for e in range(max(0, math.ceil(math.log2(low))), math.floor(math.log2(high)) + 1)]
+    elif isinstance(spec, dict):
+        raise ValueError(f"invalid specification of parameter '{name}': {spec}")
+    else:
+        levels = [spec]
+    if not levels:
+        raise ValueError(f"parameter '{name}' has no values")
+    return levels
+
+class sweep:
+    """Sweep of one application over a set of parameters.
+
+    The specification is a dictionary with the following entries:
+    - app: application name (e.g., 'carus-matmul');
+    - data_type: data types (a parameter specification, see get_levels);
+    - params: kernel options, in command-line order, each mapped to a
+      parameter specification (e.g., 'row_a: {pow2: [4, 32]}');
+    - num_outs: number of output samples, as an integer or an expression;
+    - constraints: list of expressions that each test must satisfy;
+    - sample: optional dictionary selecting a Latin-hypercube sample of the
+      design space ({method: lhs, count: N, seed: S}) instead of the full
+      cartesian product.
+    Expressions are Python expressions of the parameters, of 'elem_size'
+    (the size of the data type in bytes), and of the constants in
+    SWEEP_CONSTANTS.
+    """
+
+    # Initialize sweep properties
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.app = spec["app"]
+        self.params: dict = {"data_type": get_levels("data_type", spec.get("data_type", list(ELEM_SIZE)))}
+        for name, param_spec in (spec.get("params") or {}).items():
+            self.params[name] = get_levels(name, param_spec)
+        self.num_outs = spec.get("num_outs", 0)
+        self.constraints = [(c, compile(str(c), f"<{self.app} constraint>", "eval")) for c in spec.get("constraints", [])]
+        self.sample: dict = spec.get("sample") or {"method": "product"}
+        if self.sample["method"] not in ("product", "lhs"):
+            raise ValueError(f"{self.app}: invalid sampling method '{self.sample['method']}'")
+
+    # Evaluate an expression on a design point
+    def evaluate(self, expr, point: dict):
+        """Evaluate an expression (source or compiled) on a design point; literal values are returned as is."""
+        if isinstance(expr, str):
+            expr = compile(expr, f"<{self.app}>", "eval")
+        elif not isinstance(expr, types.CodeType):
+            return expr
+        names = dict(SWEEP_CONSTANTS, **SWEEP_FUNCTIONS, **point)
+        names["elem_size"] = ELEM_SIZE.get(point["data_type"], 0)
+        return eval(expr, {"__builtins__": {}}, names)
+
+    # Check the constraints on a design point
+    def is_valid(self, point: dict) -> bool:
+        """Check whether a design point satisfies all the constraints."""
+        return all(self.evaluate(code, point) for _, code in self.constraints)
+
+    # Design points
+    def points(self):
+        """Generate the valid design points, one at a time."""
+        names = list(self.params)
+        if self.sample["method"] == "product":
+            for values in itertools.product(*self.params.values()):
+                point = dict(zip(names, values))
+                if self.is_valid(point):
+                    yield point
+            return
+
+        # Latin-hypercube sample: each parameter is split in 'count' strata,
+        # each used once; invalid points are replaced by a new sample
+        count = self.sample["count"]
+        rng = np.random.default_rng(self.sample.get("seed", 0))
+        seen: set = set()
+        for _ in range(self.sample.get("max_rounds", 20)):
+            missing = count - len(seen)
+            if missing <= 0:
+                return
+            strata = [(rng.permutation(missing) + rng.random(missing)) / missing for _ in names]
+            for i in range(missing):
+                values = tuple(self.params[n][int(s[i] * len(self.params[n]))] for n, s in zip(names, strata))
+                point = dict(zip(names, values))
+                if values not in seen and self.is_valid(point):
+                    seen.add(values)
+                    yield point
+
+    # Tests of the sweep
+    def get_tests(self, pwr: bool = False):
+        """Generate the (app_name, data_type, num_outs, kernel_params) tuples of the sweep."""
+        for point in self.points():
+            kernel_params = " ".join(f"--{name} {value}" for name, value in point.items() if name != "data_type")
+            num_outs = 0 if pwr else int(self.evaluate(self.num_outs, point))
+            yield self.app, point["data_type"], num_outs, kernel_params
+
+# Check whether a configuration file is a sweep specification
+def is_sweep_file(config_file: str) -> bool:
+    """Sweep specifications are recognized by their extension."""
+    return os.path.splitext(config_file)[1] in SWEEP_EXTENSIONS
+
+# Load the sweeps of a specification file
+def load_sweeps(spec_file: str) -> list:
+    """Load a YAML file containing one sweep specification or a list of them."""
+    with open(spec_file, "r") as f:
+        specs = yaml.safe_load(f)
+    if isinstance(specs, dict):
+        specs = [specs]
+    return [sweep(spec) for spec in specs]
+
+# Expand a specification file
+def expand_sweeps(spec_file: str, pwr: bool = False):
+    """Generate the tests of all the sweeps of a specification file."""
+    for s in load_sweeps(spec_file):
+        yield from s.get_tests(pwr)
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Expand a sweep specification into a test list")
+    cmd_parser.add_argument("spec_file",
+                            help="Sweep specification (YAML)")
+    cmd_parser.add_argument("out_file",
+                            help="Output test list (default: standard output)",
+                            nargs="?")
+    cmd_parser.add_argument("--power",
+                            help="Write a power test list (without the number of outputs).",
+                            action="store_true")
+    args = cmd_parser.parse_args()
+
+    # Expand the sweeps
+    out = sys.stdout if args.out_file is None else open(args.out_file, "w")
+    if args.power:
+        print("# [benchmark] [datatype] [kernel_options]", file=out)
+    else:
+        print("# [benchmark] [datatype] [num_outputs] [kernel_options]", file=out)
+    num_tests = 0
+    for app_name, data_type, num_outs, kernel_params in expand_sweeps(args.spec_file, args.power):
+        fields = [app_name, data_type] + ([] if args.power else [str(num_outs)]) + [kernel_params]
+        print(" ".join(f for f in fields if f), file=out)
+        num_tests += 1
+    if out is not sys.stdout:
+        out.close()
+    print(f"### {num_tests} tests generated from '{args.spec_file}'", file=sys.stderr)
+
+    sys.exit(0)
@@ -11,9 +11,70 @@ import argparse
 import subprocess
 import sys
 import os
-import re
 import csv
-import pandas as pd
+import time
+import shutil
+import json
+import hashlib
+import glob
+import functools
+import contextlib
+import worktree
+import stage_trace
+from pipeline import pipeline_stage, stage_pipeline
+from build_cache import build_cache
+from sim_model import verilator_model
+from campaign_journal import campaign_journal
+from vcd_reader import vcd_reader
+from power_estimator import power_estimator
+from power_rollup import rollup_power, POWER_CATEGORIES, POWER_METRICS
+from results_store import results_store, get_git_rev
+from perf_counters import decode_counters, PERF_PHASES
+from sweep import is_sweep_file, expand_sweeps
+from cycle_model import cycle_model
+from stage_trace import stage_tracer, add_output
+
+# Hierarchies whose switching activity is extracted from the power VCD files
+VCD_ACTIVITY_SCOPES = [
+    "u_core_v_mini_mcu/cpu_subsystem_i",
+    "u_core_v_mini_mcu/memory_subsystem_i",
+    "u_core_v_mini_mcu/system_bus_i",
+]
+
+# Near-memory computing devices, by application prefix (e.g., 'carus-matmul'):
+# label, make variable with their number of instances (see util/heepatia-gen.py),
+# and hierarchy of each instance
+NMC_DEVICES = {
+    "carus": ("NM-Carus", "CARUS_NUM", "u_heepatia_peripherals/gen_carus_{}__u_nm_carus_wrapper"),
+    "caesar": ("NM-Caesar", "CAESAR_NUM", "u_heepatia_peripherals/gen_caesar_{}__u_nm_caesar_wrapper"),
+    "cgra": ("OE-CGRA", None, "u_heepatia_peripherals/u_cgra_top_wrapper"),
+}
+
+# Maximum number of instances of each NMC device
+MAX_NMC_INSTANCES = 16
+
+# Number of instances of an NMC device in the current hardware configuration
+def get_nmc_instances(mode: str) -> int:
+    """Read the number of instances of 'mode' from the make variables (1 for the CPU and single-instance devices)."""
+    if mode not in NMC_DEVICES or NMC_DEVICES[mode][1] is None:
+        return 1
+    var = NMC_DEVICES[mode][1]
+    num = int(os.environ.get(var, "1"))
+    if not 1 <= num <= MAX_NMC_INSTANCES:
+        raise ValueError(f"{var}={num} out of range (1 to {MAX_NMC_INSTANCES} instances)")
+    return num
+
+# Hierarchies of the instances of an NMC device
+def get_nmc_scopes(mode: str, num_instances: int) -> list:
+    """Get the hierarchy of each instance of 'mode' (none for the CPU)."""
+    if mode not in NMC_DEVICES:
+        return []
+    scope = NMC_DEVICES[mode][2]
+    return [scope.format(i) for i in range(num_instances)] if "{}" in scope else [scope]
+
+# Test failure (recorded in the campaign journal, does not stop the campaign)
+class test_error(Exception):
+    """Error raised when a single test fails."""
 
 # Kernel test class
 class app_test:
@@ -28,10 +89,13 @@ class app_test:
             raise ValueError("Invalid data type")
         self.data["data_type"] = data_type
         self.data["num_outs"] = num_outs
-        s = name.split("-", 1)
+        # Applications in a subdirectory (e.g., 'sched_benchmark/carus-add-tiling')
+        # are named after their device too
+        s = os.path.basename(name).split("-", 1)
         self.data["memory_type"] = s[0]
         self.data["kernel_name"] = s[1]
         self.data["kernel_params"] = kernel_params
+        self.data["nmc_instances"] = get_nmc_instances(s[0])
 
     # Append additional data
     def append_data(self, data: dict):
@@ -42,15 +106,43 @@ class test_scheduler:
     """Test scheduler class."""
 
     # Initialize the configuration file
-    def __init__(self, config_file: str):
+    def __init__(self, config_file: str, jobs: int = 1, work_dir: str = None, cache: build_cache = None, model: verilator_model = None, pwr_jobs: int = 1,
+                 build_jobs: int = None, sim_jobs: int = None, queue_size: int = None, vcd_activity: bool = False, trim_vcd: bool = False, vcd_trigger: str = None,
+                 estimator: power_estimator = None, store: results_store = None, cycle_model: cycle_model = None, max_model_error: float = 0.02,
+                 trace_file: str = None):
         self.config_file = config_file
         self.tests: app_test = []
         self.report_file: str = None
+        self.jobs = jobs
+        self.root_dir = os.getcwd()
+        self.work_dir = work_dir if work_dir is not None else os.path.join(self.root_dir, "build", "performance-analysis", "workers")
+        self.build_cache = cache
+        self.model = model
+        self.tracer = stage_tracer(trace_file)
+        self.pwr_jobs = pwr_jobs
+        self.build_jobs = build_jobs if build_jobs is not None else jobs
+        self.sim_jobs = sim_jobs if sim_jobs is not None else jobs
+        self.queue_size = queue_size
+        self.vcd_activity = vcd_activity
+        self.trim_vcd = trim_vcd
+        self.vcd_trigger = vcd_trigger
+        self.estimator = estimator
+        self.store = store
+        self.cycle_model = cycle_model
+        self.max_model_error = max_model_error
+        self.trees: dict = {}
+        self.firmware_dir = os.path.join(self.root_dir, "build", "performance-analysis", "firmware")
 
     # Configuration file parser
     def config_parser(self, pwr: bool = False) -> int:
-        """Parse the configuration file."""
-        
+        """Parse the configuration file (a test list or a sweep specification)."""
+
+        # Expand sweep specifications
+        if is_sweep_file(self.config_file):
+            for app_name, data_type, num_outs, kernel_params in expand_sweeps(self.config_file, pwr):
+                self.tests.append(app_test(app_name, data_type, num_outs, kernel_params))
+            return len(self.tests)
+
         # Load test lines
         with open(self.config_file, "r") as cf:
             tests = cf.readlines()
@@ -88,331 +180,520 @@ class test_scheduler:
 
 
     # Build test application
-    def build_test(self, test: app_test, cdefs: str = ""):
+    def build_test(self, test: app_test, cdefs: str = "", cwd: str = None):
         """Build the test application."""
+        kernel_params = f"{test.data['data_type']} {test.data['kernel_params']}"
+
+        # Restore the firmware from the build cache, if available
+        cache_key: str = None
+        root_dir = cwd if cwd is not None else self.root_dir
+        app_dir = os.path.join(root_dir, "build", "sw", "app")
+        if self.build_cache is not None:
+            cache_key = self.build_cache.get_key(root_dir, test.data['app_name'], kernel_params, cdefs)
+            if self.build_cache.restore(cache_key, app_dir):
+                print(f"  # Restored '{test.data['app_name']}' from build cache ({cache_key[:12]})")
+                return
+
+        # Generate the application data, then build the firmware
+        make_args = [f"PROJECT={test.data['app_name']}", f"KERNEL_PARAMS={kernel_params}", f"CDEFS={cdefs}"]
         try:
-            subprocess.run(["make", "app", f"PROJECT={test.data['app_name']}", f"KERNEL_PARAMS={test.data['data_type']} {test.data['kernel_params']}", f"CDEFS={cdefs}"], check=True, capture_output=True)
+            with self.tracer.span("datagen", "command"):
+                stage_trace.run(["make", "app-datagen"] + make_args, check=True, capture_output=True, cwd=cwd)
+            with self.tracer.span("make app", "command"):
+                stage_trace.run(["make", "app", "SKIP_DATAGEN=1"] + make_args, check=True, capture_output=True, cwd=cwd)
         except subprocess.CalledProcessError as e:
             print(f"\n### ERROR: failed to build '{test.data['app_name']}'", file=sys.stderr)
             print(e.stderr.decode("utf-8"), file=sys.stderr)
-            sys.exit(1)
+            raise test_error(f"failed to build '{test.data['app_name']}'") from e
+
+        # Add the firmware to the build cache
+        if cache_key is not None:
+            self.build_cache.store(cache_key, app_dir)
+
+    # Move the firmware out of the checkout, so that the next build can start
+    def stage_firmware(self, index: int, cwd: str = None) -> str:
+        """Copy the firmware just built to a private directory and return its path."""
+        root_dir = cwd if cwd is not None else self.root_dir
+        fw_dir = os.path.join(self.firmware_dir, f"test-{index}")
+        shutil.rmtree(fw_dir, ignore_errors=True)
+        os.makedirs(fw_dir)
+        for f in glob.glob(os.path.join(root_dir, "build", "sw", "app", "main.*")):
+            shutil.copy(f, fw_dir)
+        return os.path.join(fw_dir, "main.hex")
 
     # Run RTL simulation with verilator and capture stdout
-    def run_verilator(self, test: app_test) -> str:
+    def run_verilator(self, test: app_test, cwd: str = None, firmware: str = None, run_dir: str = None) -> str:
+        root_dir = cwd if cwd is not None else self.root_dir
+        if firmware is None:
+            firmware = os.path.join(root_dir, "build", "sw", "app", "main.hex")
         try:
-            sim_out = subprocess.run(["make", "verilator-opt", "MAX_CYCLES=2000000"], check=True, capture_output=True)
+            if self.model is not None:
+                # Launch the shared model directly on the test firmware
+                if run_dir is None:
+                    run_dir = os.path.join(root_dir, "build", "performance-analysis", "sim-run")
+                with self.tracer.span("verilator", "command"):
+                    return self.model.run(firmware, run_dir, max_cycles=2000000)
+            with self.tracer.span("verilator", "command"):
+                sim_out = stage_trace.run(["make", "verilator-opt", "MAX_CYCLES=2000000", f"FIRMWARE={firmware}"], check=True, capture_output=True, cwd=cwd)
         except subprocess.CalledProcessError as e:
             print(f"\n### ERROR: failed to simulate '{test.data['app_name']}'", file=sys.stderr)
-            print(e.stderr.decode("utf-8"), file=sys.stderr)
-            sys.exit(1)
+            print(e.stderr.decode("utf-8") if e.stderr is not None else "", file=sys.stderr)
+            raise test_error(f"failed to simulate '{test.data['app_name']}'") from e
         return sim_out.stdout.decode("utf-8")
 
     # Run postlayout simulation using Questasim
     def run_postlayout(self, test: app_test, sim_args: str = ""):
         arg_list = [arg for arg in sim_args.split(" ") if arg]
         try:
-            subprocess.run(["make", "questasim-postlayout-run"] + arg_list, check=True)
+            with self.tracer.span("questasim", "command"):
+                stage_trace.run(["make", "questasim-postlayout-run"] + arg_list, check=True)
         except subprocess.CalledProcessError as e:
             print(f"\n### ERROR: failed to simulate '{test.data['app_name']}'", file=sys.stderr)
-            print(e.stderr.decode("utf-8"), file=sys.stderr)
-            sys.exit(1)
+            print(e.stderr.decode("utf-8") if e.stderr is not None else "", file=sys.stderr)
+            raise test_error(f"failed to simulate '{test.data['app_name']}'") from e
 
     # Perform power analysis using PrimePower
-    def run_primepower(self, vcd_file: str):
+    def run_primepower(self, vcd_file: str, reports_dir: str = None):
+        make_args = [f"PWR_VCD={os.path.abspath(vcd_file)}"]
+        if reports_dir is not None:
+            make_args.append(f"PWR_REPORTS_DIR={os.path.abspath(reports_dir)}")
         try:
-            subprocess.run(["make", "power-analysis", f"PWR_VCD={os.path.abspath(vcd_file)}"], check=True)
+            with self.tracer.span("primepower", "command"):
+                stage_trace.run(["make", "power-analysis"] + make_args, check=True, capture_output=self.pwr_jobs > 1)
         except subprocess.CalledProcessError as e:
             print("\n### ERROR: failed to run power analysis", file=sys.stderr)
-            print(e.stderr.decode("utf-8"), file=sys.stderr)
-            sys.exit(1)
+            print(e.stderr.decode("utf-8") if e.stderr is not None else "", file=sys.stderr)
+            raise test_error(f"failed to run power analysis on '{vcd_file}'") from e
 
     # Run RTL simulations on Verilator and extract throughput metrics
-    def run_throughput(self, report_dir: str, report_name: str):
-        """Run throughput simulations with Verilator."""
+    def run_throughput(self, report_dir: str, report_name: str, resume: bool = False) -> int:
+        """Run throughput simulations with Verilator. Return the number of failed tests."""
         # Parse the configuration file
         print(f"### Parsing configuration file '{self.config_file}'...")
         num_tests = self.config_parser()
         print(f"- {num_tests} tests found")
 
-        # Initialize report file
+        # Initialize report file and campaign journal
         report_file = os.path.join(report_dir, report_name)
         self.init_throughput_report(report_file)
-
-        # Run tests
-        curr_test = 0
+        self.journal = campaign_journal(f"{report_file}.journal", resume)
+        if self.build_cache is not None:
+            cache_stats = self.build_cache.get_stats()
+
+        # Skip the tests whose cycles the cycle model predicts accurately
+        if self.cycle_model is not None:
+            self.predict_tests()
+
+        # Build (or reuse) the Verilator model for the current hardware configuration
+        if self.model is not None:
+            print("### Preparing Verilator model...")
+            with self.phase("model build"):
+                try:
+                    rebuilt = self.model.build()
+                except RuntimeError as e:
+                    raise test_error(str(e)) from e
+            print(f"- {'built' if rebuilt else 'reused'} '{self.model.binary}' ({self.model.fingerprint[:12]})")
+
+        # Private checkouts for concurrent builds and (without a shared
+        # model) concurrent simulations
+        self.init_trees("build", self.build_jobs)
+        if self.model is None:
+            self.init_trees("sim", self.sim_jobs)
+
+        # Run tests: build, simulate, and parse in a pipeline
+        stages = [
+            pipeline_stage("build", self.build_throughput_test, self.build_jobs, self.queue_size),
+            pipeline_stage("simulate", self.simulate_throughput_test, self.sim_jobs, self.queue_size),
+            pipeline_stage("parse", self.parse_throughput_test, 1, self.queue_size),
+        ]
+        num_failed = self.run_tests(stages, self.add_throughput_report, "throughput")
+
+        # Report build cache statistics and timing breakdown
+        if self.build_cache is not None:
+            self.build_cache.print_stats(cache_stats)
+        self.print_phase_times()
+        return num_failed
+
+    # Record the tests predicted by the cycle model as completed
+    def predict_tests(self) -> int:
+        """Predict the report entries of the pending tests with the cycle model. Return the number of predicted tests."""
+        num_predicted = 0
         for t in self.tests:
-            curr_test += 1
-            print(f"### [{curr_test}/{num_tests}] - {t.data['app_name']}")
-            print(f"    - data type: {t.data['data_type']}")
-            print(f"    - kernel parameters: {t.data['kernel_params']}")
-            
-            # Build test application
-            print(f"  # Building test {t.data['app_name']}...")
-            self.build_test(t)
-
-            # Simulate the application with Verilator
-            print(f"  # Simulating test {t.data['app_name']} with Verilator...")
-            sim_out = self.run_verilator(t)
-
-            # Parse the simulation output
-            print("  # Parsing simulation output...")
-            thr_data = self.parse_sim_output(sim_out)
-
-            # Generate throughput report entry
-            rpt: dict = {
-                "kernel_name": t.data['kernel_name'],
-                "data_type": t.data['data_type'],
-                "num_outs": t.data['num_outs'],
-                "kernel_params": t.data['kernel_params']
-            }
-            print(f" ## {t.data['app_name']} - {t.data['data_type']} simulation results:")
-            if 'carus-' in t.data['app_name']:
-                # Add CPU cycles to the report
-                rpt['memory_type'] = "cpu"
-                rpt['cycles'] = thr_data['cpu_cycles']
-                print(f"    - CPU cycles: {thr_data['cpu_cycles']}")
-                self.add_throughput_report(rpt)
-
-                # Add NM-Carus cycles to the report
-                rpt['memory_type'] = "carus"
-                rpt['cycles'] = thr_data['carus_cycles']
-                print(f"    - NM-Carus cycles: {thr_data['carus_cycles']}")
-                self.add_throughput_report(rpt)
-
+            if self.journal.is_done(t.data):
+                continue
+            rpts = self.cycle_model.predict_test(t.data, self.max_model_error)
+            if rpts is not None:
+                self.journal.add_done(t.data, rpts)
+                num_predicted += 1
+        print(f"### Cycle model: {num_predicted}/{len(self.tests)} tests predicted within {100 * self.max_model_error:g}% held-out error, not simulated")
+        return num_predicted
+
+    # Create the private checkouts used by the workers of a stage
+    def init_trees(self, stage: str, workers: int):
+        """Create one worktree per worker of 'stage' (none for a single worker)."""
+        self.trees[stage] = [self.root_dir]
+        if workers > 1:
+            print(f"### Preparing {workers} {stage} worker trees in '{self.work_dir}'...")
+            trees = worktree.create_worker_trees(self.root_dir, self.work_dir, workers, prefix=stage)
+            self.trees[stage] = [tree.tree_dir for tree in trees]
+
+    # Get the checkout of a stage worker
+    def get_tree(self, stage: str, slot: int) -> str:
+        """Get the checkout used by worker 'slot' of 'stage'."""
+        trees = self.trees.get(stage, [self.root_dir])
+        return trees[slot % len(trees)]
+
+    # Run tests, journal their outcome, and write the reports in configuration order
+    def run_tests(self, stages: list, add_report, kind: str) -> int:
+        """Run the pipeline 'stages' on every test not completed yet. Return the number of failed tests."""
+        num_tests = len(self.tests)
+
+        # Tag the results of this campaign with the hardware configuration and revision
+        if self.store is not None:
+            model = self.model if self.model is not None else verilator_model(self.root_dir)
+            self.store.start_campaign(model.get_config_hash(), get_git_rev(self.root_dir))
+
+        # Skip the tests completed in a previous run
+        pending = [i for i, t in enumerate(self.tests) if not self.journal.is_done(t.data)]
+        pending_set = set(pending)
+        if len(pending) < num_tests:
+            print(f"### Skipping {num_tests - len(pending)}/{num_tests} tests already completed")
+
+        # Write report entries as soon as all the previous tests are complete
+        next_test = 0
+        def _flush():
+            nonlocal next_test
+            while next_test < num_tests and next_test not in pending_set:
+                t = self.tests[next_test]
+                if self.journal.is_done(t.data):
+                    for rpt in self.journal.get_reports(t.data):
+                        add_report(rpt)
+                next_test += 1
+
+        # Record the outcome of a test
+        def _complete(i: int, rpts: list, error: Exception):
+            t = self.tests[i]
+            if error is None:
+                self.journal.add_done(t.data, rpts)
+                if self.store is not None:
+                    self.store.append(kind, rpts)
             else:
-                print(f"ERROR: unsupported test name '{t.data['app_name']}'", file=sys.stderr)
-                sys.exit(1)
+                print(f"### ERROR: test '{t.data['app_name']}' ({t.data['data_type']} {t.data['kernel_params']}) failed: {error}", file=sys.stderr)
+                self.journal.add_failed(t.data, f"{type(error).__name__}: {error}")
+            pending_set.discard(i)
+            _flush()
+
+        # Run the pending tests through the pipeline; each test enters the
+        # pipeline as its index and accumulates its state in a dictionary
+        _flush()
+        pipe = stage_pipeline(stages)
+        try:
+            pipe.run([(i, {"index": i}) for i in pending], _complete)
+        finally:
+            if self.store is not None:
+                self.store.flush(kind)
+        shutil.rmtree(self.firmware_dir, ignore_errors=True)
+        pipe.print_utilisation()
+
+        # Report failed tests
+        keys = {campaign_journal.get_key(t.data) for t in self.tests}
+        failed = [r for r in self.journal.get_failed() if r["key"] in keys]
+        if failed:
+            print(f"### {len(failed)}/{num_tests} tests failed (see '{self.journal.journal_file}'):", file=sys.stderr)
+            for r in failed:
+                print(f"    - {r['key']}: {r['error']}", file=sys.stderr)
+        return len(failed)
+
+    # Throughput pipeline, build stage
+    def build_throughput_test(self, slot: int, ctx: dict) -> dict:
+        """Build a test application and stage its firmware."""
+        i = ctx["index"]
+        t = self.tests[i]
+        cwd = self.get_tree("build", slot)
+        print(f"### [{i+1}/{len(self.tests)}] - {t.data['app_name']}")
+        print(f"    - data type: {t.data['data_type']}")
+        print(f"    - kernel parameters: {t.data['kernel_params']}")
+
+        # Build test application
+        print(f"  # Building test {t.data['app_name']}...")
+        with self.phase("firmware build", t):
+            self.build_test(t, cwd=None if cwd == self.root_dir else cwd)
+            ctx["firmware"] = self.stage_firmware(i, cwd)
+            add_output(ctx["firmware"])
+        return ctx
+
+    # Throughput pipeline, simulation stage
+    def simulate_throughput_test(self, slot: int, ctx: dict) -> dict:
+        """Simulate the staged firmware of a test with Verilator."""
+        t = self.tests[ctx["index"]]
+        cwd = self.get_tree("sim", slot)
+        run_dir = os.path.join(self.root_dir, "build", "performance-analysis", "sim-run", f"worker-{slot}")
+
+        # Simulate the application with Verilator
+        print(f"  # Simulating test {t.data['app_name']} with Verilator...")
+        with self.phase("simulation", t):
+            ctx["sim_out"] = self.run_verilator(t, cwd=None if cwd == self.root_dir else cwd, firmware=ctx["firmware"], run_dir=run_dir)
+        shutil.rmtree(os.path.dirname(ctx["firmware"]), ignore_errors=True)
+        return ctx
+
+    # Throughput pipeline, parsing stage
+    def parse_throughput_test(self, slot: int, ctx: dict) -> list:
+        """Parse the simulation output of a test, returning its throughput report entries."""
+        t = self.tests[ctx["index"]]
+
+        # Parse the simulation output
+        print(f"  # Parsing simulation output of {t.data['app_name']}...")
+        with self.phase("parsing", t):
+            counters = self.parse_sim_output(ctx["sim_out"])
+
+        # Generate throughput report entry
+        rpt: dict = {
+            "kernel_name": t.data['kernel_name'],
+            "data_type": t.data['data_type'],
+            "num_outs": t.data['num_outs'],
+            "kernel_params": t.data['kernel_params'],
+            "nmc_instances": t.data['nmc_instances']
+        }
+        nmc = t.data['memory_type']
+        if nmc in NMC_DEVICES:
+            # CPU and NMC cycles (the CPU reference is optional)
+            if nmc not in counters:
+                raise test_error(f"no {NMC_DEVICES[nmc][0]} cycle count in the output of '{t.data['app_name']}'")
+            modes = ["cpu", nmc]
+        else:
+            # Any application printing performance counter records
+            if not counters:
+                raise test_error(f"no performance counters in the output of '{t.data['app_name']}'")
+            modes = list(counters)
+
+        # Add the cycles of each mode and their per-phase breakdown to the report
+        rpts = []
+        instances = f" ({t.data['nmc_instances']} instances)" if t.data['nmc_instances'] > 1 else ""
+        print(f" ## {t.data['app_name']} - {t.data['data_type']}{instances} simulation results:")
+        for mode in modes:
+            phases = counters.get(mode, {"total": 0})
+            if "total" not in phases:
+                raise test_error(f"no total {mode} cycle count in the output of '{t.data['app_name']}'")
+            breakdown = {f"cycles_{phase}": cycles for phase, cycles in phases.items() if phase != "total"}
+            rpts.append(dict(rpt, memory_type=mode, cycles=phases["total"], **breakdown))
+            print(f"    - {mode} cycles: {phases['total']}")
+            for phase, cycles in breakdown.items():
+                print(f"      - {phase[len('cycles_'):]}: {cycles}")
+
+        return rpts
 
 
     # Run power simulation (Questasim + PrimePower) and extract power metrics
-    def run_power(self, log_dir: str, report_dir: str, report_name: str):
-        """Run power simulations with Questasim and PrimePower."""
+    def run_power(self, log_dir: str, report_dir: str, report_name: str, resume: bool = False) -> int:
+        """Run power simulations with Questasim and PrimePower. Return the number of failed tests."""
 
         report_file = os.path.join(report_dir, report_name)
         self.init_power_report(report_file)
+        self.journal = campaign_journal(f"{report_file}.journal", resume)
+        if self.build_cache is not None:
+            cache_stats = self.build_cache.get_stats()
 
         # Parse the configuration file
         print(f"### Parsing configuration file '{self.config_file}'...")
         num_tests = self.config_parser(pwr=True)
         print(f"- {num_tests} tests found")
 
-        # Run tests
-        curr_test = 0
-        for t in self.tests:
-            curr_test += 1
-            cdefs = "POWER_SIM"
-            print(f"### [{curr_test}/{num_tests}] - {t.data['app_name']}")
-            print(f"    - data type: {t.data['data_type']}")
-            print(f"    - kernel parameters: {t.data['kernel_params']}")
-            print(f"    - CDEFS: {cdefs}")
-
-            # Build test application
-            print(f"  # Building test {t.data['app_name']}...")
-            self.build_test(t, cdefs)
-
-            # Run post-layout simulation
-            print(f"  # Simulating test {t.data['app_name']} with Questasim...")
-            self.run_postlayout(t, "VCD_MODE=2")
-            
-            # Prepare test output directory
-            out_dir = os.path.join(report_dir, t.data['app_name'])
-            os.makedirs(out_dir, exist_ok=True)
-
-            # Initialize power
-            pwr_data: dict
-            
-            # Initialize report
-            rpt: dict = {
-                "kernel_name": t.data['kernel_name'],
-                "data_type": t.data['data_type'],
-                "num_outs": t.data['num_outs'],
-                "kernel_params": t.data['kernel_params']
-            }
-
-            if "carus-" in t.data['app_name']:
-                # Run power analysis on NM-Carus VCD file
-                vcd_file = os.path.join(log_dir, "waves-0.vcd")
-                print(f"  # Running NM-Carus power analysis on {vcd_file}...")
-                self.run_primepower(vcd_file)
-                pwr_csv = os.path.join("implementation", "power_analysis", "reports", "power.csv")
-                pwr_csv_new = os.path.join(out_dir, f"power-carus-{t.data['data_type']}.csv")
-                os.rename(pwr_csv, pwr_csv_new)
-                pwr_data = self.get_power("carus", pwr_csv_new)
-
-                # Add test results to the report
-                rpt['memory_type'] = "carus"
-                rpt.update(pwr_data)
-                self.add_power_report(rpt)
-                
-                # Report power consumption
-                print(f"    - NM-Carus power: {(pwr_data['sys_pwr'] + pwr_data['nmc_pwr'])*1000:.4} mW")
-
-                # Run power analysis on CPU VCD file
-                vcd_file = os.path.join(log_dir, "waves-1.vcd")
-                print(f"  # Running CPU power analysis on {vcd_file}...")
-                self.run_primepower(vcd_file)
-                pwr_csv = os.path.join("implementation", "power_analysis", "reports", "power.csv")
-                pwr_csv_new = os.path.join(out_dir, f"power-cpu-{t.data['data_type']}.csv")
-                os.rename(pwr_csv, pwr_csv_new)
-                pwr_data = self.get_power("cpu", pwr_csv_new)
-
-                # Add test results to the report
-                rpt['memory_type'] = "cpu"
-                rpt.update(pwr_data)
-                self.add_power_report(rpt)
-
-                # Report power consumption
-                print(f"    - CPU power: {(pwr_data['sys_pwr'])*1000:.4} mW")
-
-            else:
-                print(f"ERROR: unsupported test name '{t.data['app_name']}'", file=sys.stderr)
-                sys.exit(1)
+        # Run tests: build, simulate, and analyse in a pipeline. The
+        # post-layout simulation dumps its VCD files into 'log_dir', so only
+        # one simulation can run at a time.
+        self.init_trees("build", self.build_jobs)
+        stages = [
+            pipeline_stage("build", self.build_power_test, self.build_jobs, self.queue_size),
+            pipeline_stage("simulate", functools.partial(self.simulate_power_test, log_dir=log_dir, report_dir=report_dir), 1, self.queue_size),
+            pipeline_stage("power analysis", self.analyse_power_test, self.pwr_jobs, self.queue_size),
+        ]
+        num_failed = self.run_tests(stages, self.add_power_report, "power" if self.estimator is None else "power_estimate")
+
+        # Report build cache statistics and timing breakdown
+        if self.build_cache is not None:
+            self.build_cache.print_stats(cache_stats)
+        self.print_phase_times()
+        return num_failed
+
+    # Power pipeline, build stage
+    def build_power_test(self, slot: int, ctx: dict) -> dict:
+        """Build a test application for power simulation and stage its firmware."""
+        i = ctx["index"]
+        t = self.tests[i]
+        cwd = self.get_tree("build", slot)
+        cdefs = "POWER_SIM"
+        print(f"### [{i+1}/{len(self.tests)}] - {t.data['app_name']}")
+        print(f"    - data type: {t.data['data_type']}")
+        print(f"    - kernel parameters: {t.data['kernel_params']}")
+        print(f"    - CDEFS: {cdefs}")
+
+        # Build test application
+        print(f"  # Building test {t.data['app_name']}...")
+        with self.phase("firmware build", t):
+            self.build_test(t, cdefs, cwd=None if cwd == self.root_dir else cwd)
+            ctx["firmware"] = self.stage_firmware(i, cwd)
+            add_output(ctx["firmware"])
+        return ctx
+
+    # Power pipeline, simulation stage
+    def simulate_power_test(self, slot: int, ctx: dict, log_dir: str, report_dir: str) -> dict:
+        """Run the post-layout simulation of a test and move its VCD files to a private directory."""
+        t = self.tests[ctx["index"]]
+
+        # Run post-layout simulation
+        print(f"  # Simulating test {t.data['app_name']} with Questasim...")
+        with self.phase("simulation", t):
+            self.run_postlayout(t, f"VCD_MODE=2 FIRMWARE={ctx['firmware']}")
+            for vcd_file in glob.glob(os.path.join(log_dir, "*.vcd")):
+                add_output(vcd_file)
+        shutil.rmtree(os.path.dirname(ctx["firmware"]), ignore_errors=True)
+
+        # Dump windows of the executions, in the order the applications run them
+        ctx["devices"] = self.get_devices(t)
+
+        # Prepare test output directory
+        ctx["out_dir"] = os.path.join(report_dir, t.data['app_name'])
+        os.makedirs(ctx["out_dir"], exist_ok=True)
+
+        # Private directory for the VCD files and the power reports of this
+        # test, so that the next simulation does not overwrite them
+        params_hash = hashlib.sha1(t.data['kernel_params'].encode("utf-8")).hexdigest()[:8]
+        instances = f"-x{t.data['nmc_instances']}" if t.data['nmc_instances'] > 1 else ""
+        ctx["test_dir"] = os.path.join(ctx["out_dir"], f"{t.data['data_type']}-{params_hash}{instances}")
+        os.makedirs(ctx["test_dir"], exist_ok=True)
+        for _, _, vcd_name in ctx["devices"]:
+            os.replace(os.path.join(log_dir, vcd_name), os.path.join(ctx["test_dir"], vcd_name))
+        return ctx
+
+    # Executions dumped by the post-layout simulation of a test
+    def get_devices(self, t: app_test) -> list:
+        """Get the (mode, label, VCD file) of each execution of a power test.
+
+        The applications run the kernel on the NMC device first, then on the
+        CPU as a reference; each execution is a dump window of its own.
+        CPU-only applications have a single window.
+        """
+        mode = t.data['memory_type']
+        if mode in NMC_DEVICES:
+            return [(mode, NMC_DEVICES[mode][0], "waves-0.vcd"), ("cpu", "CPU", "waves-1.vcd")]
+        if mode == "cpu":
+            return [("cpu", "CPU", "waves-0.vcd")]
+        raise test_error(f"unsupported test name '{t.data['app_name']}' (expected one of: {', '.join(['cpu'] + list(NMC_DEVICES))})")
+
+    # Power pipeline, analysis stage
+    def analyse_power_test(self, slot: int, ctx: dict) -> list:
+        """Run power analysis on the VCD files of a test, returning its power report entries."""
+        t = self.tests[ctx["index"]]
+
+        # Initialize report
+        rpt: dict = {
+            "kernel_name": t.data['kernel_name'],
+            "data_type": t.data['data_type'],
+            "num_outs": t.data['num_outs'],
+            "kernel_params": t.data['kernel_params'],
+            "nmc_instances": t.data['nmc_instances']
+        }
 
+        rpts = []
+        for mode, label, vcd_name in ctx["devices"]:
+            vcd_file = os.path.join(ctx["test_dir"], vcd_name)
+            activity_file = os.path.join(ctx["test_dir"], f"activity-{mode}.json")
+            activity: dict = None
+            if self.vcd_activity or self.trim_vcd or self.vcd_trigger is not None or self.estimator is not None:
+                vcd_file, activity = self.get_vcd_activity(t, mode, label, vcd_file)
+
+            # Screen the configuration with the toggle-rate estimator
+            if self.estimator is not None:
+                pwr_data = self.estimator.estimate(mode, activity)
+                print(f"    - {t.data['app_name']} - {t.data['data_type']} {label} estimated power: {(pwr_data['sys_pwr'] + pwr_data['nmc_pwr'])*1000:.4} mW")
+                rpts.append(dict(rpt, memory_type=mode, **pwr_data))
+                continue
+
+            # Sign-off power analysis
+            pwr_csv = os.path.join(ctx["out_dir"], f"power-{mode}-{t.data['data_type']}.csv")
+            with self.phase("power analysis", t):
+                rpts.append(self.run_power_analysis(t, rpt, mode, label, vcd_file, os.path.join(ctx["test_dir"], mode), pwr_csv))
+
+            # Store the activity with the resulting power to calibrate the estimator
+            if activity is not None:
+                activity["mode"] = mode
+                activity["power"] = {m: rpts[-1][m] for m in POWER_METRICS}
+                with open(activity_file, "w") as f:
+                    json.dump(activity, f, indent=1)
+        return rpts
+
+    # Extract the measurement window and switching activity of a VCD file
+    def get_vcd_activity(self, t: app_test, mode: str, label: str, vcd_file: str) -> tuple:
+        """Stream a VCD file and return the VCD file to analyse (trimmed if requested) and its activity report."""
+        trim_file = f"{os.path.splitext(vcd_file)[0]}-trim.vcd" if self.trim_vcd else None
+        scopes = VCD_ACTIVITY_SCOPES + get_nmc_scopes(t.data['memory_type'], t.data['nmc_instances'])
+        if self.estimator is not None:
+            scopes = scopes + [h for h in self.estimator.features if h not in scopes]
+        print(f"  # Extracting {label} switching activity from {vcd_file}...")
+        with self.phase("VCD processing", t):
+            try:
+                activity = vcd_reader(vcd_file).get_activity(scopes, trigger=self.vcd_trigger, trim_file=trim_file, strict=False)
+            except (OSError, ValueError) as e:
+                raise test_error(f"failed to read '{vcd_file}': {e}") from e
+            if trim_file is not None:
+                add_output(trim_file)
+        print(f"    - {t.data['app_name']} - {t.data['data_type']} {label} window: {activity['duration_ns']:.1f} ns")
+        for scope, toggles in activity["toggles"].items():
+            print(f"    - {scope}: {toggles} toggles")
+        return (trim_file if trim_file is not None else vcd_file), activity
+
+    # Run power analysis on a VCD file and build the power report entry
+    def run_power_analysis(self, t: app_test, rpt: dict, mode: str, label: str, vcd_file: str, reports_dir: str, pwr_csv: str) -> dict:
+        """Analyse a VCD file with PrimePower and return the power report entry."""
+        print(f"  # Running {label} power analysis on {vcd_file}...")
+        self.run_primepower(vcd_file, reports_dir)
+        shutil.copy(os.path.join(reports_dir, "power.csv"), pwr_csv)
+        add_output(pwr_csv)
+        pwr_data = self.get_power(mode, pwr_csv)
+
+        # Report power consumption
+        print(f"    - {t.data['app_name']} - {t.data['data_type']} {label} power: {(pwr_data['sys_pwr'] + pwr_data['nmc_pwr'])*1000:.4} mW")
+        return dict(rpt, memory_type=mode, **pwr_data)
 
     def get_power(self, mode: str, csv_file: str) -> dict:
         """Analyse power report."""
-        # Cehck for valid mode
-        if not mode in ["cpu", "carus"]:
-            print(f"ERROR: invalid mode '{mode}'", file=sys.stderr)
-            sys.exit(1)
-
-        # Load CSV file
-        power_data = pd.read_csv(csv_file, index_col=0, header=0)
-        nmc_pwr_rows = []
-        nmc_ctl_rows = []
-        nmc_comp_rows = []
-        nmc_mem_rows = []
-        sys_pwr_rows = []
-        sys_cpu_rows = []
-        sys_mem_rows = []
-        sys_peri_rows = []
-        if mode == "cpu":
-            # Add CPU contributions from the CSV file
-            sys_pwr_rows = [
-                "u_core_v_mini_mcu/cpu_subsystem_i",                            # system CPU
-                "u_core_v_mini_mcu/memory_subsystem_i",                         # all SRAM banks
-                "u_core_v_mini_mcu/system_bus_i",                               # system bus
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/boot_rom_i",       # Boot ROM
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/soc_ctrl_i",       # SoC control registers
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/power_manager_i",  # Power manager
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/fast_intr_ctrl_i", # fast interrupt controller
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/dma_i",            # DMA
-                "u_core_v_mini_mcu/peripheral_subsystem_i/rv_plic_i",           # PLIC
-            ]
-            sys_cpu_rows = [
-                "u_core_v_mini_mcu/cpu_subsystem_i"
-            ]
-            sys_mem_rows = [
-                "u_core_v_mini_mcu/memory_subsystem_i"
-            ]
-            sys_peri_rows = [
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/fast_intr_ctrl_i",
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/dma_i",
-                "u_core_v_mini_mcu/peripheral_subsystem_i/rv_plic_i",
-            ]
-        elif mode == "carus":
-            # Add NM-Carus contributions from the CSV file
-            sys_pwr_rows = [
-                "u_core_v_mini_mcu/cpu_subsystem_i",                            # system CPU (idle)
-                "u_core_v_mini_mcu/system_bus_i",                               # system bus
-                "heepatia_bus",                                               # external bus
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_0__ram_i",       # SRAM bank 0 (.text)
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_1__ram_i",       # SRAM bank 1 (.data)
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_2__ram_i",       # SRAM interleaved bank 0
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_3__ram_i",       # SRAM interleaved bank 1
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_4__ram_i",       # SRAM interleaved bank 2
-                # "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_5__ram_i",     # Replaced by NM-Carus
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/boot_rom_i",       # Boot ROM
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/soc_ctrl_i",       # SoC controller
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/power_manager_i",  # Power manager
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/fast_intr_ctrl_i", # fast interrupt controller (DMA)
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/dma_i",            # DMA
-                "u_core_v_mini_mcu/peripheral_subsystem_i/rv_plic_i",           # PLIC
-            ]
-            sys_cpu_rows = [
-                "u_core_v_mini_mcu/cpu_subsystem_i"
-            ]
-            sys_mem_rows = [
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_0__ram_i",       # SRAM bank 0 (.text)
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_1__ram_i",       # SRAM bank 1 (.data)
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_2__ram_i",       # SRAM interleaved bank 0
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_3__ram_i",       # SRAM interleaved bank 1
-                "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_4__ram_i",       # SRAM interleaved bank 2
-                # "u_core_v_mini_mcu/memory_subsystem_i/gen_sram_5__ram_i",     # Replaced by NM-Carus
-            ]
-            sys_peri_rows = [
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/fast_intr_ctrl_i",
-                "u_core_v_mini_mcu/ao_peripheral_subsystem_i/dma_i",
-                "u_core_v_mini_mcu/peripheral_subsystem_i/rv_plic_i",
-            ]
-            nmc_pwr_rows = [
-                "u_heepatia_peripherals/gen_carus_0__u_nm_carus_wrapper",     # NM-Carus
-            ]
-            nmc_ctl_rows = ["carus_ctl"]
-            nmc_comp_rows = ["carus_vector"]
-            nmc_mem_rows = ["carus_vrf"]
-
-        # Compute power consumption
-        sys_pwr: float = 0.0
-        sys_cpu_pwr: float = 0.0
-        sys_mem_pwr: float = 0.0
-        sys_peri_pwr: float = 0.0
-        nmc_pwr: float = 0.0
-        nmc_ctl_pwr: float = 0.0
-        nmc_comp_pwr: float = 0.0
-        nmc_mem_pwr: float = 0.0
-
-        # Compute system power
-        for row in sys_pwr_rows:
-            sys_pwr += power_data.loc[row, "TOTAL_POWER"]
-        for row in sys_cpu_rows:
-            sys_cpu_pwr += power_data.loc[row, "TOTAL_POWER"]
-        for row in sys_mem_rows:
-            sys_mem_pwr += power_data.loc[row, "TOTAL_POWER"]
-        for row in sys_peri_rows:
-            sys_peri_pwr += power_data.loc[row, "TOTAL_POWER"]
-
-        # Compute NM-Carus power
-        for row in nmc_pwr_rows:
-            nmc_pwr += power_data.loc[row, "TOTAL_POWER"]
-        for row in nmc_ctl_rows:
-            nmc_ctl_pwr += power_data.loc[row, "TOTAL_POWER"]
-        for row in nmc_comp_rows:
-            nmc_comp_pwr += power_data.loc[row, "TOTAL_POWER"]
-        for row in nmc_mem_rows:
-            nmc_mem_pwr += power_data.loc[row, "TOTAL_POWER"]
-        
-        # Define dictionary with power data
-        pwr_data: dict = {
-            "sys_pwr": sys_pwr,
-            "sys_cpu_pwr": sys_cpu_pwr,
-            "sys_mem_pwr": sys_mem_pwr,
-            "sys_peri_pwr": sys_peri_pwr,
-            "nmc_pwr": nmc_pwr,
-            "nmc_ctl_pwr": nmc_ctl_pwr,
-            "nmc_comp_pwr": nmc_comp_pwr,
-            "nmc_mem_pwr": nmc_mem_pwr
-        }
+        # Check for valid mode
+        if not mode in POWER_CATEGORIES:
+            raise ValueError(f"invalid mode '{mode}'")
+
+        # Roll up the hierarchy rows into the power categories (see power_rollup.py)
+        pwr_data: dict = rollup_power([(csv_file, mode, csv_file)]).iloc[0].to_dict()
         return pwr_data
 
+    # Measure the resources spent in a scheduler phase
+    @contextlib.contextmanager
+    def phase(self, name: str, test: app_test = None):
+        """Trace the 'with' block as phase 'name' (see stage_trace.py), tagged with the test, if any."""
+        args = {}
+        if test is not None:
+            args = {"test": f"{test.data['app_name']} {test.data['data_type']} {test.data['kernel_params']}".strip()}
+        with self.tracer.span(name, **args):
+            yield
+
+    # Print the per-phase timing breakdown and write the trace
+    def print_phase_times(self):
+        """Print the wall time, CPU time, and peak memory of each phase."""
+        totals = self.tracer.get_totals("stage")
+        total = sum(t["wall_s"] for t in totals.values())
+        if self.tracer.trace_file is not None:
+            self.tracer.write()
+            print(f"### Trace written to '{self.tracer.trace_file}' (see stage_trace.py)")
+        if total == 0:
+            return
+        print("### Timing breakdown (summed over all tests and stage workers):")
+        for name, t in totals.items():
+            print(f"    - {name}: {t['wall_s']:.1f} s ({100 * t['wall_s'] / total:.1f}%), "
+                  f"{t['cpu_s'] + t['child_cpu_s']:.1f} s CPU, {t['child_peak_rss_mb']:.0f} MiB peak RSS")
+
     # Parse Verilator simulation output   
-    def parse_sim_output(self, sim_out: str) -> (int, int, int):
-        """Parse the simulation output."""
-        # Look for NM-Carus number of cycles
-        carus_regex = re.compile(r"- NM-Carus kernel execution time: (\d+) cycles\n")
-        cpu_regex = re.compile(r"CPU: (\d+)\n")
-        carus_cycles = carus_regex.search(sim_out)
-        cpu_cycles = cpu_regex.search(sim_out)
-        carus_cycles = int(carus_cycles.group(1))
-        if cpu_cycles is None:
-            cpu_cycles = 0
-        else:
-            cpu_cycles = int(cpu_cycles.group(1))
-        thr_data: dict = {
-            "carus_cycles": carus_cycles,
-            "cpu_cycles": cpu_cycles
-        }
-        return thr_data
+    def parse_sim_output(self, sim_out: str) -> dict:
+        """Parse the simulation output into per-mode, per-phase cycle counters."""
+        return decode_counters(sim_out)
 
     # Initialize throughput CSV report
     def init_throughput_report(self, report_file: str):
@@ -427,7 +708,7 @@ class test_scheduler:
                 "num_outs",
                 "cycles",
                 "kernel_params"
-            ])
+            ] + [f"cycles_{phase}" for phase in PERF_PHASES] + ["nmc_instances", "predicted"])
 
     # Add entry to throughput CSV report
     def add_throughput_report(self, data: dict):
@@ -441,7 +722,7 @@ class test_scheduler:
                 data['num_outs'],
                 data['cycles'],
                 data['kernel_params']
-            ])
+            ] + [data.get(f"cycles_{phase}", "") for phase in PERF_PHASES] + [data.get("nmc_instances", 1), int(data.get("predicted", False))])
 
     # Initialize power CSV report
     def init_power_report(self, report_file: str):
@@ -462,7 +743,8 @@ class test_scheduler:
                 "nmc_ctl_pwr",
                 "nmc_comp_pwr",
                 "nmc_mem_pwr",
-                "kernel_params"
+                "kernel_params",
+                "nmc_instances"
             ])
 
     # Add entry to power CSV report
@@ -483,7 +765,8 @@ class test_scheduler:
                 data['nmc_ctl_pwr'],
                 data['nmc_comp_pwr'],
                 data['nmc_mem_pwr'],
-                data['kernel_params']
+                data['kernel_params'],
+                data.get('nmc_instances', 1)
             ])
 
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: conftest.py
+# Date: 17/10/2026
+# Description: Common setup of the tests of the performance analysis scripts
+
+# Usage (from the repository root):
+#   python3 -m pytest scripts/performance-analysis/tests
+
+import os
+import sys
+
+# The scripts are flat modules imported by name
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,38 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_benchmark_charts.py
+# Date: 17/10/2026
+# Description: Tests of the change detection of the benchmark charts
+
+import importlib.util
+import os
+import pandas as pd
+import pytest
+
+pytest.importorskip("matplotlib")
+
+# The script name is not a valid module name
+spec = importlib.util.spec_from_file_location("benchmark_charts", os.path.join(os.path.dirname(__file__), "..", "benchmark-charts.py"))
+charts = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(charts)
+
+DATA = pd.DataFrame({"int8": [2.0, 3.5]}, index=["add", "mul"])
+OPTIONS = {"text": "mathtext", "format": "png", "dpi": 100, "log": False}
+
+def plot_a(df, chart_file, dpi):
+    pass
+
+def plot_b(df, chart_file, dpi):
+    df.plot()
+
+def test_hash_inputs(monkeypatch):
+    ref = charts.get_chart_hash(DATA, OPTIONS, plot_a)
+    assert charts.get_chart_hash(DATA.copy(), dict(OPTIONS), plot_a) == ref
+    # Data, options, plotting code, and version each change the hash
+    assert charts.get_chart_hash(DATA * 2, OPTIONS, plot_a) != ref
+    assert charts.get_chart_hash(DATA, dict(OPTIONS, dpi=600), plot_a) != ref
+    assert charts.get_chart_hash(DATA, OPTIONS, plot_b) != ref
+    monkeypatch.setattr(charts, "CHART_VERSION", charts.CHART_VERSION + 1)
+    assert charts.get_chart_hash(DATA, OPTIONS, plot_a) != ref
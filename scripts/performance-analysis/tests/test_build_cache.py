@@ -0,0 +1,104 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_build_cache.py
+# Date: 17/10/2026
+# Description: Tests of the firmware build cache
+
+import os
+import pytest
+from build_cache import build_cache, BUILD_ENV_VARS, SHARED_SRC_DIRS
+
+APP_NAME = "carus-matmul"
+
+# Write a file, creating its directory
+def write(path, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+# Minimal repository with one application and the shared sources
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    for var in BUILD_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+    app_dir = tmp_path / "sw" / "applications" / APP_NAME
+    write(app_dir / "main.c", "int main(void) { return 0; }\n")
+    write(app_dir / "datagen.py", "print('data')\n")
+    for src_dir in SHARED_SRC_DIRS:
+        write(tmp_path / src_dir / "lib.c", f"// {src_dir}\n")
+    return tmp_path
+
+@pytest.fixture
+def cache(tmp_path):
+    c = build_cache(str(tmp_path / "cache"))
+    c.toolchain_version = "riscv32-corev-gcc 13.2.0"
+    return c
+
+def get_key(cache, root, kernel_params="--row_a 8", cdefs=""):
+    return cache.get_key(str(root), APP_NAME, kernel_params, cdefs)
+
+def test_key_stable(cache, root):
+    assert get_key(cache, root) == get_key(cache, root)
+
+def test_key_app_sources(cache, root):
+    key = get_key(cache, root)
+    write(root / "sw" / "applications" / APP_NAME / "main.c", "int main(void) { return 1; }\n")
+    assert get_key(cache, root) != key
+
+def test_key_shared_sources(cache, root):
+    for src_dir in SHARED_SRC_DIRS:
+        key = get_key(cache, root)
+        write(root / src_dir / "lib.c", "// changed\n")
+        assert get_key(cache, root) != key, src_dir
+
+@pytest.mark.parametrize("name", ["data.h", "matmul_data.h", "caesar_commands.h", "caesar_instructions.h", "data_A.bin", "data.h.cache"])
+def test_key_ignores_generated_files(cache, root, name):
+    key = get_key(cache, root)
+    write(root / "sw" / "applications" / APP_NAME / name, "generated\n")
+    assert get_key(cache, root) == key
+
+def test_key_build_options(cache, root):
+    key = get_key(cache, root)
+    assert get_key(cache, root, kernel_params="--row_a 16") != key
+    assert get_key(cache, root, cdefs="-DDEBUG") != key
+
+@pytest.mark.parametrize("var", BUILD_ENV_VARS)
+def test_key_environment(cache, root, monkeypatch, var):
+    key = get_key(cache, root)
+    monkeypatch.setenv(var, "2")
+    assert get_key(cache, root) != key
+
+def test_key_toolchain(cache, root):
+    key = get_key(cache, root)
+    cache.toolchain_version = "riscv32-corev-gcc 14.1.0"
+    assert get_key(cache, root) != key
+
+def test_store_restore(cache, tmp_path):
+    app_dir = tmp_path / "build" / "sw" / "app"
+    write(app_dir / "main.hex", "0011")
+    write(app_dir / "main.elf", "elf")
+    out_dir = tmp_path / "restored"
+    assert not cache.restore("k0", str(out_dir))
+    cache.store("k0", str(app_dir))
+    assert cache.restore("k0", str(out_dir))
+    assert sorted(os.listdir(out_dir)) == ["main.elf", "main.hex"]
+    assert (out_dir / "main.hex").read_text() == "0011"
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+def test_evict_least_recently_used(tmp_path):
+    cache = build_cache(str(tmp_path / "cache"), max_size_mb=1)
+    app_dir = tmp_path / "app"
+    write(app_dir / "main.hex", "x" * (400 * 1024))
+    for key in ["k0", "k1"]:
+        cache.store(key, str(app_dir))
+    assert cache.restore("k0", str(tmp_path / "out"))
+    cache.store("k2", str(app_dir))
+
+    # 'k1' is the least recently used entry
+    assert not cache.restore("k1", str(tmp_path / "out"))
+    assert cache.restore("k0", str(tmp_path / "out"))
+    assert cache.restore("k2", str(tmp_path / "out"))
+    assert cache.get_stats()["evictions"] == 1
@@ -0,0 +1,78 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_campaign_journal.py
+# Date: 17/10/2026
+# Description: Tests of the campaign journal
+
+import json
+from campaign_journal import campaign_journal
+
+# Test data of a single test
+def make_test(app_name="carus-matmul", data_type="int8", kernel_params="--row_a 8", nmc_instances=1) -> dict:
+    return {"app_name": app_name, "data_type": data_type, "kernel_params": kernel_params, "nmc_instances": nmc_instances}
+
+def test_key_single_instance_unchanged():
+    # Single-instance keys match the journals written before multi-instance support
+    assert campaign_journal.get_key(make_test()) == "carus-matmul|int8|--row_a 8"
+    data = make_test()
+    del data["nmc_instances"]
+    assert campaign_journal.get_key(data) == "carus-matmul|int8|--row_a 8"
+
+def test_key_distinguishes_tests():
+    keys = {
+        campaign_journal.get_key(make_test()),
+        campaign_journal.get_key(make_test(data_type="int16")),
+        campaign_journal.get_key(make_test(kernel_params="--row_a 16")),
+        campaign_journal.get_key(make_test(app_name="cpu-matmul")),
+        campaign_journal.get_key(make_test(nmc_instances=2)),
+    }
+    assert len(keys) == 5
+    assert campaign_journal.get_key(make_test(nmc_instances=2)).endswith("|x2")
+
+def test_resume(tmp_path):
+    journal_file = tmp_path / "report.csv.journal"
+    journal = campaign_journal(str(journal_file))
+    journal.add_done(make_test(), [{"cycles": 100}])
+    journal.add_failed(make_test(data_type="int16"), "failed to build")
+
+    resumed = campaign_journal(str(journal_file), resume=True)
+    assert resumed.is_done(make_test())
+    assert resumed.get_reports(make_test()) == [{"cycles": 100}]
+    assert not resumed.is_done(make_test(data_type="int16"))
+    assert [r["error"] for r in resumed.get_failed()] == ["failed to build"]
+    assert not resumed.is_done(make_test(data_type="int32"))
+
+def test_no_resume_discards_journal(tmp_path):
+    journal_file = tmp_path / "report.csv.journal"
+    campaign_journal(str(journal_file)).add_done(make_test(), [])
+    journal = campaign_journal(str(journal_file))
+    assert not journal_file.exists()
+    assert not journal.is_done(make_test())
+
+def test_later_records_override(tmp_path):
+    journal_file = tmp_path / "report.csv.journal"
+    journal = campaign_journal(str(journal_file))
+    journal.add_failed(make_test(), "timeout")
+    journal.add_done(make_test(), [{"cycles": 42}])
+
+    resumed = campaign_journal(str(journal_file), resume=True)
+    assert resumed.is_done(make_test())
+    assert resumed.get_failed() == []
+
+def test_truncated_last_line_ignored(tmp_path):
+    journal_file = tmp_path / "report.csv.journal"
+    journal = campaign_journal(str(journal_file))
+    journal.add_done(make_test(), [{"cycles": 1}])
+    record = json.dumps({"key": campaign_journal.get_key(make_test(data_type="int16")), "status": "done", "reports": []})
+    with open(journal_file, "a") as f:
+        f.write(record[:len(record) // 2])
+
+    resumed = campaign_journal(str(journal_file), resume=True)
+    assert resumed.is_done(make_test())
+    assert not resumed.is_done(make_test(data_type="int16"))
+
+def test_resume_missing_journal(tmp_path):
+    journal = campaign_journal(str(tmp_path / "missing.journal"), resume=True)
+    assert journal.records == {}
@@ -0,0 +1,178 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_cycle_model.py
+# Date: 17/10/2026
+# Description: Tests of the cycle model and of the reports of its predictions
+
+import io
+import numpy as np
+import pandas as pd
+import pytest
+import test_scheduler as ts
+from cycle_model import cycle_model, is_predicted, load_reports, parse_kernel_params, get_clock_period_ns
+from dashboard import dashboard
+from energy_analysis import energy_analysis
+
+# Write a throughput report as the scheduler does
+def write_report(path, rows: list) -> str:
+    sched = ts.test_scheduler(str(path) + ".txt")
+    sched.init_throughput_report(str(path))
+    for row in rows:
+        sched.add_throughput_report(dict({"kernel_params": "", "nmc_instances": 1}, **row))
+    return str(path)
+
+# Throughput results of matmul: 50 + 3 cycles per MAC + 2 cycles per output byte
+def matmul_reports(rng, n: int, mode: str = "carus", **columns) -> pd.DataFrame:
+    rows = []
+    for _ in range(n):
+        row_a, col_a, col_b = (int(v) for v in rng.integers(2, 64, 3))
+        data_type = str(rng.choice(["int8", "int16", "int32"]))
+        elem_size = {"int8": 1, "int16": 2, "int32": 4}[data_type]
+        rows.append(dict({
+            "memory_type": mode, "kernel_name": "matmul", "data_type": data_type, "num_outs": row_a * col_b,
+            "kernel_params": f"--row_a {row_a} --col_a {col_a} --col_b {col_b}",
+            "cycles": 50.0 + 3.0 * row_a * col_a * col_b + 2.0 * row_a * col_b * elem_size,
+        }, **columns))
+    return pd.DataFrame(rows)
+
+def test_parse_kernel_params():
+    params = parse_kernel_params("--row_a 8 --col-b 16 --alpha 0.5 --mode fast --shift -3")
+    assert params == {"row_a": 8, "col_b": 16, "alpha": 0.5, "shift": -3}
+    assert isinstance(params["row_a"], int) and isinstance(params["alpha"], float)
+    assert parse_kernel_params("") == {} and parse_kernel_params(None) == {}
+
+@pytest.mark.parametrize("period, expected", [("10ns", 10.0), ("2500 ps", 2.5)])
+def test_clock_period(tmp_path, period, expected):
+    (tmp_path / "tb").mkdir()
+    (tmp_path / "tb" / "tb_top.sv").write_text(f"module tb_top;\n  const time SIM_CLK_PERIOD = {period} ;\nendmodule\n")
+    assert get_clock_period_ns(str(tmp_path)) == expected
+
+def test_clock_period_missing(tmp_path):
+    (tmp_path / "tb").mkdir()
+    (tmp_path / "tb" / "tb_top.sv").write_text("module tb_top;\nendmodule\n")
+    with pytest.raises(ValueError, match="SIM_CLK_PERIOD"):
+        get_clock_period_ns(str(tmp_path))
+
+def test_fit_recovers_linear_model(tmp_path):
+    model = cycle_model(clock_period_ns=10.0)
+    model.fit(matmul_reports(np.random.default_rng(0), 40))
+    fitted = model.models["matmul|carus"]
+    assert fitted["num_samples"] == 40
+    assert fitted["max_error"] < 1e-6
+    # Unseen shape and data type
+    assert model.predict("matmul", "carus", "int16", 100 * 7, "--row_a 100 --col_a 9 --col_b 7") == pytest.approx(50 + 3 * 6300 + 2 * 700 * 2)
+    assert model.predict_us("matmul", "carus", "int8", 4, "--row_a 2 --col_a 2 --col_b 2") == pytest.approx((50 + 24 + 8) * 10.0 * 1e-3)
+
+    # Round trip through the JSON model
+    model.save(str(tmp_path / "model.json"))
+    loaded = cycle_model(str(tmp_path / "model.json"))
+    assert loaded.clock_period_ns == 10.0 and loaded.models == model.models
+
+def test_held_out_error():
+    rng = np.random.default_rng(1)
+    reports = matmul_reports(rng, 30)
+    reports["cycles"] *= 1 + 0.1 * rng.standard_normal(len(reports))
+    model = cycle_model()
+    model.fit(reports, holdout=0.3, seed=2)
+    fitted = model.models["matmul|carus"]
+    assert 0 < fitted["error"] <= fitted["max_error"]
+    assert model.is_trusted("matmul", "carus", 1.0)
+    assert not model.is_trusted("matmul", "carus", fitted["max_error"] / 2)
+    # Not enough samples to hold some out: never trusted
+    model.fit(reports.head(2))
+    assert model.models["matmul|carus"]["error"] is None
+    assert not model.is_trusted("matmul", "carus", 1.0)
+    out = io.StringIO()
+    model.print_error(out)
+    assert "matmul (carus, 2 samples): not enough samples for a held-out error" in out.getvalue()
+
+def test_models_per_instances(capsys):
+    rng = np.random.default_rng(3)
+    reports = pd.concat([
+        matmul_reports(rng, 10, nmc_instances=1),
+        matmul_reports(rng, 10, nmc_instances=2),
+        # The cost terms of matmul need col_b
+        pd.DataFrame([{"memory_type": "cpu", "kernel_name": "matmul", "data_type": "int8", "num_outs": 8, "kernel_params": "--row_a 8 --col_a 8", "cycles": 100.0, "nmc_instances": 1}]),
+        # Kernels without cost terms are modelled on their outputs
+        pd.DataFrame([{"memory_type": "cpu", "kernel_name": "fft", "data_type": "int16", "num_outs": n, "kernel_params": "", "cycles": 7.0 * n, "nmc_instances": 1} for n in [64, 128, 256, 512]]),
+    ], ignore_index=True)
+    model = cycle_model()
+    model.fit(reports)
+    assert sorted(model.models) == ["fft|cpu", "matmul|carus", "matmul|carus|2"]
+    assert "skipping kernel 'matmul' (cpu): missing parameter" in capsys.readouterr().err
+    assert model.predict("fft", "cpu", "int16", 1024, "") == pytest.approx(7 * 1024, rel=1e-6)
+    out = io.StringIO()
+    model.print_error(out)
+    assert "matmul (carus, 2 instances, 10 samples)" in out.getvalue()
+    with pytest.raises(KeyError, match="'matmul' \\(carus, 4 instances\\)"):
+        model.predict("matmul", "carus", "int8", 4, "--row_a 2 --col_a 2 --col_b 2", 4)
+
+def test_prediction_not_negative():
+    model = cycle_model()
+    model.models = {"add|cpu": {"terms": {"elems": "vl"}, "intercept": -100.0, "coef": [1.0, 0.0], "error": 0.0, "max_error": 0.0, "num_samples": 3}}
+    assert model.predict("add", "cpu", "int8", 8, "--vl 8") == 0.0
+    assert model.predict("add", "cpu", "int8", 800, "--vl 800") == 700.0
+
+def test_is_predicted_formats():
+    df = pd.DataFrame({"predicted": ["1", "0", "", "True", "false", 1.0, None]})
+    assert is_predicted(df).tolist() == [True, False, False, True, False, True, False]
+    # Reports written before the column existed were all simulated
+    assert not is_predicted(pd.DataFrame({"cycles": [1, 2]})).any()
+
+def test_report_records_predictions(tmp_path):
+    report = write_report(tmp_path / "thr.csv", [
+        {"memory_type": "cpu", "kernel_name": "add", "data_type": "int8", "num_outs": 64, "cycles": 100},
+        {"memory_type": "cpu", "kernel_name": "add", "data_type": "int8", "num_outs": 128, "cycles": 190, "predicted": True},
+    ])
+    df = pd.read_csv(report, keep_default_na=False)
+    assert df["predicted"].tolist() == [0, 1]
+
+def test_load_reports_skips_predictions(tmp_path):
+    # A prediction is never used to fit the next model, even if it is the last result of its test
+    first = write_report(tmp_path / "a.csv", [
+        {"memory_type": "cpu", "kernel_name": "add", "data_type": "int8", "num_outs": 64, "cycles": 100},
+        {"memory_type": "cpu", "kernel_name": "add", "data_type": "int8", "num_outs": 128, "cycles": 200},
+    ])
+    second = write_report(tmp_path / "b.csv", [
+        {"memory_type": "cpu", "kernel_name": "add", "data_type": "int8", "num_outs": 64, "cycles": 999, "predicted": True},
+        {"memory_type": "cpu", "kernel_name": "add", "data_type": "int8", "num_outs": 256, "cycles": 999, "predicted": True},
+    ])
+    df = load_reports([first, second])
+    assert sorted(zip(df["num_outs"], df["cycles"])) == [(64, 100.0), (128, 200.0)]
+
+def test_predicted_tests_flagged_in_analysis(tmp_path):
+    model = cycle_model()
+    model.models = {
+        cycle_model.get_key("add", mode): {"terms": {"elems": "vl"}, "intercept": 10.0, "coef": [1.0, 0.0], "error": 0.01, "max_error": 0.01, "num_samples": 10}
+        for mode in ["cpu", "carus"]
+    }
+    rows = model.predict_test({"kernel_name": "add", "data_type": "int8", "num_outs": 64, "kernel_params": "--vl 64", "memory_type": "carus"}, 0.02)
+    assert [r["memory_type"] for r in rows] == ["cpu", "carus"] and all(r["predicted"] for r in rows)
+    report = write_report(tmp_path / "thr.csv", rows + [
+        {"memory_type": "cpu", "kernel_name": "mul", "data_type": "int8", "num_outs": 64, "cycles": 640},
+    ])
+    thr = pd.read_csv(report, keep_default_na=False)
+    pwr = pd.DataFrame(columns=["memory_type", "kernel_name", "data_type", "num_outs", "kernel_params", "sys_pwr", "nmc_pwr"])
+
+    df = energy_analysis().analyse(thr, pwr).set_index(["kernel_name", "memory_type"])
+    assert df.loc[("add", "cpu"), "predicted"] and df.loc[("add", "carus"), "predicted"]
+    assert not df.loc[("mul", "cpu"), "predicted"]
+    assert df.loc[("add", "cpu"), "cycles_per_output"] == pytest.approx(74 / 64)
+
+    # The dashboard marks the same tests
+    dash = dashboard(thr, pwr)
+    summary = dash.get_summary("local").set_index(["kernel_name", "memory_type"])
+    assert summary["predicted"].to_dict() == {("add", "carus"): True, ("add", "cpu"): True, ("mul", "cpu"): False}
+    thr_runs, _ = dash.get_runs()
+    assert thr_runs["predicted"].tolist() == [True, True, False]
+
+def test_untrusted_kernel_not_predicted():
+    model = cycle_model()
+    model.models = {cycle_model.get_key("add", "cpu"): {"terms": {"elems": "vl"}, "intercept": 0.0, "coef": [1.0, 0.0], "error": 0.05, "max_error": 0.08, "num_samples": 10}}
+    test = {"kernel_name": "add", "data_type": "int8", "num_outs": 64, "kernel_params": "--vl 64", "memory_type": "cpu"}
+    assert model.predict_test(test, 0.02) is None
+    # Both the CPU and the NMC model must be trusted
+    assert model.predict_test(dict(test, memory_type="carus"), 0.1) is None
+    assert model.predict_test(test, 0.1)[0]["cycles"] == 64
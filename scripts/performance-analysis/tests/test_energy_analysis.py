@@ -0,0 +1,116 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_energy_analysis.py
+# Date: 17/10/2026
+# Description: Tests of the energy analysis of the benchmark results
+
+import math
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+import results_store as rs
+from energy_analysis import energy_analysis, load_reports, load_store
+
+THR_PARAMS = "--row_a 10 --col_a 10 --col_b 10"
+PWR_PARAMS = "--row_a 4 --col_a 4 --col_b 4"
+
+def thr_row(mode: str, cycles, kernel: str = "matmul", **extra) -> dict:
+    return dict({"memory_type": mode, "kernel_name": kernel, "data_type": "int8", "num_outs": 100, "cycles": cycles, "kernel_params": THR_PARAMS}, **extra)
+
+def pwr_row(mode: str, sys_pwr: float, nmc_pwr: float = 0.0, kernel: str = "matmul", **extra) -> dict:
+    return dict({"memory_type": mode, "kernel_name": kernel, "data_type": "int8", "num_outs": 0, "sys_pwr": sys_pwr, "nmc_pwr": nmc_pwr, "kernel_params": PWR_PARAMS}, **extra)
+
+# Three CPU runs, one NM-Carus run, and a failed run without cycles
+THR = pd.DataFrame([thr_row("cpu", 1000), thr_row("cpu", 1100), thr_row("cpu", 1200), thr_row("carus", 100), thr_row("carus", "")])
+PWR = pd.DataFrame([pwr_row("cpu", 2.0e-3), pwr_row("cpu", 2.2e-3), pwr_row("carus", 1e-3, 3e-3)])
+
+@pytest.fixture
+def result():
+    return energy_analysis(clock_period_ns=10.0).analyse(THR, PWR).set_index("memory_type")
+
+def test_repeated_runs(result):
+    cpu = result.loc["cpu"]
+    assert cpu["cycles_per_output_runs"] == 3 and cpu["power_runs"] == 2
+    assert cpu["cycles_per_output"] == pytest.approx(11.0)
+    # Standard error of [10, 11, 12] scaled by the Student t quantile of 3 runs
+    assert cpu["cycles_per_output_ci"] == pytest.approx(1 / math.sqrt(3) * stats.t.ppf(0.975, 2))
+    assert cpu["power"] == pytest.approx(2.1e-3)
+    # A single run has no spread
+    carus = result.loc["carus"]
+    assert carus["cycles_per_output_runs"] == 1 and carus["cycles_per_output_ci"] == 0.0
+
+def test_derived_metrics(result):
+    period = 10e-9
+    cpu, carus = result.loc["cpu"], result.loc["carus"]
+    assert cpu["energy_per_output"] == pytest.approx(2.1e-3 * 11 * period)
+    assert carus["edp"] == pytest.approx(4e-3 * 1 * period * 1 * period)
+    assert carus["throughput_gain"] == pytest.approx(11.0)
+    assert carus["energy_gain"] == pytest.approx(2.1e-3 * 11 / 4e-3)
+    assert carus["edp_gain"] == pytest.approx(2.1e-3 * 11 ** 2 / 4e-3)
+    # The gain inherits the uncertainty of the CPU cycles
+    assert carus["throughput_gain_ci"] > 0
+    # The reference is exactly 1
+    assert cpu[["throughput_gain", "energy_gain", "edp_gain"]].tolist() == [1.0, 1.0, 1.0]
+    assert cpu[["throughput_gain_ci", "energy_gain_ci", "edp_gain_ci"]].tolist() == [0.0, 0.0, 0.0]
+
+def test_confidence_level():
+    narrow = energy_analysis(confidence=0.5).analyse(THR, PWR).set_index("memory_type")
+    wide = energy_analysis(confidence=0.99).analyse(THR, PWR).set_index("memory_type")
+    assert 0 < narrow.loc["cpu", "cycles_per_output_ci"] < wide.loc["cpu", "cycles_per_output_ci"]
+    assert narrow.loc["cpu", "cycles_per_output"] == wide.loc["cpu", "cycles_per_output"]
+
+def test_match_params():
+    # The power tests use other sizes: matching the parameters finds no power
+    df = energy_analysis(match_params=True).analyse(THR, PWR)
+    assert len(df) == 2 and df["power"].isna().all()
+    assert df["energy_per_output"].isna().all() and df["throughput_gain"].notna().all()
+    assert df["power_runs"].isna().all()
+
+def test_missing_reference_and_tests():
+    thr = pd.DataFrame([thr_row("carus", 100), thr_row("cpu", 800, kernel="add"), thr_row("carus", 50, kernel="add")])
+    df = energy_analysis().analyse(thr, PWR).set_index(["kernel_name", "memory_type"])
+    # No CPU run of matmul: no gain; no power of add: no energy
+    assert np.isnan(df.loc[("matmul", "carus"), "throughput_gain"])
+    assert df.loc[("add", "carus"), "throughput_gain"] == pytest.approx(16.0)
+    assert np.isnan(df.loc[("add", "carus"), "energy_gain"])
+    # Power results without a throughput result are ignored
+    assert set(df.index) == {("matmul", "carus"), ("add", "cpu"), ("add", "carus")}
+
+def test_nmc_instances():
+    # Reports written before multi-instance support have a single instance
+    thr = pd.concat([THR, pd.DataFrame([thr_row("cpu", 1100, nmc_instances=2), thr_row("carus", 60, nmc_instances=2)])], ignore_index=True)
+    pwr = pd.concat([PWR, pd.DataFrame([pwr_row("carus", 1e-3, 5e-3, nmc_instances=2)])], ignore_index=True)
+    df = energy_analysis().analyse(thr, pwr)
+    assert df["nmc_instances"].tolist() == [1, 1, 2, 2]
+    carus2 = df[(df["memory_type"] == "carus") & (df["nmc_instances"] == 2)].iloc[0]
+    assert carus2["throughput_gain"] == pytest.approx(11 / 0.6)
+    assert carus2["power"] == pytest.approx(6e-3)
+
+def test_load_reports(tmp_path):
+    for i, rows in enumerate([THR.iloc[:2], THR.iloc[2:]]):
+        rows.to_csv(tmp_path / f"thr{i}.csv", index=False)
+    df = load_reports([str(tmp_path / "thr0.csv"), str(tmp_path / "thr1.csv")])
+    assert len(df) == len(THR)
+    # Failed runs are read as empty strings, not NaN
+    assert (df["cycles"] == "").sum() == 1
+
+def test_load_store(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    clock = itertools.count(1000)
+    monkeypatch.setattr(rs.time, "time", lambda: float(next(clock)))
+    store = rs.results_store(str(tmp_path / "store"))
+    with pytest.raises(ValueError, match="no throughput results"):
+        load_store(store, "throughput")
+    for rev, cycles in [("rev0", 1000), ("rev1", 900), ("rev1", 950)]:
+        store.start_campaign("hw0", rev)
+        store.append("throughput", [thr_row("cpu", cycles)])
+    store.flush()
+    # The revision of the latest campaign by default
+    assert load_store(store, "throughput")["cycles"].tolist() == [900, 950]
+    assert load_store(store, "throughput", "rev0")["cycles"].tolist() == [1000]
+    with pytest.raises(ValueError, match="no throughput results for revision 'rev2'"):
+        load_store(store, "throughput", "rev2")
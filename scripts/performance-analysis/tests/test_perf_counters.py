@@ -0,0 +1,78 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_perf_counters.py
+# Date: 17/10/2026
+# Description: Tests of the performance counter decoder
+
+import os
+import subprocess
+import sys
+import pytest
+from perf_counters import decode_counters
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "..", "perf_counters.py")
+
+def test_phases_and_tiling():
+    log = "\n".join([
+        "Booting...",
+        "@perf carus dma_in 120",
+        "@perf carus compute 800",
+        "@perf carus dma_out 80",
+        "@perf carus total 1100",
+        "@perf carus flash 5000",
+        "done",
+    ])
+    # The load phases are outside the total: tiling = 1100 - (120 + 800 + 80)
+    assert decode_counters(log) == {"carus": {"dma_in": 120, "compute": 800, "dma_out": 80, "total": 1100, "flash": 5000, "tiling": 100}}
+
+def test_repeated_records_summed():
+    # One record per tile
+    log = "".join(f"@perf cpu compute {c}\n" for c in [10, 20, 30]) + "@perf cpu total 70\n"
+    assert decode_counters(log)["cpu"] == {"compute": 60, "total": 70, "tiling": 10}
+
+@pytest.mark.parametrize("records, expected", [
+    # Reported tiling is kept
+    ("@perf carus compute 50\n@perf carus tiling 7\n@perf carus total 100\n", {"compute": 50, "tiling": 7, "total": 100}),
+    # A total alone has no breakdown
+    ("@perf carus total 100\n", {"total": 100}),
+    # Phases without a total
+    ("@perf carus compute 50\n@perf carus dma_in 5\n", {"compute": 50, "dma_in": 5}),
+    # Counter overflow or a double-counted phase: no negative overhead
+    ("@perf carus compute 150\n@perf carus total 100\n", {"compute": 150, "total": 100, "tiling": 0}),
+])
+def test_tiling_cases(records, expected):
+    assert decode_counters(records) == {"carus": expected}
+
+def test_legacy_messages():
+    log = "CPU: 5000\n- NM-Carus kernel execution time: 700 cycles\n"
+    assert decode_counters(log) == {"cpu": {"total": 5000}, "carus": {"total": 700}}
+    # Records take precedence over the legacy message of the same mode
+    log += "@perf carus compute 650\n@perf carus total 690\n"
+    assert decode_counters(log) == {"carus": {"compute": 650, "total": 690, "tiling": 40}, "cpu": {"total": 5000}}
+
+def test_malformed_records():
+    log = "\r\n".join([
+        "@perf carus compute 12",           # CRLF line endings
+        "  @perf carus compute 1000",       # not at the start of a line
+        "@perf carus compute -5",
+        "@perf carus compute 3 cycles",
+        "@perf carus",
+        "CPU: n/a",
+    ]) + "\r\n"
+    assert decode_counters(log) == {"carus": {"compute": 12}}
+    assert decode_counters("") == {}
+
+def test_command_line(tmp_path):
+    log = tmp_path / "uart.log"
+    log.write_text("@perf carus compute 75\n@perf carus total 100\n@perf carus flash 40\n")
+    out = subprocess.run([sys.executable, SCRIPT, str(log)], capture_output=True, text=True, check=True).stdout
+    assert "### carus: 100 cycles" in out
+    assert "- compute: 75 (75.0%)" in out and "- tiling: 25 (25.0%)" in out
+    # No share of the total for the load phases
+    assert "- flash: 40\n" in out
+
+    log.write_text("no counters\n")
+    result = subprocess.run([sys.executable, SCRIPT, str(log)], capture_output=True, text=True)
+    assert result.returncode == 1 and "no performance counters found" in result.stderr
@@ -0,0 +1,95 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_pipeline.py
+# Date: 17/10/2026
+# Description: Tests of the staged pipeline of the test scheduler
+
+import threading
+import time
+import pytest
+from pipeline import pipeline_stage, stage_pipeline
+
+# Run a pipeline and collect the (key, result, error) of every item
+def run(stages: list, items: list) -> list:
+    done = []
+    stage_pipeline(stages).run(items, lambda key, result, error: done.append((key, result, error)))
+    return done
+
+def test_stage_order():
+    # Every item goes through the stages in order
+    stages = [
+        pipeline_stage("build", lambda slot, v: v + ["build"]),
+        pipeline_stage("simulate", lambda slot, v: v + ["simulate"]),
+        pipeline_stage("parse", lambda slot, v: v + ["parse"]),
+    ]
+    done = run(stages, [(i, [i]) for i in range(10)])
+    assert sorted(done, key=lambda d: d[0]) == [(i, [i, "build", "simulate", "parse"], None) for i in range(10)]
+
+def test_single_worker_keeps_input_order():
+    stages = [pipeline_stage("a", lambda slot, v: v), pipeline_stage("b", lambda slot, v: v)]
+    done = run(stages, [(i, i) for i in range(20)])
+    assert [key for key, _, _ in done] == list(range(20))
+
+def test_error_drops_item():
+    calls = []
+    lock = threading.Lock()
+
+    def _build(slot, v):
+        if v == 3:
+            raise RuntimeError("failed to build")
+        return v
+
+    def _simulate(slot, v):
+        with lock:
+            calls.append(v)
+        return 10 * v
+
+    stages = [pipeline_stage("build", _build, 2), pipeline_stage("simulate", _simulate, 2)]
+    pipeline = stage_pipeline(stages)
+    done = {}
+    pipeline.run([(i, i) for i in range(6)], lambda key, result, error: done.setdefault(key, (result, error)))
+
+    # The failed item is reported with its error and skips the later stages
+    assert set(done) == set(range(6))
+    result, error = done[3]
+    assert result is None and isinstance(error, RuntimeError)
+    assert sorted(calls) == [0, 1, 2, 4, 5]
+    assert all(done[i] == (10 * i, None) for i in range(6) if i != 3)
+    assert (stages[0].num_items, stages[0].num_failed) == (6, 1)
+    assert (stages[1].num_items, stages[1].num_failed) == (5, 0)
+
+def test_workers_and_slots():
+    active = {"now": 0, "max": 0}
+    slots = set()
+    lock = threading.Lock()
+
+    def _func(slot, v):
+        with lock:
+            slots.add(slot)
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.01)
+        with lock:
+            active["now"] -= 1
+        return v
+
+    done = run([pipeline_stage("build", _func, 3)], [(i, i) for i in range(12)])
+    assert sorted(key for key, _, _ in done) == list(range(12))
+    assert slots <= {0, 1, 2}
+    assert 1 < active["max"] <= 3
+
+def test_results_in_calling_thread():
+    threads = set()
+    stage_pipeline([pipeline_stage("build", lambda slot, v: v, 2)]).run([(0, 0)], lambda *_: threads.add(threading.current_thread()))
+    assert threads == {threading.current_thread()}
+
+def test_empty_input():
+    assert run([pipeline_stage("build", lambda slot, v: v)], []) == []
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        pipeline_stage("build", lambda slot, v: v, 0)
+    with pytest.raises(ValueError):
+        stage_pipeline([])
@@ -0,0 +1,111 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_power_estimator.py
+# Date: 17/10/2026
+# Description: Tests of the toggle-rate power estimator
+
+import io
+import json
+import numpy as np
+import pytest
+from power_estimator import power_estimator, load_samples
+from power_rollup import POWER_METRICS
+
+HIERARCHIES = ["cpu", "bus", "carus"]
+
+# Activity report of a calibration run whose power is linear in the toggle rates
+def make_sample(mode: str, toggles: dict, duration_ns: float = 1000.0, power=None) -> dict:
+    rates = {h: toggles.get(h, 0) / duration_ns for h in HIERARCHIES}
+    if power is None:
+        base = 1e-3 + 2e-5 * rates["cpu"] + 1e-5 * rates["bus"] + 4e-5 * rates["carus"]
+        power = {metric: base * (k + 1) for k, metric in enumerate(POWER_METRICS)}
+    return {"vcd_file": "sim.vcd", "mode": mode, "duration_ns": duration_ns, "toggles": toggles, "power": power}
+
+def random_samples(rng, mode: str, n: int) -> list:
+    return [make_sample(mode, {h: int(t) for h, t in zip(HIERARCHIES, rng.integers(0, 50000, len(HIERARCHIES)))}) for _ in range(n)]
+
+def test_linear_power_cross_validated(tmp_path):
+    rng = np.random.default_rng(1)
+    estimator = power_estimator()
+    estimator.fit(random_samples(rng, "carus", 12))
+    assert estimator.num_samples == {"carus": 12}
+    assert max(estimator.error["carus"].values()) < 1e-3
+
+    # The model extrapolates to unseen activity
+    sample = make_sample("carus", {"cpu": 70000, "bus": 100, "carus": 90000})
+    estimate = estimator.estimate("carus", sample)
+    assert estimate["sys_pwr"] == pytest.approx(sample["power"]["sys_pwr"], rel=1e-3)
+
+    # Round trip through the calibration table
+    estimator.save(str(tmp_path / "cal.json"))
+    loaded = power_estimator(str(tmp_path / "cal.json"))
+    assert loaded.estimate("carus", sample) == pytest.approx(estimate)
+    assert loaded.error == estimator.error
+
+def test_error_is_not_in_sample():
+    # As many hierarchies as samples: the fit interpolates the noise, and only
+    # the samples left out of the fit reveal it
+    rng = np.random.default_rng(7)
+    samples = []
+    for _ in range(6):
+        toggles = {f"u{k}": int(rng.integers(1, 1000)) for k in range(6)}
+        samples.append(make_sample("cpu", toggles, power={m: float(rng.uniform(1e-3, 2e-3)) for m in POWER_METRICS}))
+    estimator = power_estimator()
+    estimator.fit(samples)
+    in_sample = np.mean([abs(estimator.estimate("cpu", s)["sys_pwr"] - s["power"]["sys_pwr"]) / s["power"]["sys_pwr"] for s in samples])
+    assert in_sample < 1e-3
+    assert estimator.error["cpu"]["sys_pwr"] > 0.05
+
+def test_folds_deterministic():
+    rng = np.random.default_rng(3)
+    samples = random_samples(rng, "cpu", 10)
+    for s in samples:
+        s["power"] = {m: p * (1 + 0.05 * rng.standard_normal()) for m, p in s["power"].items()}
+    errors = []
+    for _ in range(2):
+        estimator = power_estimator()
+        estimator.fit(samples, folds=4, seed=5)
+        errors.append(estimator.error)
+    assert errors[0] == errors[1]
+    # Leave-one-out when there are fewer samples than folds
+    estimator = power_estimator()
+    estimator.fit(samples, folds=50)
+    assert 0 < estimator.error["cpu"]["sys_pwr"] < 0.2
+
+def test_too_few_samples():
+    estimator = power_estimator()
+    estimator.fit([make_sample("cpu", {"cpu": 100}), make_sample("cpu", {"cpu": 300}), make_sample("carus", {"carus": 10})] +
+                  [make_sample("carus", {"carus": 10 * k}) for k in range(2, 5)])
+    assert set(estimator.error["cpu"].values()) == {None}
+    assert all(e is not None for e in estimator.error["carus"].values())
+    out = io.StringIO()
+    estimator.print_error(out)
+    assert "cpu mode (2 samples)" in out.getvalue()
+    assert "not enough samples for a cross-validated error" in out.getvalue()
+    assert "carus mode (4 samples)" in out.getvalue() and "% mean relative cross-validated error" in out.getvalue()
+
+def test_invalid_inputs():
+    estimator = power_estimator()
+    # Samples without PrimePower results or measurement window are ignored
+    estimator.fit([dict(make_sample("cpu", {"cpu": 10}), duration_ns=0.0)] + [{k: v for k, v in make_sample("cpu", {"cpu": 10}).items() if k != "power"}] +
+                  random_samples(np.random.default_rng(0), "cpu", 4))
+    assert estimator.num_samples == {"cpu": 4}
+    with pytest.raises(ValueError, match="not calibrated for mode 'carus'"):
+        estimator.estimate("carus", make_sample("carus", {"carus": 10}))
+    with pytest.raises(ValueError, match="empty measurement window"):
+        estimator.estimate("cpu", dict(make_sample("cpu", {"cpu": 10}), duration_ns=0.0))
+
+def test_load_samples(tmp_path):
+    # Activity reports are found at any depth; those without PrimePower results are skipped
+    for path, sample in [
+        ("campaign0/carus/activity-add.json", make_sample("carus", {"carus": 10})),
+        ("campaign0/cpu/nested/activity-add.json", make_sample("cpu", {"cpu": 10})),
+        ("campaign1/activity-mul.json", {k: v for k, v in make_sample("cpu", {"cpu": 10}).items() if k != "power"}),
+        ("campaign1/power-mul.json", make_sample("cpu", {"cpu": 10})),
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(json.dumps(sample))
+    samples = load_samples([str(tmp_path / "campaign0"), str(tmp_path / "campaign1"), str(tmp_path / "missing")])
+    assert sorted(s["mode"] for s in samples) == ["carus", "cpu"]
@@ -0,0 +1,116 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_power_rollup.py
+# Date: 17/10/2026
+# Description: Tests of the roll-up of PrimePower reports
+
+import os
+import pytest
+from power_rollup import rollup_power, rollup_campaign, get_row_map, POWER_METRICS
+
+MCU = "u_core_v_mini_mcu"
+AO = f"{MCU}/ao_peripheral_subsystem_i"
+
+# Rows present in every report, with their power in mW
+COMMON = {
+    f"{MCU}/cpu_subsystem_i": 3.0,
+    f"{MCU}/cpu_subsystem_i/core": 2.5,     # nested rows are not summed twice
+    f"{MCU}/system_bus_i": 1.0,
+    f"{AO}/boot_rom_i": 0.1,
+    f"{AO}/soc_ctrl_i": 0.1,
+    f"{AO}/power_manager_i": 0.1,
+    f"{AO}/fast_intr_ctrl_i": 0.2,
+    f"{AO}/dma_i": 0.3,
+    f"{MCU}/peripheral_subsystem_i/rv_plic_i": 0.5,
+}
+
+CPU_ROWS = dict(COMMON, **{f"{MCU}/memory_subsystem_i": 4.0})
+
+CARUS_ROWS = dict(COMMON, **{
+    f"{MCU}/memory_subsystem_i": 4.0,
+    f"{MCU}/memory_subsystem_i/gen_sram_0__ram_i": 0.5,
+    f"{MCU}/memory_subsystem_i/gen_sram_4__ram_i": 0.5,
+    f"{MCU}/memory_subsystem_i/gen_sram_5__ram_i": 3.0,    # replaced by the NMC
+    "heepatia_bus": 0.4,
+    "u_heepatia_peripherals/gen_carus_0__u_nm_carus_wrapper": 6.0,
+    "u_heepatia_peripherals/gen_carus_1__u_nm_carus_wrapper": 5.0,
+    "carus_ctl": 1.0,
+    "carus_vector": 3.0,
+    "carus_vrf": 2.0,
+})
+
+# Write a PrimePower CSV report (power in W)
+def write_report(path, rows: dict, extra: list = ()) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("CELL,INTERNAL_POWER,TOTAL_POWER\n")
+        for cell, mw in list(rows.items()) + list(extra):
+            f.write(f"{cell},0,{mw * 1e-3}\n")
+    return str(path)
+
+def test_cpu_rollup(tmp_path):
+    rollup = rollup_power([("add", "cpu", write_report(tmp_path / "cpu.csv", CPU_ROWS))])
+    assert list(rollup.columns) == POWER_METRICS and list(rollup.index) == ["add"]
+    row = rollup.loc["add"] * 1e3
+    assert row["sys_pwr"] == pytest.approx(3.0 + 4.0 + 1.0 + 0.3 + 1.0)
+    assert row["sys_cpu_pwr"] == pytest.approx(3.0)
+    assert row["sys_peri_pwr"] == pytest.approx(1.0)
+    assert (row[["nmc_pwr", "nmc_ctl_pwr", "nmc_comp_pwr", "nmc_mem_pwr"]] == 0).all()
+
+def test_carus_instances(tmp_path):
+    rollup = rollup_power([(("matmul", 0), "carus", write_report(tmp_path / "carus.csv", CARUS_ROWS))])
+    # Tuple keys are kept as is
+    row = rollup.loc[[("matmul", 0)]].iloc[0] * 1e3
+    # All the NMC instances, and only the SRAM banks kept next to the NMC
+    assert row["nmc_pwr"] == pytest.approx(11.0)
+    assert row["sys_mem_pwr"] == pytest.approx(1.0)
+    assert row["sys_pwr"] == pytest.approx(3.0 + 1.0 + 0.4 + 1.0 + 0.3 + 1.0)
+    assert (row["nmc_ctl_pwr"], row["nmc_comp_pwr"], row["nmc_mem_pwr"]) == pytest.approx((1.0, 3.0, 2.0))
+
+def test_mixed_modes_and_duplicates(tmp_path):
+    # The first occurrence of a repeated row is used
+    cpu = write_report(tmp_path / "cpu.csv", CPU_ROWS, [(f"{MCU}/cpu_subsystem_i", 100.0)])
+    carus = write_report(tmp_path / "carus.csv", CARUS_ROWS)
+    rollup = rollup_power([("b", "carus", carus), ("a", "cpu", cpu), ("c", "cpu", cpu)])
+    assert list(rollup.index) == ["b", "a", "c"]
+    assert rollup.loc["a", "sys_cpu_pwr"] == pytest.approx(3e-3)
+    assert rollup.loc["a"].equals(rollup.loc["c"])
+    assert rollup.loc["b", "nmc_pwr"] > 0 and rollup.loc["a", "nmc_pwr"] == 0
+
+def test_missing_rows(tmp_path):
+    rows = {k: v for k, v in CARUS_ROWS.items() if k not in ("carus_vrf", "heepatia_bus")}
+    cpu = write_report(tmp_path / "cpu.csv", CPU_ROWS)
+    carus = write_report(tmp_path / "carus.csv", rows)
+    with pytest.raises(KeyError, match="carus.csv': no row matching nmc_mem_pwr:carus_vrf, sys_pwr:heepatia_bus"):
+        rollup_power([("a", "cpu", cpu), ("b", "carus", carus)])
+    # A CPU report lacks the NMC rows
+    with pytest.raises(KeyError, match="nmc_pwr:u_heepatia_peripherals"):
+        rollup_power([("a", "carus", cpu)])
+
+def test_row_map():
+    cells = list(CARUS_ROWS)
+    row_map = get_row_map(["cpu", "carus"], cells)
+    assert set(row_map.columns) == {"mode", "metric", "pattern", "CELL"}
+    carus_nmc = row_map[(row_map["mode"] == "carus") & (row_map["metric"] == "nmc_pwr")]
+    assert sorted(carus_nmc["CELL"]) == sorted(c for c in cells if "wrapper" in c)
+    # Patterns match whole row names
+    assert f"{MCU}/cpu_subsystem_i/core" not in set(row_map["CELL"])
+    assert get_row_map([], cells).empty
+    with pytest.raises(ValueError, match="invalid mode 'npu'"):
+        get_row_map(["cpu", "npu"], cells)
+
+def test_rollup_campaign(tmp_path):
+    write_report(tmp_path / "add" / "add-int8" / "cpu" / "power.csv", CPU_ROWS)
+    write_report(tmp_path / "add" / "add-int8" / "carus" / "power.csv", CARUS_ROWS)
+    # Unknown modes and misplaced reports are skipped
+    write_report(tmp_path / "add" / "add-int8" / "npu" / "power.csv", CPU_ROWS)
+    write_report(tmp_path / "add" / "power.csv", CPU_ROWS)
+    df = rollup_campaign(str(tmp_path))
+    assert list(df.columns[:3]) == ["app_name", "test", "memory_type"]
+    assert sorted(df["memory_type"]) == ["carus", "cpu"]
+    assert set(df["test"]) == {"add-int8"}
+
+    empty = rollup_campaign(str(tmp_path / "missing"))
+    assert empty.empty and list(empty.columns) == ["app_name", "test", "memory_type"] + POWER_METRICS
@@ -0,0 +1,102 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_regression.py
+# Date: 17/10/2026
+# Description: Tests of the regression checker
+
+import itertools
+import pytest
+import results_store as rs
+from results_store import results_store
+from regression import regression_checker
+
+pytest.importorskip("pyarrow")
+
+# Throughput report entry
+def make_row(cycles: int, kernel_name: str = "matmul", memory_type: str = "carus") -> dict:
+    return {"memory_type": memory_type, "kernel_name": kernel_name, "data_type": "int8", "kernel_params": "--row_a 8", "num_outs": 8192, "cycles": cycles}
+
+# Power report entry
+def make_pwr_row(sys_pwr: float, nmc_pwr: float) -> dict:
+    return {"memory_type": "carus", "kernel_name": "matmul", "data_type": "int8", "kernel_params": "--row_a 8", "num_outs": 8192, "sys_pwr": sys_pwr, "nmc_pwr": nmc_pwr}
+
+# Results store with strictly increasing row times
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(rs.time, "time", lambda: float(next(clock)))
+    return results_store(str(tmp_path / "store"))
+
+# Record a campaign
+def add_campaign(store: results_store, kind: str, rows: list, hw_config: str = "hw0") -> str:
+    store.start_campaign(hw_config, "rev")
+    store.append(kind, rows)
+    store.flush(kind)
+    return store.run_info["campaign"]
+
+# Status of each (kernel, metric) of a diff
+def get_status(diff) -> dict:
+    return {(r.kernel_name, r.metric): r.status for r in diff.itertuples()}
+
+@pytest.mark.parametrize("cycles, status", [(1000, "unchanged"), (1005, "unchanged"), (1100, "regression"), (900, "improvement")])
+def test_deterministic_cycles(store, cycles, status):
+    for _ in range(3):
+        add_campaign(store, "throughput", [make_row(1000)])
+    campaign = add_campaign(store, "throughput", [make_row(cycles)])
+    diff = regression_checker(store).check("throughput", campaign)
+    assert get_status(diff) == {("matmul", "cycles"): status}
+    assert diff["baseline"].iloc[0] == 1000
+    assert diff["samples"].iloc[0] == 3
+
+def test_new_tests(store):
+    add_campaign(store, "throughput", [make_row(1000)])
+    diff = regression_checker(store).check("throughput", add_campaign(store, "throughput", [make_row(1000), make_row(500, kernel_name="add")]))
+    assert get_status(diff) == {("matmul", "cycles"): "unchanged", ("add", "cycles"): "new"}
+
+def test_hw_config_is_part_of_the_baseline(store):
+    add_campaign(store, "throughput", [make_row(1000)], hw_config="hw0")
+    diff = regression_checker(store).check("throughput", add_campaign(store, "throughput", [make_row(2000)], hw_config="hw1"))
+    assert get_status(diff) == {("matmul", "cycles"): "new"}
+
+def test_latest_campaign_by_default(store):
+    add_campaign(store, "throughput", [make_row(1000)])
+    add_campaign(store, "throughput", [make_row(1200)])
+    diff = regression_checker(store).check("throughput")
+    assert get_status(diff) == {("matmul", "cycles"): "regression"}
+
+def test_noisy_metric_needs_significance(store):
+    # Power baseline with a spread of about 5%
+    for sys_pwr in [1.00, 1.05, 0.95, 1.02, 0.98, 1.04, 0.96]:
+        add_campaign(store, "power", [make_pwr_row(sys_pwr, 0.5)])
+    checker = regression_checker(store, threshold=0.01, z=3.0)
+    diff = checker.check("power", add_campaign(store, "power", [make_pwr_row(1.06, 0.5)]))
+    assert get_status(diff)[("matmul", "sys_pwr")] == "unchanged"
+    diff = checker.check("power", add_campaign(store, "power", [make_pwr_row(1.50, 0.5)]))
+    assert get_status(diff) == {("matmul", "sys_pwr"): "regression", ("matmul", "nmc_pwr"): "unchanged"}
+
+def test_outlier_does_not_shift_baseline(store):
+    for cycles in [1000, 1000, 1000, 5000, 1000]:
+        add_campaign(store, "throughput", [make_row(cycles)])
+    diff = regression_checker(store).check("throughput", add_campaign(store, "throughput", [make_row(1100)]))
+    assert diff["baseline"].iloc[0] == 1000
+    assert get_status(diff) == {("matmul", "cycles"): "regression"}
+
+def test_window(store):
+    for cycles in [2000, 2000, 2000, 1000, 1000]:
+        add_campaign(store, "throughput", [make_row(cycles)])
+    diff = regression_checker(store, window=2).check("throughput", add_campaign(store, "throughput", [make_row(1000)]))
+    assert diff["baseline"].iloc[0] == 1000
+    assert diff["samples"].iloc[0] == 2
+    assert get_status(diff) == {("matmul", "cycles"): "unchanged"}
+
+def test_sorted_worst_first(store):
+    add_campaign(store, "throughput", [make_row(1000, kernel_name=k) for k in ["add", "mul", "matmul"]])
+    campaign = add_campaign(store, "throughput", [make_row(900, kernel_name="add"), make_row(1500, kernel_name="mul"), make_row(1100, kernel_name="matmul")])
+    diff = regression_checker(store).check("throughput", campaign)
+    assert diff["kernel_name"].tolist() == ["mul", "matmul", "add"]
+    assert diff["status"].tolist() == ["regression", "regression", "improvement"]
+
+def test_empty_store(store):
+    assert regression_checker(store).check("throughput").empty
@@ -0,0 +1,137 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_results_store.py
+# Date: 17/10/2026
+# Description: Tests of the campaign results store
+
+import io
+import itertools
+import pytest
+import results_store as rs
+from results_store import results_store
+
+pytest.importorskip("pyarrow")
+
+# Report entries of a test
+def make_row(memory_type: str = "carus", **metrics) -> dict:
+    return dict({"memory_type": memory_type, "kernel_name": "matmul", "data_type": "int8", "kernel_params": "--row_a 8", "num_outs": 8192}, **metrics)
+
+# Results store with strictly increasing row times
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(rs.time, "time", lambda: float(next(clock)))
+    return results_store(str(tmp_path / "store"), batch_size=2)
+
+def test_batches(store):
+    store.start_campaign("hw0", "rev0")
+    store.append("throughput", [make_row(cycles=100)])
+    assert store.get_parts("throughput") == []
+    store.append("throughput", [make_row("cpu", cycles=400)])
+    assert len(store.get_parts("throughput")) == 1
+    store.append("throughput", [make_row(cycles=101)])
+    store.flush()
+    assert len(store.get_parts("throughput")) == 2
+    df = store.load("throughput")
+    assert len(df) == 3
+    assert set(df["hw_config"]) == {"hw0"} and set(df["campaign"]) == {store.run_info["campaign"]}
+
+def test_invalid_kind(store):
+    with pytest.raises(ValueError):
+        store.append("area", [make_row()])
+
+def test_latest_and_history(store):
+    for rev, cycles in [("rev0", 100), ("rev0", 90), ("rev1", 80)]:
+        store.start_campaign("hw0", rev)
+        store.append("throughput", [make_row(cycles=cycles), make_row("cpu", cycles=400)])
+    store.flush()
+
+    # The git revision is part of the key
+    latest = store.latest("throughput")
+    carus = latest[latest["memory_type"] == "carus"].set_index("git_rev")["cycles"].to_dict()
+    assert carus == {"rev0": 90, "rev1": 80}
+    assert len(latest) == 4
+    history = store.history("throughput", memory_type="carus")
+    assert history["cycles"].tolist() == [100, 90, 80]
+
+def test_join(store):
+    store.start_campaign("hw0", "rev0")
+    store.append("throughput", [make_row(cycles=1000)])
+    store.start_campaign("hw0", "rev1")
+    store.append("power", [make_row(num_outs=0, sys_pwr=2e-3, nmc_pwr=1e-3)])
+    store.flush()
+    df = store.join()
+    assert len(df) == 1
+    assert df["num_outs"].iloc[0] == 8192
+    assert df["energy"].iloc[0] == pytest.approx(3e-3 * 1000 / 8192)
+    assert (df["git_rev_thr"].iloc[0], df["git_rev_pwr"].iloc[0], df["matched"].iloc[0]) == ("rev0", "rev1", "both")
+
+def test_join_other_power_params(store):
+    # The power tests simulate smaller matrices than the throughput tests
+    store.start_campaign("hw0", "rev0")
+    store.append("throughput", [make_row(cycles=1000, kernel_params="--row_a 64"), make_row(cycles=4000, kernel_params="--row_a 128")])
+    store.append("power", [make_row(num_outs=0, sys_pwr=2e-3, nmc_pwr=1e-3, kernel_params="--row_a 8"),
+                           make_row(num_outs=0, sys_pwr=4e-3, nmc_pwr=1e-3, kernel_params="--row_a 16")])
+    store.flush()
+    err = io.StringIO()
+    df = store.join(file=err).set_index("kernel_params")
+    assert (df["matched"] == "both").all()
+    # The power of a kernel is the mean over its power tests
+    assert df["sys_pwr"].tolist() == pytest.approx([3e-3, 3e-3])
+    assert df.loc["--row_a 128", "energy"] == pytest.approx(4e-3 * 4000 / 8192)
+    assert err.getvalue() == ""
+
+    # Matching the parameters leaves every row unmatched, and reported
+    err = io.StringIO()
+    df = store.join(match_params=True, file=err)
+    assert len(df) == 4 and df["energy"].isna().all()
+    assert sorted(df["matched"]) == ["power", "power", "throughput", "throughput"]
+    err = err.getvalue()
+    assert "2 throughput results without power results" in err and "2 power results without throughput results" in err
+    assert "carus matmul int8 --row_a 128" in err
+
+def test_join_unmatched_kept(store):
+    store.start_campaign("hw0", "rev0")
+    store.append("throughput", [make_row(cycles=1000), make_row(cycles=600, nmc_instances=2), make_row(cycles=900, kernel_name="gemm")])
+    store.append("power", [make_row(num_outs=0, sys_pwr=2e-3, nmc_pwr=1e-3)])
+    store.start_campaign("hw1", "rev0")
+    store.append("power", [make_row(num_outs=0, sys_pwr=5e-3, nmc_pwr=5e-3, kernel_name="gemm")])
+    store.flush()
+    err = io.StringIO()
+    df = store.join(file=err).set_index(["kernel_name", "nmc_instances", "hw_config"])
+    # Results of other hardware configurations or numbers of instances do not match
+    assert df["matched"].to_dict() == {
+        ("matmul", 1, "hw0"): "both",
+        ("matmul", 2, "hw0"): "throughput",
+        ("gemm", 1, "hw0"): "throughput",
+        ("gemm", 1, "hw1"): "power",
+    }
+    assert df["energy"].notna().sum() == 1
+    assert "(2 instances)" in err.getvalue() and "carus gemm int8\n" in err.getvalue()
+
+def test_join_one_sided(store):
+    store.start_campaign("hw0", "rev0")
+    store.append("throughput", [make_row(cycles=1000)])
+    store.flush()
+    err = io.StringIO()
+    df = store.join(file=err)
+    assert df["matched"].tolist() == ["throughput"] and df["energy"].isna().all()
+    assert "1 throughput results without power results" in err.getvalue()
+
+def test_compact(store):
+    store.start_campaign("hw0", "rev0")
+    for cycles in range(5):
+        store.append("throughput", [make_row(cycles=cycles)])
+    store.flush()
+    before = store.load("throughput").sort_values("time").reset_index(drop=True)
+    store.compact("throughput")
+    assert len(store.get_parts("throughput")) == 1
+    after = store.load("throughput").sort_values("time").reset_index(drop=True)
+    assert after.equals(before)
+
+def test_empty_store(store):
+    assert store.load("power").empty
+    assert store.latest("power").empty
+    assert store.join().empty
@@ -0,0 +1,76 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_stage_trace.py
+# Date: 17/10/2026
+# Description: Tests of the stage instrumentation
+
+import json
+import signal
+import subprocess
+import sys
+import pytest
+import stage_trace
+from stage_trace import stage_tracer, summarize_trace
+
+# Run a Python snippet through the launcher
+def run_python(code: str, **kwargs) -> subprocess.CompletedProcess:
+    return stage_trace.run([sys.executable, "-c", code], **kwargs)
+
+def test_zero_exit():
+    p = run_python("print('hello')", check=True, capture_output=True)
+    assert p.returncode == 0
+    assert p.stdout == b"hello\n"
+
+def test_nonzero_exit():
+    p = run_python("import sys; sys.stderr.write('failed'); sys.exit(3)", capture_output=True)
+    assert p.returncode == 3
+    assert p.stderr == b"failed"
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        run_python("import sys; sys.exit(3)", check=True, capture_output=True)
+    assert e.value.returncode == 3
+
+def test_killed_by_signal():
+    p = run_python("import os, signal; os.kill(os.getpid(), signal.SIGTERM)")
+    assert p.returncode == 128 + signal.SIGTERM
+    with pytest.raises(subprocess.CalledProcessError):
+        run_python("import os, signal; os.kill(os.getpid(), signal.SIGKILL)", check=True)
+
+def test_missing_command():
+    p = stage_trace.run(["/nonexistent/command"], capture_output=True)
+    assert p.returncode == 127
+    assert b"/nonexistent/command" in p.stderr
+
+def test_cwd(tmp_path):
+    p = run_python("import os; print(os.getcwd())", capture_output=True, cwd=str(tmp_path))
+    assert p.stdout.decode().strip() == str(tmp_path)
+
+def test_spans_account_commands(tmp_path):
+    tracer = stage_tracer(str(tmp_path / "trace.json"))
+    (tmp_path / "out.bin").write_bytes(b"x" * 100)
+    with tracer.span("build") as outer:
+        with tracer.span("make", "command") as inner:
+            # Allocate about 64 MiB in the child
+            run_python("b = bytearray(64 << 20); print('done')", capture_output=True)
+            stage_trace.add_output(str(tmp_path / "out.bin"))
+        run_python("pass")
+    assert inner["commands"] == 1 and outer["commands"] == 2
+    assert inner["stdout_bytes"] == len(b"done\n")
+    assert inner["child_peak_rss_mb"] >= 64
+    assert outer["child_peak_rss_mb"] >= inner["child_peak_rss_mb"]
+    assert inner["outputs"] == {"out.bin": 100}
+
+    # Totals and trace summary
+    assert tracer.get_totals("command")["make"]["count"] == 1
+    tracer.write()
+    with open(tmp_path / "trace.json") as f:
+        events = json.load(f)["traceEvents"]
+    assert {e["name"] for e in events if e["ph"] == "X"} == {"build", "make"}
+    summary = {t["name"]: t for t in summarize_trace(str(tmp_path / "trace.json"))}
+    assert summary["build"]["count"] == 1
+    assert summary["make"]["output_bytes"] == 100 + len(b"done\n")
+
+def test_run_outside_spans():
+    # No open span: the command still runs
+    assert run_python("pass").returncode == 0
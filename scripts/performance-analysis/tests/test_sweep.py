@@ -0,0 +1,90 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_sweep.py
+# Date: 17/10/2026
+# Description: Tests of the design-space sweep specifications
+
+import os
+import pytest
+from sweep import sweep, get_levels, load_sweeps, expand_sweeps, is_sweep_file, SWEEP_CONSTANTS
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), "..", "sweep-example.yaml")
+
+def test_levels():
+    assert get_levels("x", [1, 2, 3]) == [1, 2, 3]
+    assert get_levels("x", 7) == [7]
+    assert get_levels("x", {"range": [4, 17, 4]}) == [4, 8, 12, 16]
+    assert get_levels("x", {"pow2": [256, 4096]}) == [256, 512, 1024, 2048, 4096]
+    assert get_levels("x", {"pow2": [100, 1000]}) == [128, 256, 512]
+
+@pytest.mark.parametrize("spec", [[], {"range": [4, 4]}, {"pow2": [5, 7]}, {"linspace": [0, 1]}])
+def test_invalid_levels(spec):
+    with pytest.raises(ValueError):
+        get_levels("x", spec)
+
+def test_cartesian_product():
+    s = sweep({"app": "carus-add", "data_type": ["int32", "int8"], "params": {"vl": [256, 512]}, "num_outs": "vl"})
+    assert list(s.get_tests()) == [
+        ("carus-add", "int32", 256, "--vl 256"),
+        ("carus-add", "int32", 512, "--vl 512"),
+        ("carus-add", "int8", 256, "--vl 256"),
+        ("carus-add", "int8", 512, "--vl 512"),
+    ]
+
+def test_default_data_types_and_options_order():
+    s = sweep({"app": "carus-matmul", "params": {"row_a": 8, "col_a": 4, "col_b": 16}, "num_outs": "row_a * col_b"})
+    tests = list(s.get_tests())
+    assert [t[1] for t in tests] == ["int32", "int16", "int8"]
+    assert all(t[2] == 128 and t[3] == "--row_a 8 --col_a 4 --col_b 16" for t in tests)
+
+def test_constraints():
+    s = sweep({
+        "app": "carus-add",
+        "params": {"vl": {"pow2": [256, 16384]}},
+        "num_outs": "vl",
+        "constraints": ["3 * vl * elem_size <= carus_vrf_size"],
+    })
+    tests = list(s.get_tests())
+    assert tests
+    for _, data_type, vl, _ in tests:
+        assert 3 * vl * {"int32": 4, "int16": 2, "int8": 1}[data_type] <= SWEEP_CONSTANTS["carus_vrf_size"]
+    assert ("carus-add", "int8", 16384, "--vl 16384") in tests
+    assert ("carus-add", "int32", 16384, "--vl 16384") not in tests
+
+def test_power_tests_have_no_outputs():
+    s = sweep({"app": "carus-add", "data_type": "int8", "params": {"vl": [256]}, "num_outs": "vl"})
+    assert list(s.get_tests(pwr=True)) == [("carus-add", "int8", 0, "--vl 256")]
+
+def test_expressions_cannot_use_builtins():
+    s = sweep({"app": "carus-add", "data_type": "int8", "params": {"vl": [256]}, "constraints": ["__import__('os')"]})
+    with pytest.raises(NameError):
+        list(s.get_tests())
+
+def test_latin_hypercube_sample():
+    spec = {
+        "app": "carus-matmul",
+        "data_type": ["int32", "int16", "int8"],
+        "params": {"row_a": {"range": [4, 33, 4]}, "col_b": {"pow2": [64, 2048]}},
+        "num_outs": "row_a * col_b",
+        "constraints": ["col_b * elem_size <= carus_vreg_size"],
+        "sample": {"method": "lhs", "count": 10, "seed": 1},
+    }
+    tests = list(sweep(spec).get_tests())
+    assert len(tests) == 10
+    assert len(set(tests)) == 10
+    assert tests == list(sweep(spec).get_tests())
+    assert all(sweep(spec).is_valid({"data_type": t[1], "col_b": int(t[3].split()[-1])}) for t in tests)
+
+def test_invalid_sampling_method():
+    with pytest.raises(ValueError):
+        sweep({"app": "carus-add", "sample": {"method": "random"}})
+
+def test_example_file():
+    assert is_sweep_file(EXAMPLE_FILE)
+    assert not is_sweep_file("throughput-tests.txt")
+    sweeps = load_sweeps(EXAMPLE_FILE)
+    tests = list(expand_sweeps(EXAMPLE_FILE))
+    assert {t[0] for t in tests} == {s.app for s in sweeps}
+    assert all(t[2] > 0 for t in tests)
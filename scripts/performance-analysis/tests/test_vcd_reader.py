@@ -0,0 +1,147 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_vcd_reader.py
+# Date: 17/10/2026
+# Description: Tests of the streaming VCD reader
+
+import pytest
+from vcd_reader import vcd_reader, normalize_name, count_toggles
+
+HEADER = """$date today $end
+$timescale {timescale} $end
+$scope module tb $end
+$scope module \\dut[0].core  $end
+$var wire 1 ! clk $end
+$var wire 4 " data [3:0] $end
+$var wire 1 # gpio $end
+$upscope $end
+$scope module mem $end
+$var wire 8 & q [7:0] $end
+$var real 64 % temp $end
+$upscope $end
+$upscope $end
+$enddefinitions $end
+"""
+
+# The firmware raises 'gpio' in [20, 40]; the dump is active in [0, 50]
+CHANGES = """#0
+$dumpvars
+0!
+b0000 "
+0#
+b0 &
+r0.5 %
+$end
+#10
+1!
+b0011 "
+#20
+0!
+1#
+b1111 "
+b1 &
+#30
+1!
+b1100 "
+r0.75 %
+#40
+0#
+0!
+#50
+$dumpoff
+1!
+b0 "
+$end
+#60
+0!
+"""
+
+@pytest.fixture
+def vcd(tmp_path):
+    path = tmp_path / "sim.vcd"
+    path.write_text(HEADER.format(timescale="1ps") + CHANGES)
+    return str(path)
+
+SCOPES = ["tb", "dut[0].core", "mem"]
+
+def test_normalize_name():
+    assert normalize_name("\\gen_carus[0].u_nm_carus_wrapper ") == "gen_carus_0__u_nm_carus_wrapper"
+    assert normalize_name("u_core") == "u_core"
+
+def test_count_toggles():
+    assert count_toggles(None, "1") == 0
+    assert count_toggles("0", "1") == 1
+    assert count_toggles("1", "1") == 0
+    assert count_toggles("0011", "1100") == 4
+    # Vectors are zero-extended
+    assert count_toggles("1", "0110") == 3
+    # Unknown bits toggle when they differ
+    assert count_toggles("x1", "01") == 1
+    assert count_toggles("z", "0") == 1
+    assert count_toggles("xx10", "10") == 2
+
+def test_dump_window(vcd):
+    activity = vcd_reader(vcd).get_activity(SCOPES)
+    # The initial values are not toggles; the changes after $dumpoff are not counted
+    assert (activity["start"], activity["end"]) == (0, 50)
+    assert activity["duration_ns"] == pytest.approx(0.05)
+    assert activity["toggles"] == {"tb": 14, "dut[0].core": 12, "mem": 2}
+    assert activity["bits"] == {"tb": 78, "dut[0].core": 6, "mem": 72}
+
+def test_trigger_window(vcd):
+    activity = vcd_reader(vcd).get_activity(SCOPES, trigger="dut[0].core/gpio")
+    # Both edges of the trigger are in the window, the other changes at the falling edge are not
+    assert (activity["start"], activity["end"]) == (20, 40)
+    assert activity["toggles"] == {"tb": 10, "dut[0].core": 8, "mem": 2}
+    # Names match whole path components
+    with pytest.raises(ValueError, match="trigger signal 'core/gpio' not found"):
+        vcd_reader(vcd).get_activity(SCOPES, trigger="core/gpio")
+
+def test_explicit_window(vcd):
+    activity = vcd_reader(vcd).get_activity(SCOPES, start=10, end=40)
+    assert (activity["start"], activity["end"]) == (10, 40)
+    assert activity["toggles"]["dut[0].core"] == 10
+    # An explicit window ignores the dump window and runs to the end of the
+    # file; the values dumped by $dumpoff are not toggles
+    activity = vcd_reader(vcd).get_activity(["dut[0].core"], start=45)
+    assert (activity["start"], activity["end"]) == (45, 60)
+    assert activity["toggles"] == {"dut[0].core": 1}
+
+def test_all_scopes(vcd):
+    toggles = vcd_reader(vcd).get_activity(trigger="gpio")["toggles"]
+    assert set(toggles) == {"tb", "tb/dut_0__core", "tb/mem"}
+
+def test_trimmed_window(vcd, tmp_path):
+    trim_file = str(tmp_path / "trim.vcd")
+    activity = vcd_reader(vcd).get_activity(SCOPES, trigger="gpio", trim_file=trim_file)
+    # The trimmed file starts with the values before the window and has the same activity
+    with open(trim_file) as f:
+        text = f.read()
+    assert text.startswith(HEADER.format(timescale="1ps"))
+    assert "#20\n$dumpvars\n1!\nb0011 \"\n0#\nb0 &\nr0.5 %\n$end\n" in text
+    trimmed = vcd_reader(trim_file).get_activity(SCOPES)
+    assert (trimmed["start"], trimmed["end"]) == (20, 40)
+    assert trimmed["toggles"] == activity["toggles"]
+
+@pytest.mark.parametrize("timescale, scale", [("1ps", 1e-3), ("10 ns", 10.0), ("100us", 1e5)])
+def test_timescale(tmp_path, timescale, scale):
+    path = tmp_path / "sim.vcd"
+    path.write_text(HEADER.format(timescale=timescale) + CHANGES)
+    activity = vcd_reader(str(path)).get_activity(trigger="gpio")
+    assert activity["timescale_ns"] == scale
+    assert activity["duration_ns"] == pytest.approx(20 * scale)
+
+def test_errors(vcd, tmp_path):
+    with pytest.raises(ValueError, match="trigger signal 'done' not found"):
+        vcd_reader(vcd).get_activity(trigger="done")
+    with pytest.raises(ValueError, match="hierarchy 'carus' not found"):
+        vcd_reader(vcd).get_activity(["mem", "carus"])
+    assert vcd_reader(vcd).get_activity(["mem", "carus"], strict=False)["toggles"] == {"mem": 2}
+    truncated = tmp_path / "truncated.vcd"
+    truncated.write_text(HEADER.format(timescale="1ps").replace("$enddefinitions $end\n", ""))
+    with pytest.raises(ValueError, match="missing \\$enddefinitions"):
+        vcd_reader(str(truncated)).get_activity()
+    with pytest.raises(OSError):
+        vcd_reader(str(tmp_path / "missing.vcd")).get_activity()
@@ -0,0 +1,93 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_worktree.py
+# Date: 17/10/2026
+# Description: Tests of the per-worker checkouts
+
+import os
+import shutil
+import subprocess
+import pytest
+from worktree import worker_tree, create_worker_trees
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not available")
+
+# Write a file, creating its directory
+def write(path, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+def git(root, *args: str):
+    subprocess.run(["git", "-C", str(root)] + list(args), check=True, capture_output=True)
+
+# Checkout with tracked, modified, untracked, and ignored files
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    for var in ["GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"]:
+        monkeypatch.setenv(var, "test")
+    for var in ["GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"]:
+        monkeypatch.setenv(var, "test@example.com")
+    root = tmp_path / "repo"
+    write(root / "makefile", "all:\n")
+    write(root / "sw" / "main.c", "int main(void) { return 0; }\n")
+    write(root / ".gitignore", "build/\nhw/vendor/ip/\n")
+    git(root, "init", "-q")
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "initial")
+
+    # Uncommitted edit, vendored IP, and build products
+    write(root / "sw" / "main.c", "int main(void) { return 1; }\n")
+    write(root / "hw" / "vendor" / "ip" / "ip.sv", "module ip; endmodule\n")
+    write(root / "build" / ".heepatia-gen.lock", "")
+    write(root / "build" / ".heepatia-gen.opts", "CARUS_NUM=1\n")
+    os.utime(root / "build" / ".heepatia-gen.opts", (1000000000, 1000000000))
+    write(root / "build" / "epfl_heepatia_heepatia_0" / "sim-verilator" / "Vtb_system", "model\n")
+    write(root / "build" / "sw" / "app" / "main.hex", "00\n")
+    return root
+
+def test_setup(repo, tmp_path):
+    tree = worker_tree(str(repo), str(tmp_path / "workers" / "worker-0"))
+    tree.setup()
+    tree_dir = tmp_path / "workers" / "worker-0"
+
+    # Uncommitted changes are checked out
+    assert (tree_dir / "sw" / "main.c").read_text() == "int main(void) { return 1; }\n"
+    # Untracked inputs are linked from the main checkout
+    assert os.path.islink(tree_dir / "hw" / "vendor" / "ip")
+    assert (tree_dir / "hw" / "vendor" / "ip" / "ip.sv").exists()
+
+    # The build directory is private, with copies of the locks, options, and models
+    build_dir = tree_dir / "build"
+    assert not os.path.islink(build_dir)
+    assert (build_dir / ".heepatia-gen.lock").exists()
+    assert (build_dir / ".heepatia-gen.opts").read_text() == "CARUS_NUM=1\n"
+    assert os.path.getmtime(build_dir / ".heepatia-gen.opts") == 1000000000
+    assert os.path.getmtime(build_dir / ".heepatia-gen.lock") > 1000000000
+    assert (build_dir / "epfl_heepatia_heepatia_0" / "sim-verilator" / "Vtb_system").exists()
+    assert not (build_dir / "sw").exists()
+
+def test_refresh(repo, tmp_path):
+    tree = worker_tree(str(repo), str(tmp_path / "workers" / "worker-0"))
+    tree.setup()
+    write(repo / "sw" / "main.c", "int main(void) { return 2; }\n")
+    tree.setup()
+    assert (tmp_path / "workers" / "worker-0" / "sw" / "main.c").read_text() == "int main(void) { return 2; }\n"
+
+def test_private_paths():
+    tree = worker_tree(".", "worker")
+    assert tree.is_private("build")
+    assert tree.is_private("build/sw")
+    assert tree.is_private("hw/vendor/x-heep/sw/build")
+    assert not tree.is_private("buildx")
+    assert tree.contains_private("hw/vendor/x-heep")
+    assert not tree.contains_private("hw/vendor/ip")
+
+def test_create_and_remove(repo, tmp_path):
+    trees = create_worker_trees(str(repo), str(tmp_path / "workers"), 2)
+    assert [os.path.basename(t.tree_dir) for t in trees] == ["worker-0", "worker-1"]
+    for t in trees:
+        t.remove()
+        assert not os.path.exists(t.tree_dir)
@@ -11,22 +11,85 @@ import argparse
 import sys
 import os
 import test_scheduler as ts
+from build_cache import build_cache
+from results_store import results_store
+from regression import regression_checker, print_diff
+from sim_model import verilator_model
+from cycle_model import cycle_model
 
 # Parse command line arguments
 cmd_parser = argparse.ArgumentParser(description="Test scheduler")
 cmd_parser.add_argument("cfg", 
-                        help="Configuration file")
+                        help="Test list, or sweep specification (.yaml, see sweep.py)")
 cmd_parser.add_argument("report_csv",
                         help="Output throughput report CSV file.",
                         nargs="?",
                         default=f"{os.getcwd()}/throughput.csv")
+cmd_parser.add_argument("--jobs", "-j",
+                        help="Default number of workers of the build and simulation stages.",
+                        type=int,
+                        default=1)
+cmd_parser.add_argument("--build-jobs",
+                        help="Number of concurrent firmware builds, each in its own worktree (default: --jobs).",
+                        type=int)
+cmd_parser.add_argument("--sim-jobs",
+                        help="Number of concurrent Verilator simulations (default: --jobs).",
+                        type=int)
+cmd_parser.add_argument("--queue-size",
+                        help="Maximum number of tests waiting in front of each pipeline stage (default: number of stage workers).",
+                        type=int)
+cmd_parser.add_argument("--results-store",
+                        help="Also append the results to this Parquet results store (see results_store.py).")
+cmd_parser.add_argument("--check-regressions",
+                        help="Compare the results with the previous runs in the results store and fail on regressions (see regression.py).",
+                        action="store_true")
+cmd_parser.add_argument("--cycle-model",
+                        help="Predict the tests that this cycle model (see cycle_model.py) reproduces accurately instead of simulating them.")
+cmd_parser.add_argument("--max-model-error",
+                        help="Maximum held-out relative error of the cycle model to trust its predictions.",
+                        type=float,
+                        default=0.02)
+cmd_parser.add_argument("--build-cache",
+                        help="Directory of the firmware build cache.",
+                        default=f"{os.getcwd()}/build/performance-analysis/build-cache")
+cmd_parser.add_argument("--cache-size",
+                        help="Maximum size of the firmware build cache in MiB.",
+                        type=int,
+                        default=2048)
+cmd_parser.add_argument("--no-build-cache",
+                        help="Always rebuild the test applications.",
+                        action="store_true")
+cmd_parser.add_argument("--no-model-reuse",
+                        help="Simulate each test with 'make verilator-opt' instead of launching a shared Verilator model.",
+                        action="store_true")
+cmd_parser.add_argument("--trace",
+                        help="Write the wall time, CPU time, peak memory, and output size of every stage to this Chrome trace-event JSON file (see stage_trace.py).")
+cmd_parser.add_argument("--resume",
+                        help="Resume an interrupted campaign, skipping the tests already completed.",
+                        action="store_true")
 args = cmd_parser.parse_args()
+if args.check_regressions and args.results_store is None:
+    cmd_parser.error("--check-regressions requires --results-store")
 
 # Initialize test scheduler
 report_dir = os.path.dirname(args.report_csv)
 report_file = os.path.basename(args.report_csv)
-sched = ts.test_scheduler(args.cfg)
-sched.run_throughput(report_dir, report_file)
+cache = None if args.no_build_cache else build_cache(args.build_cache, args.cache_size)
+store = None if args.results_store is None else results_store(args.results_store)
+model = None if args.no_model_reuse else verilator_model(os.getcwd())
+cycles = None if args.cycle_model is None else cycle_model(args.cycle_model)
+sched = ts.test_scheduler(args.cfg, jobs=args.jobs, cache=cache, model=model,
+                          build_jobs=args.build_jobs, sim_jobs=args.sim_jobs, queue_size=args.queue_size, store=store,
+                          cycle_model=cycles, max_model_error=args.max_model_error, trace_file=args.trace)
+num_failed = sched.run_throughput(report_dir, report_file, resume=args.resume)
+
+# Check the campaign for regressions
+num_regressions = 0
+if args.check_regressions:
+    kind = "throughput"
+    diff = regression_checker(store).check(kind, store.run_info["campaign"])
+    print_diff(kind, diff)
+    num_regressions = (diff["status"] == "regression").sum()
 
 # Exit
-sys.exit(0)
+sys.exit(1 if num_failed > 0 or num_regressions > 0 else 0)
@@ -0,0 +1,364 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: vcd_reader.py
+# Date: 17/10/2026
+# Description: Streaming VCD reader extracting the activity in a time window
+
+import argparse
+import sys
+import os
+import re
+import json
+
+# Scale of the VCD time units in ns
+TIME_UNITS_NS = {
+    "s": 1e9,
+    "ms": 1e6,
+    "us": 1e3,
+    "ns": 1.0,
+    "ps": 1e-3,
+    "fs": 1e-6,
+}
+
+# Characters of scalar value changes
+SCALAR_VALUES = "01xzXZ"
+
+# Normalize a VCD scope or signal name to the netlist naming used by PrimePower
+def normalize_name(name: str) -> str:
+    """Convert e.g. '\\gen_carus[0].u_nm_carus_wrapper ' to 'gen_carus_0__u_nm_carus_wrapper'."""
+    name = name.strip().lstrip("\\")
+    return re.sub(r"[\[\].]", "_", name)
+
+# Count the toggling bits between two values of a signal
+def count_toggles(prev: str, value: str) -> int:
+    """Count the bits that changed between two values (zero-extended vectors)."""
+    if prev is None or prev == value:
+        return 0
+    if len(prev) == 1 and len(value) == 1:
+        return 1
+    try:
+        return bin(int(prev, 2) ^ int(value, 2)).count("1")
+    except ValueError:
+        # x/z bits: count the positions that differ
+        width = max(len(prev), len(value))
+        return sum(a != b for a, b in zip(prev.rjust(width, "0"), value.rjust(width, "0")))
+
+class vcd_reader:
+    """Streaming reader of Value Change Dump files.
+
+    The file is read line by line, so memory usage is bounded by the number
+    of signals rather than by the length of the dump. The reader computes the
+    measurement window of the dump and the number of toggling bits of every
+    signal in that window, aggregated by hierarchy. Optionally, it writes a
+    trimmed VCD containing only the measurement window, with the initial
+    values of all the signals.
+
+    The window is selected, in order of precedence, by explicit start and end
+    times, by the first interval in which a trigger signal is high (e.g., the
+    GPIO used by the firmware to mark the kernel), or by the first interval in
+    which the dump is active ($dumpvars/$dumpon to $dumpoff). The latter is
+    the kernel window of the VCD files written by tb_top.sv with VCD_MODE=2.
+    """
+
+    # Initialize reader properties
+    def __init__(self, vcd_file: str):
+        self.vcd_file = vcd_file
+        self.timescale_ns = 1.0
+        self.header: list = []
+        self.signals: dict = {}     # id code -> list of (hierarchy path, width)
+        self.scopes: set = set()
+
+    # Parse the declarations
+    def parse_header(self, vcd):
+        """Parse the header up to '$enddefinitions', leaving 'vcd' at the first value change."""
+        scope: list = []
+        tokens: list = []
+        for line in vcd:
+            self.header.append(line)
+            tokens += line.split()
+            if "$end" not in tokens:
+                continue
+
+            # Process a complete declaration
+            cmd = tokens[0]
+            if cmd == "$scope":
+                scope.append(normalize_name(tokens[2]))
+                self.scopes.add("/".join(scope))
+            elif cmd == "$upscope":
+                scope.pop()
+            elif cmd == "$var":
+                # $var <type> <width> <id> <name> [<range>] $end
+                width, code, name = int(tokens[2]), tokens[3], normalize_name(tokens[4])
+                self.signals.setdefault(code, []).append(("/".join(scope + [name]), width))
+            elif cmd == "$timescale":
+                m = re.match(r"(\d+)\s*([a-z]+)", " ".join(tokens[1:-1]))
+                if m is not None:
+                    self.timescale_ns = int(m.group(1)) * TIME_UNITS_NS[m.group(2)]
+            elif cmd == "$enddefinitions":
+                return
+            tokens = []
+        raise ValueError(f"'{self.vcd_file}': missing $enddefinitions")
+
+    # Find the scopes matching a hierarchy name
+    def match_scope(self, name: str, paths) -> str:
+        """Find the shortest path equal to or ending with 'name' (e.g., a PrimePower hierarchy)."""
+        name = "/".join(normalize_name(n) for n in name.split("/"))
+        matches = [p for p in paths if p == name or p.endswith("/" + name)]
+        if not matches:
+            return None
+        return min(matches, key=len)
+
+    # Stream the value changes and extract the activity in the window
+    def get_activity(self, scopes: list = None, start: int = None, end: int = None, trigger: str = None, trim_file: str = None, strict: bool = True) -> dict:
+        """Compute the measurement window and the toggles of each hierarchy.
+
+        'scopes' selects the hierarchies to report (all of them if None). If
+        'strict' is False, hierarchies missing from the dump are skipped.
+        'start' and 'end' are in VCD time units. Return a dictionary with the
+        window bounds, its duration in ns, the toggles of each selected
+        hierarchy, and the number of signal bits under it.
+        """
+        self.header = []
+        self.signals = {}
+        self.scopes = set()
+        with open(self.vcd_file, "r", buffering=1 << 20) as vcd:
+            self.parse_header(vcd)
+
+            # Trigger signal
+            trigger_code: str = None
+            if trigger is not None:
+                paths = {path: code for code, sigs in self.signals.items() for path, _ in sigs}
+                trigger_path = self.match_scope(trigger, paths)
+                if trigger_path is None:
+                    raise ValueError(f"'{self.vcd_file}': trigger signal '{trigger}' not found")
+                trigger_code = paths[trigger_path]
+
+            # Window state
+            explicit = start is not None or end is not None
+            win_start = start if start is not None else (0 if explicit else None)
+            win_end = end
+            in_window = False
+            time = 0
+
+            # Signal state and toggle counters
+            values: dict = {}
+            reals: set = set()
+            toggles: dict = {}
+            init_section = False    # inside $dumpvars/$dumpon/$dumpall
+            section_in_trim = False # section copied to the trimmed file
+            pending: list = []      # changes at the current time, before the trigger edge
+            trim_time: int = None   # last timestamp written to the trimmed file
+
+            trim = open(trim_file, "w") if trim_file is not None else None
+            if trim is not None:
+                trim.writelines(self.header)
+
+            # A change of a real variable counts as a single toggle
+            def _count_toggles(code: str, prev: str, value: str) -> int:
+                if code in reals:
+                    return int(prev is not None and prev != value)
+                return count_toggles(prev, value)
+
+            # Open the window at the current time, including the 'changes'
+            # already read at that time
+            def _open_window(t: int, changes: list = ()):
+                nonlocal in_window, win_start, trim_time
+                in_window = True
+                win_start = t
+                init_values = values
+                if changes:
+                    init_values = dict(values)
+                    for code, prev, _, _, _ in reversed(changes):
+                        if prev is None:
+                            init_values.pop(code, None)
+                        else:
+                            init_values[code] = prev
+                if trim is not None:
+                    # Initial values of all the signals at the window start
+                    trim.write(f"#{t}\n$dumpvars\n")
+                    trim_time = t
+                    for code, value in init_values.items():
+                        if code in reals:
+                            trim.write(f"r{value} {code}\n")
+                        elif self.signals[code][0][1] == 1 and len(value) == 1:
+                            trim.write(f"{value}{code}\n")
+                        else:
+                            trim.write(f"b{value} {code}\n")
+                    trim.write("$end\n")
+                for code, prev, value, line, init in changes:
+                    if not init:
+                        n = _count_toggles(code, prev, value)
+                        if n:
+                            toggles[code] = toggles.get(code, 0) + n
+                    if trim is not None:
+                        trim.write(line)
+
+            for line in vcd:
+                c = line[:1]
+
+                # Timestamp
+                if c == "#":
+                    t = int(line[1:])
+                    if in_window and win_end is not None and t >= win_end:
+                        break
+                    time = t
+                    pending.clear()
+                    if not in_window and explicit and time >= win_start:
+                        _open_window(win_start)
+                        if time > win_start and trim is not None:
+                            trim.write(line)
+                            trim_time = time
+                    elif in_window and trim is not None:
+                        trim.write(line)
+                        trim_time = time
+                    continue
+
+                # Value changes
+                if not c:
+                    continue
+                if c in SCALAR_VALUES:
+                    code, value = line[1:].strip(), c
+                elif c in "bB":
+                    value, code = line[1:].split()
+                elif c in "rR":
+                    value, code = line[1:].split()
+                    reals.add(code)
+                elif c == "$":
+                    cmd = line.split()[0]
+                    if cmd in ("$dumpvars", "$dumpon", "$dumpall"):
+                        init_section = True
+                        if not in_window and not explicit and trigger_code is None and win_start is None:
+                            # The dump window opens after the initial values
+                            win_start = time
+                    elif cmd == "$dumpoff":
+                        if in_window and not explicit and trigger_code is None:
+                            win_end = time
+                            break
+                        init_section = True
+                    elif cmd == "$end":
+                        if init_section and not in_window and not explicit and trigger_code is None and win_start is not None:
+                            _open_window(win_start)
+                            init_section = False
+                            continue
+                        init_section = False
+                        # Close only the sections opened in the trimmed file
+                        if trim is not None and section_in_trim:
+                            trim.write(line)
+                        section_in_trim = False
+                        continue
+                    if in_window and trim is not None:
+                        trim.write(line)
+                        section_in_trim = "$end" not in line.split()[1:]
+                    continue
+                else:
+                    continue
+
+                # Update the signal state
+                prev = values.get(code)
+                values[code] = value
+                if in_window:
+                    if not init_section:
+                        n = _count_toggles(code, prev, value)
+                        if n:
+                            toggles[code] = toggles.get(code, 0) + n
+                    if trim is not None:
+                        trim.write(line)
+                elif trigger_code is not None:
+                    pending.append((code, prev, value, line, init_section))
+
+                # Trigger edges
+                if code == trigger_code:
+                    high = value.strip("0") != "" and "x" not in value.lower() and "z" not in value.lower()
+                    if high and not in_window and win_end is None:
+                        _open_window(time, pending)
+                    elif not high and in_window:
+                        win_end = time
+                        break
+
+            if win_start is None:
+                win_start = time
+            if win_end is None:
+                win_end = time
+            if trim is not None:
+                if trim_time != win_end:
+                    trim.write(f"#{win_end}\n")
+                trim.close()
+
+        # Aggregate the signal toggles by hierarchy
+        hier_toggles: dict = {}
+        hier_bits: dict = {}
+        for code, sigs in self.signals.items():
+            n = toggles.get(code, 0)
+            for path, width in sigs:
+                parts = path.split("/")
+                for i in range(1, len(parts)):
+                    scope = "/".join(parts[:i])
+                    hier_toggles[scope] = hier_toggles.get(scope, 0) + n
+                    hier_bits[scope] = hier_bits.get(scope, 0) + width
+
+        # Select the requested hierarchies
+        if scopes is None:
+            selected = {s: s for s in hier_toggles}
+        else:
+            selected = {}
+            for name in scopes:
+                path = self.match_scope(name, hier_toggles)
+                if path is None and not strict:
+                    continue
+                if path is None:
+                    raise ValueError(f"'{self.vcd_file}': hierarchy '{name}' not found")
+                selected[name] = path
+
+        return {
+            "vcd_file": self.vcd_file,
+            "start": win_start,
+            "end": win_end,
+            "duration_ns": (win_end - win_start) * self.timescale_ns,
+            "timescale_ns": self.timescale_ns,
+            "toggles": {name: hier_toggles[path] for name, path in selected.items()},
+            "bits": {name: hier_bits[path] for name, path in selected.items()},
+        }
+
+if __name__ == "__main__":
+    # Command line arguments
+    cmd_parser = argparse.ArgumentParser(description="Extract the measurement window and the toggle activity of a VCD file")
+    cmd_parser.add_argument("vcd_file",
+                            help="VCD file")
+    cmd_parser.add_argument("--scope", "-s",
+                            help="Hierarchy to report (e.g., 'u_heepatia_peripherals/gen_carus_0__u_nm_carus_wrapper'). Can be repeated.",
+                            action="append")
+    cmd_parser.add_argument("--start",
+                            help="Window start time (VCD time units).",
+                            type=int)
+    cmd_parser.add_argument("--end",
+                            help="Window end time (VCD time units).",
+                            type=int)
+    cmd_parser.add_argument("--trigger",
+                            help="Signal whose first high interval defines the window.")
+    cmd_parser.add_argument("--trim",
+                            help="Write a VCD file with only the window to this path.")
+    cmd_parser.add_argument("--time-file",
+                            help="Write the window duration in ns to this file (as extract_vcd_timing.sh).")
+    cmd_parser.add_argument("--json",
+                            help="Write the activity report to this JSON file.")
+    args = cmd_parser.parse_args()
+
+    # Extract the activity
+    reader = vcd_reader(args.vcd_file)
+    activity = reader.get_activity(args.scope, args.start, args.end, args.trigger, args.trim)
+
+    # Report
+    print(f"### {os.path.basename(args.vcd_file)}: window [{activity['start']}, {activity['end']}] ({activity['duration_ns']:.1f} ns)")
+    if args.scope is not None:
+        for name in args.scope:
+            print(f"    - {name}: {activity['toggles'][name]} toggles ({activity['bits'][name]} bits)")
+    if args.time_file is not None:
+        with open(args.time_file, "w") as f:
+            f.write(f"{activity['duration_ns']:g}\n")
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(activity, f, indent=1)
+
+    sys.exit(0)
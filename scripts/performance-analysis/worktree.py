@@ -0,0 +1,137 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: worktree.py
+# Date: 17/10/2026
+# Description: Isolated per-worker checkouts for parallel test scheduling
+
+import os
+import shutil
+import subprocess
+import glob
+
+# Paths (relative to the repository root) that must never be shared between
+# workers because the build flow writes into them. Any other untracked
+# directory (e.g., vendored IPs) is symlinked from the main checkout.
+PRIVATE_PATHS = [
+    "build",
+    "hw/vendor/x-heep/sw/build",    # target of the sw/build symlink
+]
+
+class worker_tree:
+    """Isolated checkout used by a single scheduler worker.
+
+    Each worker owns a git worktree of the current checkout (including
+    uncommitted changes to tracked files), a private software build directory,
+    and a private copy of the compiled Verilator model. Untracked inputs such
+    as vendored IPs are symlinked from the main checkout.
+    """
+
+    # Initialize worker tree properties
+    def __init__(self, root_dir: str, tree_dir: str):
+        self.root_dir = os.path.abspath(root_dir)
+        self.tree_dir = os.path.abspath(tree_dir)
+
+    # Run git in the main checkout and return its stdout
+    def git(self, *args: str) -> str:
+        """Run a git command in the main checkout."""
+        out = subprocess.run(["git", "-C", self.root_dir] + list(args), check=True, capture_output=True)
+        return out.stdout.decode("utf-8").strip()
+
+    # Create (or refresh) the worktree
+    def setup(self):
+        """Create the worktree and populate it with untracked build inputs."""
+        # Snapshot the working tree so that uncommitted edits are tested too
+        snapshot = self.git("stash", "create") or self.git("rev-parse", "HEAD")
+
+        if os.path.isdir(os.path.join(self.tree_dir, ".git")) or os.path.isfile(os.path.join(self.tree_dir, ".git")):
+            # Reuse the existing worktree to keep incremental build products
+            subprocess.run(["git", "-C", self.tree_dir, "checkout", "--detach", "--force", snapshot], check=True, capture_output=True)
+        else:
+            os.makedirs(os.path.dirname(self.tree_dir), exist_ok=True)
+            self.git("worktree", "add", "--detach", "--force", self.tree_dir, snapshot)
+
+        # Link or copy untracked files (vendored IPs, generated RTL and headers)
+        untracked = self.git("ls-files", "--others", "--directory", "--exclude-standard").splitlines()
+        untracked += self.git("ls-files", "--others", "--ignored", "--directory", "--exclude-standard").splitlines()
+        for path in untracked:
+            path = path.rstrip("/")
+            if self.is_private(path) or path.startswith(os.path.relpath(self.tree_dir, self.root_dir)):
+                continue
+            self.mirror(path)
+
+        # Copy the generation locks and the compiled simulation models
+        self.copy_build_products()
+
+    # Check whether a path must be private to the worker
+    def is_private(self, path: str) -> bool:
+        """Check whether a path (or one of its parents) is private."""
+        return any(path == p or path.startswith(p + "/") for p in PRIVATE_PATHS)
+
+    # Check whether a path contains a private path
+    def contains_private(self, path: str) -> bool:
+        """Check whether a path is a parent of a private path."""
+        return any(p.startswith(path + "/") for p in PRIVATE_PATHS)
+
+    # Mirror an untracked path from the main checkout
+    def mirror(self, path: str):
+        """Symlink untracked directories and copy untracked files."""
+        src = os.path.join(self.root_dir, path)
+        dst = os.path.join(self.tree_dir, path)
+        if os.path.lexists(dst) or not os.path.lexists(src):
+            return
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if os.path.isdir(src) and not os.path.islink(src):
+            if self.contains_private(path):
+                # Shadow the directory so that the private subtree can be replaced
+                os.makedirs(dst)
+                for entry in os.listdir(src):
+                    child = os.path.join(path, entry)
+                    if self.is_private(child):
+                        os.makedirs(os.path.join(self.tree_dir, child), exist_ok=True)
+                    else:
+                        self.mirror(child)
+            else:
+                os.symlink(src, dst)
+        else:
+            shutil.copy2(src, dst, follow_symlinks=False)
+
+    # Copy lock files and simulation models into the worker build directory
+    def copy_build_products(self):
+        """Copy the generation locks and options, and the compiled simulation models."""
+        src_build = os.path.join(self.root_dir, "build")
+        dst_build = os.path.join(self.tree_dir, "build")
+        os.makedirs(dst_build, exist_ok=True)
+
+        # Options of the last heepatia generation, which the heepatia-gen
+        # lock depends on: its timestamp is preserved, so that it stays older
+        # than the lock.
+        for opts in glob.glob(os.path.join(src_build, ".*.opts")):
+            shutil.copy2(opts, dst_build)
+
+        # Locks are copied without preserving timestamps, so that make does
+        # not consider them older than the freshly checked-out templates.
+        for lock in glob.glob(os.path.join(src_build, ".*.lock")):
+            shutil.copy(lock, dst_build)
+
+        # Compiled Verilator models (one per FuseSoC core build directory)
+        for sim_dir in glob.glob(os.path.join(src_build, "*", "sim-verilator")):
+            dst = os.path.join(dst_build, os.path.relpath(sim_dir, src_build))
+            if not os.path.exists(dst):
+                shutil.copytree(sim_dir, dst, symlinks=True)
+
+    # Remove the worktree
+    def remove(self):
+        """Remove the worktree from the main checkout."""
+        self.git("worktree", "remove", "--force", self.tree_dir)
+
+# Create one worktree per worker
+def create_worker_trees(root_dir: str, work_dir: str, num_workers: int, prefix: str = "worker") -> list:
+    """Create (or refresh) the worktrees used by the scheduler workers."""
+    trees = []
+    for i in range(num_workers):
+        tree = worker_tree(root_dir, os.path.join(work_dir, f"{prefix}-{i}"))
+        tree.setup()
+        trees.append(tree)
+    return trees
@@ -14,6 +14,7 @@
 #include "fast_intr_ctrl.h"
 #include "dma_sdk.h"
 #include "vcd_util.h"
+#include "perf_cnt.h"
 #include "timer_sdk.h"
 #include "ext_irq.h"
 #include "carus.h"
@@ -45,6 +46,7 @@
 typedef struct {
     uint32_t t_prc;
     uint32_t t_flash;
+    uint32_t t_decomp;
     uint32_t t_dma_to;
     uint32_t t_dma_from;
     uint32_t n_dms;
@@ -71,6 +73,10 @@ data_t *R_ram = cache + A_ROWS*A_COLS + B_ROWS*B_COLS;
 data_t *R_ram2 = cache + A_ROWS*A_COLS + B_ROWS*B_COLS + R_ROWS*R_COLS;
 #endif
 
+#ifdef DATA_COMPRESSED
+// Staging buffer of the matrices compressed in flash
+uint8_t cdata_buf[CDATA_BUFFER_SIZE(CDATA_BLOCK_SIZE)] __attribute__((aligned(4)));
+#endif
 
 int main(void)
 {
@@ -142,14 +148,23 @@ int main(void)
     * ============================== */
     // move data from A and B which are in flash to A_ram and B_ram which are in ram
     timing_carus->t_tmp1 = timer_get_cycles();
+#ifdef DATA_COMPRESSED
+    if (cdata_load_flash(&A_cdata, A_ram, cdata_buf, &timing_carus->t_decomp) != CDATA_OK) return -1;
+    if (cdata_load_flash(&B_cdata, B_ram, cdata_buf, &timing_carus->t_decomp) != CDATA_OK) return -1;
+#else
     if (w25q128jw_read_quad_dma_async((int32_t)heep_get_flash_address_offset((data_t *)A), A_ram, A_ROWS*A_COLS*ELEM_SIZE) != FLASH_OK)return -1;
     w25q128jw_wait_quad_dma_async(A_ram, A_ROWS*A_COLS*ELEM_SIZE);
     if (w25q128jw_read_quad_dma_async((int32_t)heep_get_flash_address_offset((data_t *)B), B_ram, B_ROWS*B_COLS*ELEM_SIZE) != FLASH_OK)return -1;
     w25q128jw_wait_quad_dma_async(B_ram, B_ROWS*B_COLS*ELEM_SIZE);
+#endif
     timing_carus->t_flash = timer_get_cycles() - timing_carus->t_tmp1;
 #ifdef CHECK_RESULTS
+#ifdef DATA_COMPRESSED
+    if (cdata_load_flash(&R_cdata, R_ram2, cdata_buf, NULL) != CDATA_OK) return -1;
+#else
     if (w25q128jw_read_quad_dma_async((int32_t)heep_get_flash_address_offset((data_t *)R), R_ram2, R_ROWS*R_COLS*ELEM_SIZE) != FLASH_OK)return -1;
     w25q128jw_wait_quad_dma_async(R_ram2, R_ROWS*R_COLS*ELEM_SIZE);
+#endif
 #endif
 
     /* =======================================
@@ -162,6 +177,14 @@ int main(void)
    timing_carus->t_tot = timer_get_cycles() - t1;
 
    PRINTF("Carus-add: flash: %d, total: %d, prc: %d, dma_to: %d, dma_from: %d, acc: %d, n_dms: %d\n", timing_carus->t_flash, timing_carus->t_tot, timing_carus->t_prc, timing_carus->t_dma_to, timing_carus->t_dma_from, timing_carus->t_acc, timing_carus->n_dms);
+   perf_report(PERF_MODE_CARUS, PERF_DMA_IN, timing_carus->t_dma_to);
+   perf_report(PERF_MODE_CARUS, PERF_COMPUTE, timing_carus->t_prc);
+   perf_report(PERF_MODE_CARUS, PERF_DMA_OUT, timing_carus->t_dma_from);
+   perf_report(PERF_MODE_CARUS, PERF_TOTAL, timing_carus->t_tot);
+   perf_report(PERF_MODE_CARUS, PERF_FLASH, timing_carus->t_flash);
+#ifdef DATA_COMPRESSED
+   perf_report(PERF_MODE_CARUS, PERF_DECOMPRESS, timing_carus->t_decomp);
+#endif
 
 
 #ifdef CHECK_RESULTS
@@ -6,7 +6,7 @@ import nm_deployment
 import sys
 # import caesar_backend as caesar
 
-from c_gen import CFileGen
+from c_gen import CFileGen, COMPRESSIONS
 
 # VSEW decoder
 def vtype_decoder(width: str) -> np.dtype:
@@ -78,6 +78,11 @@ def main():
                             choices=range(1, 65537),
                             default=4,
                             help='Number of columns of matrix A.')
+    cmd_parser.add_argument('--compression', '-z',
+                            type=str,
+                            choices=COMPRESSIONS,
+                            default=os.environ.get('DATA_COMPRESSION', 'none'),
+                            help='compression of the matrices in flash, decompressed by main.c at run time (default: DATA_COMPRESSION or none).')
     cmd_parser.add_argument('--version', '-v', 
                             action='version', 
                             version='%(prog)s 0.1.0', 
@@ -88,6 +93,13 @@ def main():
 
     # Output directory
     out_dir = args.outdir
+
+    # Reuse the data generated with the same parameters
+    data_header = 'data.h'
+    header_gen = CFileGen(compression=args.compression)
+    if header_gen.check_cache(out_dir, data_header, vars(args)):
+        print('- header file \'' + out_dir + '/' + data_header + '\' is up to date.')
+        return
     
     # ------------------------------
     # Data generation
@@ -137,8 +149,6 @@ def main():
     R = np.matmul(A, B)
 
     # -- Generate file --
-    data_header = 'data.h'
-    header_gen = CFileGen()
     header_gen.add_macro('ELEM_SIZE', sew // 8, "element size in bytes")
     ctype = ctype_decoder(sew)
     header_gen.add_macro_raw('data_t', ctype, "element data type")
@@ -23,6 +23,7 @@
 #include "fast_intr_ctrl.h"
 #include "dma_sdk.h"
 #include "vcd_util.h"
+#include "perf_cnt.h"
 #include "ext_irq.h"
 #include "timer_sdk.h"
 #include "x-heep.h"
@@ -46,6 +47,7 @@
 typedef struct {
     uint32_t t_prc;
     uint32_t t_flash;
+    uint32_t t_decomp;
     uint32_t t_dma_to;
     uint32_t t_dma_from;
     uint32_t n_dms;
@@ -88,6 +90,10 @@ int32_t *R_ram = cache + A_ROWS*A_COLS + B_ROWS*B_COLS;
 int32_t cgra_buffer[CGRA_BUFFER_SIZE] __attribute__((section(".xheep_data_interleaved"))) = {0};
 
 /****************************************************************************/
+#ifdef DATA_COMPRESSED
+// Staging buffer of the matrices compressed in flash
+uint8_t cdata_buf[CDATA_BUFFER_SIZE(CDATA_BLOCK_SIZE)] __attribute__((aligned(4)));
+#endif
 
 int main(void)
 {
@@ -138,10 +144,15 @@ int main(void)
     * ============================== */
     // move data from A and B which are in flash to A_ram and B_ram which are in ram
     timing_cgra->t_tmp1 = timer_get_cycles();
+#ifdef DATA_COMPRESSED
+    if (cdata_load_flash(&A_cdata, A_ram, cdata_buf, &timing_cgra->t_decomp) != CDATA_OK) return -1;
+    if (cdata_load_flash(&B_cdata, B_ram, cdata_buf, &timing_cgra->t_decomp) != CDATA_OK) return -1;
+#else
     if (w25q128jw_read_quad_dma_async((uint32_t)heep_get_flash_address_offset((uint32_t *)A), A_ram, A_ROWS*A_COLS*ELEM_SIZE) != FLASH_OK)return -1;
     w25q128jw_wait_quad_dma_async(A_ram, A_ROWS*A_COLS*ELEM_SIZE);
     if (w25q128jw_read_quad_dma_async((uint32_t)heep_get_flash_address_offset((uint32_t *)B), B_ram, B_ROWS*B_COLS*ELEM_SIZE) != FLASH_OK)return -1;
     w25q128jw_wait_quad_dma_async(B_ram, B_ROWS*B_COLS*ELEM_SIZE);
+#endif
     timing_cgra->t_flash = timer_get_cycles() - timing_cgra->t_tmp1;
 
     /* =======================================
@@ -156,6 +167,14 @@ int main(void)
 
 
     PRINTF("size: %dx%dx%d, CGRA: flash: %d, total: %d, prc: %d, dma_to: %d, dma_from: %d, n_dms: %d\n", A_ROWS, A_COLS, B_COLS, timing_cgra->t_flash, timing_cgra->t_tot, timing_cgra->t_prc, timing_cgra->t_dma_to, timing_cgra->t_dma_from, timing_cgra->n_dms);
+    perf_report(PERF_MODE_CGRA, PERF_DMA_IN, timing_cgra->t_dma_to);
+    perf_report(PERF_MODE_CGRA, PERF_COMPUTE, timing_cgra->t_prc);
+    perf_report(PERF_MODE_CGRA, PERF_DMA_OUT, timing_cgra->t_dma_from);
+    perf_report(PERF_MODE_CGRA, PERF_TOTAL, timing_cgra->t_tot);
+    perf_report(PERF_MODE_CGRA, PERF_FLASH, timing_cgra->t_flash);
+#ifdef DATA_COMPRESSED
+    perf_report(PERF_MODE_CGRA, PERF_DECOMPRESS, timing_cgra->t_decomp);
+#endif
 
 
     // /* ======================================================== */
@@ -88,6 +88,13 @@ def main():
 
     # Output directory
     out_dir = args.outdir
+
+    # Reuse the data generated with the same parameters
+    data_header = 'data.h'
+    header_gen = CFileGen()
+    if header_gen.check_cache(out_dir, data_header, vars(args)):
+        print('- header file \'' + out_dir + '/' + data_header + '\' is up to date.')
+        return
     
     # ------------------------------
     # Data generation
@@ -137,8 +144,6 @@ def main():
     R = np.matmul(A, B)
 
     # -- Generate file --
-    data_header = 'data.h'
-    header_gen = CFileGen()
     header_gen.add_macro('ELEM_SIZE', sew // 8, "element size in bytes")
     ctype = ctype_decoder(sew)
     header_gen.add_macro_raw('data_t', ctype, "element data type")
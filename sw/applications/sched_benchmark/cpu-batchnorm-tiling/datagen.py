@@ -5,7 +5,7 @@ import nm_deployment
 import sys
 # import caesar_backend as caesar
 
-from c_gen import CFileGen
+from c_gen import CFileGen, COMPRESSIONS
 
 # VSEW decoder
 def vtype_decoder(width: str) -> np.dtype:
@@ -85,6 +85,11 @@ def main():
     cmd_parser.add_argument('--seed', '-s',
                             type=int,
                             help='Seed for numpy PRG (normally used for debug).')
+    cmd_parser.add_argument('--compression', '-z',
+                            type=str,
+                            choices=COMPRESSIONS,
+                            default=os.environ.get('DATA_COMPRESSION', 'none'),
+                            help='compression of the matrices in flash, decompressed by main.c at run time (default: DATA_COMPRESSION or none).')
     cmd_parser.add_argument('--version', '-v', 
                             action='version', 
                             version='%(prog)s 0.1.0', 
@@ -95,6 +100,13 @@ def main():
 
     # Output directory
     out_dir = args.outdir
+
+    # Reuse the data generated with the same parameters
+    data_header = 'data.h'
+    header_gen = CFileGen(compression=args.compression)
+    if header_gen.check_cache(out_dir, data_header, vars(args)):
+        print('- header file \'' + out_dir + '/' + data_header + '\' is up to date.')
+        return
     
     # ------------------------------
     # Data generation
@@ -141,8 +153,6 @@ def main():
     ctype_double = ctype_decoder_double(sew)
 
     # -- Generate file --
-    data_header = 'data.h'
-    header_gen = CFileGen()
     
     header_gen.add_macro('ARG0', N, "kernel argument 0: number of vectors")
     header_gen.add_macro('VL', VL, "vector length")
@@ -11,6 +11,7 @@
 #include "fast_intr_ctrl.h"
 #include "dma_sdk.h"
 #include "vcd_util.h"
+#include "perf_cnt.h"
 #include "timer_sdk.h"
 #include "ext_irq.h"
 #include "data.h" // Assuming this contains A, R_cpu, W, B, Q, ELEM_SIZE, MUL, SHIFT, MUL_HQ
@@ -43,6 +44,7 @@
 typedef struct {
     uint32_t t_prc;
     uint32_t t_flash;
+    uint32_t t_decomp;
     uint32_t t_dma_to;
     uint32_t t_dma_from;
     uint32_t n_dms;
@@ -68,6 +70,10 @@ data_t *R_ram = cache + A_ROWS*A_COLS + B_ROWS*B_COLS + W_ROWS*W_COLS;
 // CPU buffer
 data_t cpu_buffer[CPU_BUFFER_SIZE] __attribute__((section(".xheep_data_interleaved"))) = {0};
 
+#ifdef DATA_COMPRESSED
+// Staging buffer of the matrices compressed in flash
+uint8_t cdata_buf[CDATA_BUFFER_SIZE(CDATA_BLOCK_SIZE)] __attribute__((aligned(4)));
+#endif
 
 int main(void)
 {
@@ -111,12 +117,18 @@ int main(void)
     * ============================== */
     // move data from A and B which are in flash to A_ram and B_ram which are in ram
     timing_cpu->t_tmp1 = timer_get_cycles();
+#ifdef DATA_COMPRESSED
+    if (cdata_load_flash(&A_cdata, A_ram, cdata_buf, &timing_cpu->t_decomp) != CDATA_OK) return -1;
+    if (cdata_load_flash(&W_cdata, W_ram, cdata_buf, &timing_cpu->t_decomp) != CDATA_OK) return -1;
+    if (cdata_load_flash(&B_cdata, B_ram, cdata_buf, &timing_cpu->t_decomp) != CDATA_OK) return -1;
+#else
     if (w25q128jw_read_quad_dma_async((int32_t)heep_get_flash_address_offset((int32_t *)A), A_ram, A_ROWS*A_COLS*ELEM_SIZE) != FLASH_OK)return -1;
     w25q128jw_wait_quad_dma_async(A_ram, A_ROWS*A_COLS*ELEM_SIZE);
     if (w25q128jw_read_quad_dma_async((int32_t)heep_get_flash_address_offset((int32_t *)W), W_ram, W_ROWS*W_COLS*ELEM_SIZE) != FLASH_OK)return -1;
     w25q128jw_wait_quad_dma_async(W_ram, W_ROWS*W_COLS*ELEM_SIZE);
     if (w25q128jw_read_quad_dma_async((int32_t)heep_get_flash_address_offset((int32_t *)B), B_ram, B_ROWS*B_COLS*ELEM_SIZE) != FLASH_OK)return -1;
     w25q128jw_wait_quad_dma_async(B_ram, B_ROWS*B_COLS*ELEM_SIZE);
+#endif
     timing_cpu->t_flash = timer_get_cycles() - timing_cpu->t_tmp1;
 
     /* =======================================
@@ -133,6 +145,14 @@ int main(void)
     PRINTF("R_ram[%d]: %x\n", A_ROWS*A_COLS-1, R_ram[A_ROWS*A_COLS-1]);
 
     PRINTF("CPU-Norm: flash: %d, total: %d, prc: %d, dma_to: %d, dma_from: %d, n_dms: %d\n", timing_cpu->t_flash, timing_cpu->t_tot, timing_cpu->t_prc, timing_cpu->t_dma_to, timing_cpu->t_dma_from, timing_cpu->n_dms);
+    perf_report(PERF_MODE_CPU, PERF_DMA_IN, timing_cpu->t_dma_to);
+    perf_report(PERF_MODE_CPU, PERF_COMPUTE, timing_cpu->t_prc);
+    perf_report(PERF_MODE_CPU, PERF_DMA_OUT, timing_cpu->t_dma_from);
+    perf_report(PERF_MODE_CPU, PERF_TOTAL, timing_cpu->t_tot);
+    perf_report(PERF_MODE_CPU, PERF_FLASH, timing_cpu->t_flash);
+#ifdef DATA_COMPRESSED
+    perf_report(PERF_MODE_CPU, PERF_DECOMPRESS, timing_cpu->t_decomp);
+#endif
 
 }
 
@@ -95,6 +95,13 @@ def main():
 
     # Output directory
     out_dir = args.outdir
+
+    # Reuse the data generated with the same parameters
+    data_header = 'data.h'
+    header_gen = CFileGen()
+    if header_gen.check_cache(out_dir, data_header, vars(args)):
+        print('- header file \'' + out_dir + '/' + data_header + '\' is up to date.')
+        return
     
     # ------------------------------
     # Data generation
@@ -141,8 +148,6 @@ def main():
     ctype_double = ctype_decoder_double(sew)
 
     # -- Generate file --
-    data_header = 'data.h'
-    header_gen = CFileGen()
     
     header_gen.add_macro('ARG0', N, "kernel argument 0: number of vectors")
     header_gen.add_macro('VL', VL, "vector length")
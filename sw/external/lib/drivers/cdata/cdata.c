@@ -0,0 +1,148 @@
+// Copyright 2023 EPFL and Politecnico di Torino.
+// Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+// SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+//
+// File: cdata.c
+// Date: 17/10/2026
+// Description: Decompression of the matrices compressed by CFileGen (sw/nmc/c_gen.py)
+
+#include <stddef.h>
+#include <string.h>
+#include "cdata.h"
+#include "x-heep.h"
+#include "w25q128jw.h"
+#include "timer_sdk.h"
+
+/*********************************/
+/* ---- FUNCTION PROTOTYPES ---- */
+/*********************************/
+
+static cdata_error_t rle_decode(const uint8_t *src, uint32_t src_size, uint32_t elem_size, uint8_t *dst, uint32_t dst_size);
+static void fill(uint8_t *dst, const uint8_t *value, uint32_t elem_size, uint32_t count);
+static uint32_t get_block_size(const cdata_t *c, uint32_t i);
+
+/**************************************/
+/* ---- FUNCTIONS IMPLEMENTATION ---- */
+/**************************************/
+
+// Decompress a block
+cdata_error_t cdata_decompress_block(const uint8_t *src, uint32_t src_size, uint32_t method, uint32_t elem_size, uint8_t *dst, uint32_t dst_size) {
+    switch (method) {
+        case CDATA_RAW:
+            if (src_size != dst_size) return CDATA_ERR_CORRUPT;
+            memcpy(dst, src, dst_size);
+            return CDATA_OK;
+        case CDATA_RLE:
+            return rle_decode(src, src_size, elem_size, dst, dst_size);
+        default:
+            return CDATA_ERR_CORRUPT;
+    }
+}
+
+// Decompress a matrix whose compressed stream is addressable
+cdata_error_t cdata_load(const cdata_t *c, void *dst) {
+    for (uint32_t i = 0; i < c->num_blocks; i++) {
+        const cdata_block_t *block = &c->blocks[i];
+        uint8_t *out = (uint8_t *) dst + i * c->block_size;
+        cdata_error_t err = cdata_decompress_block(c->data + block->offset, block->size, block->method, c->elem_size, out, get_block_size(c, i));
+        if (err != CDATA_OK) return err;
+    }
+    return CDATA_OK;
+}
+
+// Decompress a matrix whose compressed stream is in flash only
+cdata_error_t cdata_load_flash(const cdata_t *c, void *dst, uint8_t *buf, uint32_t *decomp_cycles) {
+    uint32_t flash_addr = (uint32_t) heep_get_flash_address_offset((uint32_t *) c->data);
+    uint8_t *read_buf = NULL;
+
+    for (uint32_t i = 0; i <= c->num_blocks; i++) {
+        // Wait for the read of the current block (i - 1)
+        uint8_t *cur_buf = read_buf;
+        if (i > 0) w25q128jw_wait_quad_dma_async(cur_buf, c->blocks[i - 1].size);
+
+        // Start reading the next block (i), either into the destination
+        // (raw) or into the half of the staging buffer not being decompressed
+        if (i < c->num_blocks) {
+            const cdata_block_t *block = &c->blocks[i];
+            read_buf = block->method == CDATA_RAW ? (uint8_t *) dst + i * c->block_size : buf + (i & 1) * c->block_size;
+            if (block->size > c->block_size) return CDATA_ERR_CORRUPT;
+            if (w25q128jw_read_quad_dma_async(flash_addr + block->offset, read_buf, block->size) != FLASH_OK) return CDATA_ERR_FLASH;
+        }
+
+        // Decompress the current block while the next one is read
+        if (i > 0 && c->blocks[i - 1].method != CDATA_RAW) {
+            const cdata_block_t *block = &c->blocks[i - 1];
+            uint32_t t_start = timer_get_cycles();
+            cdata_error_t err = cdata_decompress_block(cur_buf, block->size, block->method, c->elem_size, (uint8_t *) dst + (i - 1) * c->block_size, get_block_size(c, i - 1));
+            if (decomp_cycles != NULL) *decomp_cycles += timer_get_cycles() - t_start;
+            if (err != CDATA_OK) {
+                // Do not leave a read in progress
+                if (i < c->num_blocks) w25q128jw_wait_quad_dma_async(read_buf, c->blocks[i].size);
+                return err;
+            }
+        }
+    }
+    return CDATA_OK;
+}
+
+/**********************************************/
+/* ---- PRIVATE FUNCTIONS IMPLEMENTATION ---- */
+/**********************************************/
+
+// Decode a run-length encoded block
+static cdata_error_t rle_decode(const uint8_t *src, uint32_t src_size, uint32_t elem_size, uint8_t *dst, uint32_t dst_size) {
+    const uint8_t *src_end = src + src_size;
+    uint8_t *dst_end = dst + dst_size;
+
+    // Trailing bytes after the last element are padding
+    while (dst < dst_end) {
+        if (src >= src_end) return CDATA_ERR_CORRUPT;
+        uint32_t ctrl = *src++;
+        if (ctrl < CDATA_RLE_RUN) {
+            // Literal elements
+            uint32_t len = (ctrl + 1) * elem_size;
+            if (len > (uint32_t) (src_end - src) || len > (uint32_t) (dst_end - dst)) return CDATA_ERR_CORRUPT;
+            memcpy(dst, src, len);
+            src += len;
+            dst += len;
+        } else {
+            // Repeated element
+            uint32_t count = ctrl - CDATA_RLE_RUN + CDATA_RLE_MIN_RUN;
+            if (elem_size > (uint32_t) (src_end - src) || count * elem_size > (uint32_t) (dst_end - dst)) return CDATA_ERR_CORRUPT;
+            fill(dst, src, elem_size, count);
+            src += elem_size;
+            dst += count * elem_size;
+        }
+    }
+    return CDATA_OK;
+}
+
+// Repeat an element (dst is aligned to the element size)
+static void fill(uint8_t *dst, const uint8_t *value, uint32_t elem_size, uint32_t count) {
+    switch (elem_size) {
+        case 1:
+            memset(dst, *value, count);
+            break;
+        case 2: {
+            uint16_t v;
+            memcpy(&v, value, sizeof(v));
+            for (uint32_t i = 0; i < count; i++) ((uint16_t *) dst)[i] = v;
+            break;
+        }
+        case 4: {
+            uint32_t v;
+            memcpy(&v, value, sizeof(v));
+            for (uint32_t i = 0; i < count; i++) ((uint32_t *) dst)[i] = v;
+            break;
+        }
+        default:
+            for (uint32_t i = 0; i < count; i++) memcpy(dst + i * elem_size, value, elem_size);
+            break;
+    }
+}
+
+// Uncompressed size of a block (the last one can be shorter)
+static uint32_t get_block_size(const cdata_t *c, uint32_t i) {
+    uint32_t end = (i + 1) * c->block_size;
+    return (end <= c->size ? c->block_size : c->size - i * c->block_size);
+}
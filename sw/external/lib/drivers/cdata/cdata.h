@@ -0,0 +1,106 @@
+// Copyright 2023 EPFL and Politecnico di Torino.
+// Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+// SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+//
+// File: cdata.h
+// Date: 17/10/2026
+// Description: Decompression of the matrices compressed by CFileGen (sw/nmc/c_gen.py)
+
+#ifndef CDATA_H_
+#define CDATA_H_
+
+#include <stdint.h>
+
+/*
+ * A compressed matrix is split into blocks of 'block_size' uncompressed bytes
+ * (the last one can be shorter), compressed independently. Each block starts
+ * at a 4-byte aligned offset of the compressed stream, and is either stored
+ * raw or run-length encoded as a sequence of:
+ *
+ *     c < CDATA_RLE_RUN:  c + 1 literal elements
+ *     c >= CDATA_RLE_RUN: one element, repeated c - CDATA_RLE_RUN + CDATA_RLE_MIN_RUN times
+ *
+ * where c is a control byte and elements are 'elem_size' little-endian bytes.
+ * The generated data.h defines DATA_COMPRESSED, CDATA_BLOCK_SIZE, and a
+ * '<name>_cdata' descriptor for each matrix.
+ */
+
+// RLE control bytes
+#define CDATA_RLE_RUN     0x80
+#define CDATA_RLE_MIN_RUN 3
+
+// Size of the staging buffer of cdata_load_flash() (double buffered)
+#define CDATA_BUFFER_SIZE(block_size) (2 * (block_size))
+
+// Compression method of a block
+typedef enum {
+    CDATA_RAW = 0,
+    CDATA_RLE = 1,
+} cdata_method_t;
+
+// Return codes
+typedef enum {
+    CDATA_OK = 0,
+    CDATA_ERR_CORRUPT = 1,   // invalid compressed block
+    CDATA_ERR_FLASH = 2,     // flash read error
+} cdata_error_t;
+
+// Compressed block
+typedef struct {
+    uint32_t offset;         // offset in the compressed stream, in bytes
+    uint16_t size;           // compressed size, in bytes
+    uint16_t method;         // compression method (cdata_method_t)
+} cdata_block_t;
+
+// Compressed matrix
+typedef struct {
+    const uint8_t *data;             // compressed stream
+    const cdata_block_t *blocks;     // block table
+    uint32_t num_blocks;             // number of blocks
+    uint32_t block_size;             // uncompressed size of the blocks, in bytes
+    uint32_t size;                   // uncompressed size, in bytes
+    uint32_t elem_size;              // element size, in bytes
+} cdata_t;
+
+/********************************/
+/* ---- EXPORTED FUNCTIONS ---- */
+/********************************/
+
+/**
+ * @brief Decompress a block
+ *
+ * @param src Compressed block
+ * @param src_size Compressed size, in bytes
+ * @param method Compression method
+ * @param elem_size Element size, in bytes
+ * @param dst Destination
+ * @param dst_size Uncompressed size, in bytes
+ * @return CDATA_OK, or CDATA_ERR_CORRUPT if the block does not decompress to exactly dst_size bytes
+ */
+cdata_error_t cdata_decompress_block(const uint8_t *src, uint32_t src_size, uint32_t method, uint32_t elem_size, uint8_t *dst, uint32_t dst_size);
+
+/**
+ * @brief Decompress a matrix whose compressed stream is addressable
+ *
+ * @param c Compressed matrix
+ * @param dst Destination (c->size bytes)
+ * @return CDATA_OK or an error code
+ */
+cdata_error_t cdata_load(const cdata_t *c, void *dst);
+
+/**
+ * @brief Decompress a matrix whose compressed stream is in flash only
+ *
+ * Blocks are read from the flash with the quad SPI DMA. Raw blocks are read
+ * into the destination directly, the others into the staging buffer, where
+ * they are decompressed while the next block is read.
+ *
+ * @param c Compressed matrix
+ * @param dst Destination (c->size bytes, aligned to the element size)
+ * @param buf Staging buffer (CDATA_BUFFER_SIZE(c->block_size) bytes, 4-byte aligned)
+ * @param decomp_cycles If not NULL, incremented by the cycles spent decompressing
+ * @return CDATA_OK or an error code
+ */
+cdata_error_t cdata_load_flash(const cdata_t *c, void *dst, uint8_t *buf, uint32_t *decomp_cycles);
+
+#endif /* CDATA_H_ */
@@ -0,0 +1,21 @@
+// Copyright 2023 EPFL and Politecnico di Torino.
+// Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+// SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+//
+// File: perf_cnt.c
+// Date: 17/10/2026
+// Description: Performance counter records decoded by the test scheduler
+
+#include <stdio.h>
+#include "perf_cnt.h"
+
+/**************************************/
+/* ---- FUNCTIONS IMPLEMENTATION ---- */
+/**************************************/
+
+// Print a performance counter record
+void perf_report(const char *mode, const char *phase, uint32_t cycles) {
+    // Always printed, independently of the PRINTF settings of the application
+    printf(PERF_TAG " %s %s %u\n", mode, phase, (unsigned int) cycles);
+}
+
@@ -0,0 +1,59 @@
+// Copyright 2023 EPFL and Politecnico di Torino.
+// Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+// SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+//
+// File: perf_cnt.h
+// Date: 17/10/2026
+// Description: Performance counter records decoded by the test scheduler
+
+#ifndef PERF_CNT_H_
+#define PERF_CNT_H_
+
+#include <stdint.h>
+
+/*
+ * Each record is printed on its own line as:
+ *
+ *     @perf <mode> <phase> <cycles>
+ *
+ * where <mode> is the execution target (e.g., "cpu" or "carus") and <phase>
+ * a name made of letters, digits and underscores. Records with the same mode
+ * and phase are summed by the scheduler, so a phase can also be reported once
+ * per tile. The "total" phase is the kernel execution time; if the "tiling"
+ * phase is not reported, the scheduler computes it as the part of the total
+ * not covered by the other phases. The load phases measure the transfer of
+ * the input data from the flash before the kernel runs, and are not part of
+ * the total.
+ */
+#define PERF_TAG "@perf"
+
+// Execution modes
+#define PERF_MODE_CPU   "cpu"
+#define PERF_MODE_CARUS "carus"
+#define PERF_MODE_CGRA  "cgra"
+
+// Standard phases
+#define PERF_TOTAL   "total"    // kernel execution time
+#define PERF_DMA_IN  "dma_in"   // input transfers
+#define PERF_COMPUTE "compute"  // computation
+#define PERF_DMA_OUT "dma_out"  // output transfers
+#define PERF_TILING  "tiling"   // tiling overhead (loop control, configuration)
+
+// Load phases
+#define PERF_FLASH      "flash"      // data loading from the flash (including decompression)
+#define PERF_DECOMPRESS "decompress" // decompression of the data loaded from the flash (see cdata.h)
+
+/********************************/
+/* ---- EXPORTED FUNCTIONS ---- */
+/********************************/
+
+/**
+ * @brief Print a performance counter record
+ * 
+ * @param mode Execution mode
+ * @param phase Phase name
+ * @param cycles Number of cycles
+ */
+void perf_report(const char *mode, const char *phase, uint32_t cycles);
+
+#endif /* PERF_CNT_H_ */
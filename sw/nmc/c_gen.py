@@ -2,9 +2,54 @@
 # matrix, and the instruction stream.
 
 import os
+import re
 import sys
+import json
+import hashlib
 import numpy as np
 
+# ASCII hex digits of every byte value (lowercase and uppercase)
+HEX_DIGITS = np.array([list(f"{b:02x}".encode()) for b in range(256)], dtype=np.uint8)
+HEX_DIGITS_UPPER = np.array([list(f"{b:02X}".encode()) for b in range(256)], dtype=np.uint8)
+
+# Number of matrix elements formatted at once
+FORMAT_BLOCK_SIZE = 1 << 18
+
+# Data formats of the matrices:
+# - text: C array initializers;
+# - blob: raw little-endian binary files, linked with '.incbin' (the header
+#   only declares the arrays), which are much faster to compile.
+DATA_FORMATS = ['text', 'blob']
+
+# Compression of the matrices (decompressed at run time by the cdata driver,
+# see sw/external/lib/drivers/cdata/cdata.h):
+# - none: plain arrays;
+# - rle: run-length encoding of the elements, by independent blocks of
+#   COMPRESSION_BLOCK_SIZE bytes, each stored raw if it does not compress.
+COMPRESSIONS = ['none', 'rle']
+
+# Uncompressed size of the compressed blocks, in bytes (a multiple of 4, at
+# most 65535, see cdata_block_t)
+COMPRESSION_BLOCK_SIZE = 4096
+
+# RLE control bytes: c < RLE_RUN is followed by c + 1 literal elements, c >=
+# RLE_RUN by one element repeated c - RLE_RUN + RLE_MIN_RUN times
+RLE_RUN = 0x80
+RLE_MIN_RUN = 3
+RLE_MAX_RUN = 0xff - RLE_RUN + RLE_MIN_RUN
+RLE_MAX_LITERAL = RLE_RUN
+
+# Suffix of the cache file written next to a header (see check_cache)
+CACHE_SUFFIX = '.cache'
+
+# SHA-256 of a file
+def file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
 class CFileGen:
     """
     A class for generating C code files containing binary data, matrices, and code.
@@ -18,9 +63,23 @@ class CFileGen:
         macros_hex (List[Tuple[str, str, Optional[str]]]): A list of string macros to include in the generated C file (e.g., hex values).
         macros_raw (List[Tuple[str, str, Optional[str]]]): A list of macros in raw format to include in the generated C file.
         attributes (List[str]): A list of C attributes to apply to the generated C arrays.
+        data_format (str): Format of the matrices (see DATA_FORMATS), by default the DATA_FORMAT environment variable, or 'text'.
+        compression (str): Compression of the input and output matrices (see COMPRESSIONS).
+        blob_prefix (Optional[str]): Path prefix of the binary blobs, set from the header path by write_header and append_header.
+        cache_key (Optional[str]): Key of the generation parameters, set by check_cache and recorded by write_header.
+        written_files (Dict[str, str]): SHA-256 of the files written so far (header and blobs), by path.
     """
     
-    def __init__(self) -> None:
+    def __init__(self, data_format: str = None, compression: str = 'none') -> None:
+        self.data_format = data_format if data_format is not None else os.environ.get('DATA_FORMAT', 'text')
+        if self.data_format not in DATA_FORMATS:
+            raise ValueError(f"invalid data format '{self.data_format}' (expected one of: {', '.join(DATA_FORMATS)})")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"invalid compression '{compression}' (expected one of: {', '.join(COMPRESSIONS)})")
+        self.compression = compression
+        self.blob_prefix = None
+        self.cache_key = None
+        self.written_files = {}
         self.binaries = []
         self.codes = []
         self.input_matrices = []
@@ -87,29 +146,27 @@ class CFileGen:
             'uint32': 'uint32_t',
         }[str(dtype)]
         
+    # Format binary file content as C array, one chunk at a time
+    def iter_binary(self, name: str, file: str):
+        yield f"uint32_t {name}[] = {{\n"
+        with open(file, 'rb') as f:
+            # Write C data content (one little-endian word per line)
+            content = f.read(FORMAT_BLOCK_SIZE * 4)
+            while content:
+                next_content = f.read(FORMAT_BLOCK_SIZE * 4)
+                if (len(content) % 4) != 0:
+                    # pad with zeros (last chunk only)
+                    content += b'\x00' * (4 - (len(content) % 4))
+                words = np.frombuffer(content, dtype='<u4').reshape(-1, 1)
+                yield from self.format_hex_rows(words, upper=True)
+                if next_content:
+                    yield ",\n"
+                content = next_content
+        yield "\n};\n"
+
     # Format binary file content as C array
     def format_binary(self, name: str, file: str) -> str:
-        # Read binary file
-        with open(file, 'rb') as f:
-            content = f.read()
-
-        # Determine the length of the data
-        data_size = len(content)
-        data_len = data_size // 4
-        if (data_size % 4) != 0:
-            # pad with zeros
-            content += b'\x00' * (4 - (data_size % 4))
-            data_len += 1
-
-        # Write C data content
-        array_contents = f"uint32_t {name}[] = {{\n"
-        for i in range(data_len):
-            element = int.from_bytes(content[i * 4 : (i + 1) * 4], byteorder='little')
-            array_contents += f"    0x{element:08X}"
-            if i != data_len - 1:
-                array_contents += ",\n"
-        array_contents += "\n};\n"
-        return array_contents
+        return ''.join(self.iter_binary(name, file))
         
     # Format matrix size macros
     def format_matrix_size(self, matrix: np.ndarray, name: str) -> str:
@@ -123,34 +180,142 @@ class CFileGen:
         size_contents = f"#define {name.upper()}_SIZE {len(code)*4}\n"
         return size_contents
 
-    # Format matrix for C
-    def format_matrix(self, matrix: np.ndarray, name: str) -> str:
-        # Determine the number of bits based on the dtype
+    # Format the rows of an unsigned matrix as hexadecimal C initializers, one
+    # block of rows at a time: rows are indented by four spaces and separated
+    # by ',\n', and elements are zero-padded hex literals separated by ', '.
+    # The digits of a whole block are produced at once by indexing a lookup
+    # table with the big-endian bytes of the elements.
+    def format_hex_rows(self, matrix: np.ndarray, upper: bool = False):
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        num_rows, num_cols = matrix.shape
+        num_bytes = matrix.dtype.itemsize
+        digits = HEX_DIGITS_UPPER if upper else HEX_DIGITS
+        cell_width = 2 + 2 * num_bytes + 2     # '0x', digits, ', '
+        line_width = 4 + num_cols * cell_width
+        block_rows = max(1, FORMAT_BLOCK_SIZE // max(1, num_cols))
+
+        for start in range(0, num_rows, block_rows):
+            block = matrix[start:start + block_rows]
+            rows = block.shape[0]
+
+            # Big-endian bytes of each element, then two digits per byte
+            be_bytes = np.ascontiguousarray(block, dtype=block.dtype.newbyteorder('>')).view(np.uint8)
+            hex_digits = digits[be_bytes.reshape(rows, num_cols, num_bytes)].reshape(rows, num_cols, 2 * num_bytes)
+
+            # Lay out the cells of each line
+            cells = np.empty((rows, num_cols, cell_width), dtype=np.uint8)
+            cells[:, :, 0:2] = np.frombuffer(b'0x', dtype=np.uint8)
+            cells[:, :, 2:2 + 2 * num_bytes] = hex_digits
+            cells[:, :, -2:] = np.frombuffer(b', ', dtype=np.uint8)
+            # The separator of the last cell of a line ends the line
+            cells[:, -1, -1] = ord('\n')
+            lines = np.empty((rows, line_width), dtype=np.uint8)
+            lines[:, :4] = ord(' ')
+            lines[:, 4:] = cells.reshape(rows, -1)
+
+            text = lines.tobytes()
+            if start + rows >= num_rows:
+                # No separator after the last row
+                text = text[:-2]
+            yield text.decode('ascii')
+
+    # Format matrix for C, one chunk at a time
+    def iter_matrix(self, matrix: np.ndarray, name: str):
+        # Determine the C and the unsigned types based on the dtype
         dtype: np.dtype = matrix.dtype
-        num_bits = dtype.itemsize * 8
-        
         array_ctype = self.dtype_to_ctype(dtype)
         utype = self.signed2unsigned(dtype)
-        matrix = matrix.astype(utype)
 
-        # Convert the signed array to 2's complement hexadecimal values
-        rows = []
-        for row in matrix:
-            hex_values = [f"{element:#0{2+num_bits//4}x}" for element in row]
-            rows.append(hex_values)
+        # Reinterpret the signed array as 2's complement values (no copy)
+        matrix = matrix.view(utype)
 
         # Format the matrix
-        matrix_contents = f"{array_ctype} {name} [] "
+        declaration = f"{array_ctype} {name} [] "
         if len(self.attributes) > 0:
-            matrix_contents += f"__attribute__(({','.join(self.attributes)})) "
-        matrix_contents += '= {\n'
-        if len(rows) > 1:
-            matrix_contents += ',\n'.join([f"    {', '.join(row)}" for row in rows])
-        else:
-            matrix_contents += f"    {', '.join(rows[0])}"
-        matrix_contents += '\n};\n\n'
-
-        return matrix_contents
+            declaration += f"__attribute__(({','.join(self.attributes)})) "
+        yield declaration + '= {\n'
+        yield from self.format_hex_rows(matrix)
+        yield '\n};\n\n'
+
+    # Linker section and alignment of the arrays, from their attributes
+    def get_section(self, matrix: np.ndarray) -> tuple:
+        section = '.data'
+        align = max(4, matrix.dtype.itemsize)
+        for attribute in self.attributes:
+            m = re.fullmatch(r'\s*section\s*\(\s*"([^"]+)"\s*\)\s*', attribute)
+            if m is not None:
+                section = m.group(1)
+            m = re.fullmatch(r'\s*aligned\s*\(\s*(\d+)\s*\)\s*', attribute)
+            if m is not None:
+                align = max(align, int(m.group(1)))
+        return section, align
+
+    # Write chunks of text or bytes to a file and return the SHA-256 of its
+    # content. The content is written to a temporary file first, and the
+    # existing file (and its modification time) is left untouched if the
+    # content did not change, so that the sources including it are not rebuilt.
+    def write_if_changed(self, path: str, chunks) -> str:
+        hasher = hashlib.sha256()
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    hasher.update(chunk)
+                    f.write(chunk)
+            digest = hasher.hexdigest()
+            if os.path.isfile(path) and os.path.getsize(path) == os.path.getsize(tmp_path) and file_sha256(path) == digest:
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.written_files[path] = digest
+        return digest
+
+    # Little-endian bytes of a matrix, one block of rows at a time
+    def iter_blob(self, matrix: np.ndarray):
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        le_dtype = matrix.dtype.newbyteorder('<')
+        block_rows = max(1, FORMAT_BLOCK_SIZE // max(1, matrix.shape[1]))
+        for start in range(0, matrix.shape[0], block_rows):
+            yield np.ascontiguousarray(matrix[start:start + block_rows], dtype=le_dtype).tobytes()
+
+    # Write a matrix as a raw little-endian binary blob and return its SHA-256
+    def write_blob(self, matrix: np.ndarray, blob_file: str) -> str:
+        return self.write_if_changed(blob_file, self.iter_blob(matrix))
+
+    # Declare a matrix stored in a binary blob, one chunk at a time
+    def iter_matrix_blob(self, matrix: np.ndarray, name: str):
+        if self.blob_prefix is None:
+            raise ValueError("the 'blob' data format needs the header path (use write_header or append_header)")
+        array_ctype = self.dtype_to_ctype(matrix.dtype)
+        blob_file = os.path.abspath(f"{self.blob_prefix}_{name}.bin")
+        blob_hash = self.write_blob(matrix, blob_file)
+        section, align = self.get_section(matrix)
+
+        # The hash makes the header change with the data, so that the
+        # sources including it are rebuilt
+        yield f"// {os.path.basename(blob_file)}: {matrix.size * matrix.itemsize} bytes, sha256 {blob_hash}\n"
+        yield f"extern {array_ctype} {name} [];\n"
+        yield '__asm__(\n'
+        yield f'    "    .pushsection {section}, \\"aw\\", @progbits\\n"\n'
+        yield f'    "    .balign {align}\\n"\n'
+        yield f'    "    .global {name}\\n"\n'
+        yield f'    "    .type {name}, @object\\n"\n'
+        yield f'    "{name}:\\n"\n'
+        yield f'    "    .incbin \\"{blob_file}\\"\\n"\n'
+        yield f'    "    .size {name}, . - {name}\\n"\n'
+        yield f'    "    .popsection\\n"\n'
+        yield ');\n\n'
+
+    # Format matrix for C
+    def format_matrix(self, matrix: np.ndarray, name: str) -> str:
+        return ''.join(self.iter_matrix(matrix, name))
     
     def format_code(self, code: str, name: str) -> str:
         # Format the array
@@ -167,107 +332,234 @@ class CFileGen:
         code_contents += "\n};\n"
         return code_contents
 
-    # Write the header file
-    def gen_header(self, header_macro: str = None) -> str:
+    # Define a matrix in the selected data format, one chunk at a time
+    def iter_matrix_data(self, matrix: np.ndarray, name: str):
+        if self.data_format == 'blob':
+            return self.iter_matrix_blob(matrix, name)
+        return self.iter_matrix(matrix, name)
+
+    # Run-length encode the elements of a 1-D unsigned array (see RLE_RUN)
+    def rle_encode(self, elems: np.ndarray) -> bytes:
+        num_elems = elems.size
+        # Runs of equal elements long enough to be encoded as runs
+        starts = np.flatnonzero(np.concatenate(([True], elems[1:] != elems[:-1])))
+        lengths = np.diff(np.append(starts, num_elems))
+        long_runs = lengths >= RLE_MIN_RUN
+        chunks = []
+
+        # Literal elements between the long runs, by groups of RLE_MAX_LITERAL
+        def add_literals(begin: int, end: int):
+            for i in range(begin, end, RLE_MAX_LITERAL):
+                count = min(RLE_MAX_LITERAL, end - i)
+                chunks.append(bytes([count - 1]))
+                chunks.append(elems[i:i + count].tobytes())
+
+        pos = 0
+        for start, length in zip(starts[long_runs], lengths[long_runs]):
+            add_literals(pos, start)
+            value = elems[start:start + 1].tobytes()
+            while length >= RLE_MIN_RUN:
+                count = min(RLE_MAX_RUN, length)
+                chunks.append(bytes([RLE_RUN + count - RLE_MIN_RUN]))
+                chunks.append(value)
+                start += count
+                length -= count
+            # The tail of the run shorter than RLE_MIN_RUN is left as literals
+            pos = start
+        add_literals(pos, num_elems)
+        return b''.join(chunks)
+
+    # Compress a matrix by blocks of COMPRESSION_BLOCK_SIZE bytes. Return the
+    # compressed stream, and the offset, size, and method of each block. Blocks
+    # start at 4-byte aligned offsets, and are stored raw if they do not compress.
+    def compress_matrix(self, matrix: np.ndarray) -> tuple:
+        utype = np.dtype(self.signed2unsigned(matrix.dtype)).newbyteorder('<')
+        elems = np.ascontiguousarray(matrix, dtype=matrix.dtype.newbyteorder('<')).reshape(-1).view(utype)
+        block_elems = COMPRESSION_BLOCK_SIZE // matrix.itemsize
+        chunks = []
+        blocks = []
+        offset = 0
+        for start in range(0, elems.size, block_elems):
+            block = elems[start:start + block_elems]
+            raw = block.tobytes()
+            data = self.rle_encode(block)
+            method = 'CDATA_RLE'
+            if len(data) >= len(raw):
+                data, method = raw, 'CDATA_RAW'
+            blocks.append((offset, len(data), method))
+            padding = -len(data) % 4
+            chunks += [data, b'\x00' * padding]
+            offset += len(data) + padding
+        return b''.join(chunks), blocks
+
+    # Define a compressed matrix, one chunk at a time: the compressed stream
+    # (an array in the data format, with the attributes of the matrices), the
+    # table of its blocks, and its cdata_t descriptor, '<name>_cdata'
+    def iter_matrix_compressed(self, matrix: np.ndarray, name: str):
+        stream, blocks = self.compress_matrix(matrix)
+        size = matrix.size * matrix.itemsize
+        yield f"// {name}: {size} bytes in {len(blocks)} blocks, compressed to {len(stream)} bytes ({100 * len(stream) / max(1, size):.1f}%)\n"
+        yield f"#define {name.upper()}_CSIZE {len(stream)}\n"
+        yield from self.iter_matrix_data(np.frombuffer(stream, dtype='<i4').reshape(1, -1), f"{name}_cstream")
+        yield f"const cdata_block_t {name}_cblocks [] = {{\n"
+        yield ''.join(f"    {{0x{offset:08x}, {size}, {method}}},\n" for offset, size, method in blocks)
+        yield "};\n"
+        yield f"const cdata_t {name}_cdata = {{(const uint8_t *) {name}_cstream, {name}_cblocks, {len(blocks)}, CDATA_BLOCK_SIZE, {size}, {matrix.itemsize}}};\n\n"
+
+    # Define an input or output matrix, compressed if enabled
+    def iter_matrix_def(self, matrix: np.ndarray, name: str):
+        if self.compression != 'none':
+            return self.iter_matrix_compressed(matrix, name)
+        return self.iter_matrix_data(matrix, name)
+
+    # Generate the header file, one chunk at a time: arrays are formatted by
+    # blocks of rows, so the memory used does not depend on their size
+    def iter_header(self, header_macro: str = None):
         if header_macro is not None:
             # Header guard
-            header_contents = f'#ifndef {header_macro}\n#define {header_macro}\n\n'    
+            yield f'#ifndef {header_macro}\n#define {header_macro}\n\n'
             # Include stdint.h
-            header_contents += "#include <stdint.h>\n\n"
+            yield "#include <stdint.h>\n\n"
+
+        # Compressed matrices
+        if self.compression != 'none' and (len(self.input_matrices) > 0 or len(self.output_matrices) > 0):
+            yield "// Compressed matrices (see cdata.h)\n"
+            yield "// ---------------------------------\n"
+            yield '#include "cdata.h"\n'
+            yield "#define DATA_COMPRESSED 1\n"
+            yield f"#define CDATA_BLOCK_SIZE {COMPRESSION_BLOCK_SIZE}\n\n"
 
         # Macros
         if len(self.macros) > 0 or len(self.macros_hex) > 0 or len(self.macros_raw) > 0:
-            header_contents += "// Macros\n"
-            header_contents += "// ------\n"
+            yield "// Macros\n"
+            yield "// ------\n"
         for name, value, comment in self.macros:
-            header_contents += f"#define {name.upper()} {value}"
+            yield f"#define {name.upper()} {value}"
             if comment is not None:
-                header_contents += f" // {comment}\n"
+                yield f" // {comment}\n"
             else:
-                header_contents += '\n'
+                yield '\n'
         for name, value, comment in self.macros_hex:
-            header_contents += f"#define {name.upper()} 0x{value:08X}"
+            yield f"#define {name.upper()} 0x{value:08X}"
             if comment is not None:
-                header_contents += f" // {comment}\n"
+                yield f" // {comment}\n"
             else:
-                header_contents += '\n'
+                yield '\n'
         for name, value, comment in self.macros_raw:
-            header_contents += f"#define {name} {value}"
+            yield f"#define {name} {value}"
             if comment is not None:
                 # Check if the comment starts with // or /*
                 if comment.startswith('//') or comment.startswith('/*'):
-                    header_contents += f" {comment}\n"
+                    yield f" {comment}\n"
                 else:
-                    header_contents += f" // {comment}\n"
+                    yield f" // {comment}\n"
             else:
-                header_contents += '\n'
+                yield '\n'
         if len(self.macros) > 0 or len(self.macros_hex) > 0 or len(self.macros_raw) > 0:
-            header_contents += '\n'
+            yield '\n'
 
         # Macros with array sizes
         if len(self.binaries) > 0:
-            header_contents += "// Binary size\n"
-            header_contents += "// -----------\n"
+            yield "// Binary size\n"
+            yield "// -----------\n"
             for name, file in self.binaries:
                 file_size = os.path.getsize(file)
                 if file_size % 4 != 0:
                     file_size += 4 - (file_size % 4)
-                header_contents += f"#define {name.upper()}_SIZE {file_size}\n"
-            header_contents += '\n'
+                yield f"#define {name.upper()}_SIZE {file_size}\n"
+            yield '\n'
 
         if len(self.input_matrices) > 0:
-            header_contents += "// Input matrix size\n"
+            yield "// Input matrix size\n"
             for name, matrix in self.input_matrices:
-                header_contents += self.format_matrix_size(matrix, name)
-            header_contents += '\n'
+                yield self.format_matrix_size(matrix, name)
+            yield '\n'
 
         if len(self.output_matrices) > 0:
-            header_contents += '// Output matrix size\n'
+            yield '// Output matrix size\n'
             for name, matrix in self.output_matrices:
-                header_contents += self.format_matrix_size(matrix, name)
-            header_contents += '\n'
+                yield self.format_matrix_size(matrix, name)
+            yield '\n'
 
         if len(self.codes) > 0:
-            header_contents += '// Code size\n'
+            yield '// Code size\n'
             for name, code in self.codes:
-                header_contents += self.format_code_size(code, name)
-            header_contents += '\n'
+                yield self.format_code_size(code, name)
+            yield '\n'
 
         # Write binary files
         if len(self.binaries) > 0:
-            header_contents += "// Binary files\n"
-            header_contents += "// ------------\n"
+            yield "// Binary files\n"
+            yield "// ------------\n"
             for name, file in self.binaries:
-                header_contents += self.format_binary(name, file)
-            header_contents += '\n'
+                yield from self.iter_binary(name, file)
+            yield '\n'
 
         # Write code arrays
         if len(self.codes) > 0:
-            header_contents += "// Code\n"
-            header_contents += "// ----\n"
+            yield "// Code\n"
+            yield "// ----\n"
             for name, code in self.codes:
-                header_contents += self.format_code(code, name)
-            header_contents += '\n'
+                yield self.format_code(code, name)
+            yield '\n'
 
         # Write input matrices
         if len(self.input_matrices) > 0:
-            header_contents += "// Input matrices\n"
-            header_contents += "// --------------\n"
+            yield "// Input matrices\n"
+            yield "// --------------\n"
             for name, matrix in self.input_matrices:
-                header_contents += self.format_matrix(matrix, name)
+                yield from self.iter_matrix_def(matrix, name)
 
         # Write output matrices
         if len(self.output_matrices) > 0:
-            header_contents += "// Output matrices\n"
-            header_contents += "// ---------------\n"
+            yield "// Output matrices\n"
+            yield "// ---------------\n"
             for name, matrix in self.output_matrices:
-                header_contents += self.format_matrix(matrix, name)
+                yield from self.iter_matrix_def(matrix, name)
 
         if header_macro is not None:
-            header_contents += f"#endif // {header_macro}\n"
+            yield f"#endif // {header_macro}\n"
 
-        # Return the header contents
-        return header_contents
+    # Generate the header file
+    def gen_header(self, header_macro: str = None) -> str:
+        return ''.join(self.iter_header(header_macro))
+
+    # Write the header to a file object as it is generated
+    def emit_header(self, file, header_macro: str = None) -> None:
+        for chunk in self.iter_header(header_macro):
+            file.write(chunk)
+
+    # Check the parameter-keyed cache of a header. The key is computed from
+    # 'params' (e.g., the command line arguments of datagen), the data format,
+    # and the content of this file, of the running script, and of 'sources'.
+    # Return True if the header and its blobs were generated with the same key
+    # and were not modified since: the caller can then skip the generation of
+    # the data. Otherwise, write_header records the key with the new header.
+    # The cache is disabled by setting the DATAGEN_CACHE environment variable
+    # to 0.
+    def check_cache(self, directory: str, file_name: str, params: dict, sources: list = None) -> bool:
+        if os.environ.get('DATAGEN_CACHE', '1') == '0':
+            return False
+        hasher = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode())
+        hasher.update(self.data_format.encode())
+        main_file = getattr(sys.modules['__main__'], '__file__', None)
+        for source in [__file__] + ([main_file] if main_file is not None else []) + (sources or []):
+            hasher.update(file_sha256(source).encode())
+        self.cache_key = hasher.hexdigest()
+
+        # Compare with the key and the files recorded with the header
+        try:
+            with open(os.path.join(directory, file_name) + CACHE_SUFFIX, 'r') as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return False
+        if cache.get('key') != self.cache_key or file_name not in cache.get('files', {}):
+            return False
+        for name, digest in cache['files'].items():
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path) or file_sha256(path) != digest:
+                return False
+        return True
 
     def write_header(self, directory: str, file_name: str) -> None:
         # Header file path
@@ -275,19 +567,23 @@ class CFileGen:
         header_base = os.path.basename(header_path)
         header_macro = header_base.upper().replace('.', '_') + '_'
 
-        # Generate header
-        header_contents = self.gen_header(header_macro)
+        # Write header file (binary blobs are stored next to it), unless it
+        # did not change
+        self.blob_prefix = os.path.splitext(header_path)[0]
+        self.written_files = {}
+        self.write_if_changed(header_path, self.iter_header(header_macro))
 
-        # Write header file
-        with open(header_path, 'w') as header_file:
-            header_file.write(header_contents)
+        # Record the cache key with the hash of the files
+        if self.cache_key is not None:
+            files = {os.path.relpath(path, directory): digest for path, digest in self.written_files.items()}
+            with open(header_path + CACHE_SUFFIX, 'w') as cache_file:
+                json.dump({'key': self.cache_key, 'files': files}, cache_file, indent=2)
 
     def append_header(self, file, header_macro: str = None):
-        # Generate header
-        header_contents = self.gen_header(header_macro)
-
-        # Write header file
-        file.write(header_contents)
+        # Write header file (binary blobs are stored next to it)
+        if self.blob_prefix is None and hasattr(file, 'name'):
+            self.blob_prefix = os.path.splitext(file.name)[0]
+        self.emit_header(file, header_macro)
 
 if __name__ == "__main__":
     # Check the number of arguments
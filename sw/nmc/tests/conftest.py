@@ -0,0 +1,16 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: conftest.py
+# Date: 17/10/2026
+# Description: Common setup of the tests of the NMC data generation helpers
+
+# Usage (from the repository root):
+#   python3 -m pytest sw/nmc/tests
+
+import os
+import sys
+
+# The helpers are imported by name by the application datagen.py scripts
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
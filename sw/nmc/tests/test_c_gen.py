@@ -0,0 +1,205 @@
+# Copyright 2023 EPFL and Politecnico di Torino.
+# Solderpad Hardware License, Version 2.1, see LICENSE.md for details.
+# SPDX-License-Identifier: Apache-2.0 WITH SHL-2.1
+#
+# File: test_c_gen.py
+# Date: 17/10/2026
+# Description: Tests of the C header generator
+
+import os
+import re
+import numpy as np
+import pytest
+import c_gen
+from c_gen import CFileGen
+
+DTYPES = [np.int8, np.int16, np.int32]
+
+# Per-element formatter of the matrices (format_matrix before the
+# vectorised formatting), as reference
+def ref_format_matrix(gen: CFileGen, matrix: np.ndarray, name: str) -> str:
+    num_bits = matrix.dtype.itemsize * 8
+    array_ctype = gen.dtype_to_ctype(matrix.dtype)
+    matrix = matrix.astype(gen.signed2unsigned(matrix.dtype))
+    rows = [[f"{element:#0{2+num_bits//4}x}" for element in row] for row in matrix]
+    contents = f"{array_ctype} {name} [] "
+    if len(gen.attributes) > 0:
+        contents += f"__attribute__(({','.join(gen.attributes)})) "
+    contents += '= {\n'
+    contents += ',\n'.join([f"    {', '.join(row)}" for row in rows])
+    contents += '\n};\n\n'
+    return contents
+
+# Per-word formatter of the binary files (format_binary before the
+# vectorised formatting), as reference
+def ref_format_binary(name: str, file: str) -> str:
+    with open(file, 'rb') as f:
+        content = f.read()
+    data_len = len(content) // 4
+    if len(content) % 4 != 0:
+        content += b'\x00' * (4 - (len(content) % 4))
+        data_len += 1
+    contents = f"uint32_t {name}[] = {{\n"
+    for i in range(data_len):
+        element = int.from_bytes(content[i * 4 : (i + 1) * 4], byteorder='little')
+        contents += f"    0x{element:08X}"
+        if i != data_len - 1:
+            contents += ",\n"
+    contents += "\n};\n"
+    return contents
+
+# Random matrix covering the whole range of a data type
+def random_matrix(dtype, shape, seed: int = 0) -> np.ndarray:
+    info = np.iinfo(dtype)
+    return np.random.default_rng(seed).integers(info.min, info.max, size=shape, endpoint=True, dtype=dtype)
+
+@pytest.mark.parametrize("dtype", DTYPES)
+@pytest.mark.parametrize("shape", [(1, 1), (1, 17), (9, 1), (8, 33)])
+def test_format_matrix(dtype, shape):
+    gen = CFileGen(data_format='text')
+    matrix = random_matrix(dtype, shape)
+    assert gen.format_matrix(matrix, "A") == ref_format_matrix(gen, matrix, "A")
+
+@pytest.mark.parametrize("dtype", [np.int8, np.int32])
+def test_format_matrix_extremes(dtype):
+    gen = CFileGen(data_format='text')
+    info = np.iinfo(dtype)
+    matrix = np.array([[info.min, -1, 0], [1, info.max, info.min + 1]], dtype=dtype)
+    assert gen.format_matrix(matrix, "A") == ref_format_matrix(gen, matrix, "A")
+
+@pytest.mark.parametrize("shape", [(1, 10), (7, 3), (20, 2)])
+def test_format_matrix_blocks(monkeypatch, shape):
+    # Rows split across several formatting blocks
+    monkeypatch.setattr(c_gen, "FORMAT_BLOCK_SIZE", 4)
+    gen = CFileGen(data_format='text')
+    matrix = random_matrix(np.int16, shape)
+    assert gen.format_matrix(matrix, "A") == ref_format_matrix(gen, matrix, "A")
+
+def test_format_matrix_attributes():
+    gen = CFileGen(data_format='text')
+    gen.add_attribute('section(".xheep_data_interleaved")')
+    gen.add_attribute('aligned(4)')
+    matrix = random_matrix(np.int8, (4, 4))
+    assert gen.format_matrix(matrix, "R") == ref_format_matrix(gen, matrix, "R")
+
+def test_format_hex_rows_1d():
+    gen = CFileGen(data_format='text')
+    matrix = random_matrix(np.int16, (12,)).view(np.uint16)
+    assert ''.join(gen.format_hex_rows(matrix)) == ''.join(gen.format_hex_rows(matrix.reshape(1, -1)))
+
+@pytest.mark.parametrize("size", [0, 1, 4, 6, 64, 70])
+@pytest.mark.parametrize("block_size", [2, 1 << 18])
+def test_format_binary(tmp_path, monkeypatch, size, block_size):
+    monkeypatch.setattr(c_gen, "FORMAT_BLOCK_SIZE", block_size)
+    file = tmp_path / "code.bin"
+    file.write_bytes(np.random.default_rng(size).integers(0, 256, size=size, dtype=np.uint8).tobytes())
+    assert CFileGen(data_format='text').format_binary("code", str(file)) == ref_format_binary("code", str(file))
+
+# Decoder of the compressed blocks, as cdata_decompress_block() in
+# sw/external/lib/drivers/cdata/cdata.c
+def ref_decompress_block(src: bytes, method: str, elem_size: int, dst_size: int) -> bytes:
+    if method == 'CDATA_RAW':
+        assert len(src) == dst_size
+        return src
+    assert method == 'CDATA_RLE'
+    dst = bytearray()
+    pos = 0
+    while len(dst) < dst_size:
+        assert pos < len(src), "truncated block"
+        ctrl = src[pos]
+        pos += 1
+        if ctrl < c_gen.RLE_RUN:
+            length = (ctrl + 1) * elem_size
+            assert length <= len(src) - pos and length <= dst_size - len(dst), "corrupt literals"
+            dst += src[pos:pos + length]
+            pos += length
+        else:
+            count = ctrl - c_gen.RLE_RUN + c_gen.RLE_MIN_RUN
+            assert elem_size <= len(src) - pos and count * elem_size <= dst_size - len(dst), "corrupt run"
+            dst += src[pos:pos + elem_size] * count
+            pos += elem_size
+    return bytes(dst)
+
+# Decompress a whole matrix, as cdata_load()
+def ref_load(stream: bytes, blocks: list, size: int, elem_size: int) -> bytes:
+    block_size = c_gen.COMPRESSION_BLOCK_SIZE
+    assert len(blocks) == -(-size // block_size)
+    out = b''
+    for i, (offset, csize, method) in enumerate(blocks):
+        out += ref_decompress_block(stream[offset:offset + csize], method, elem_size, min(block_size, size - i * block_size))
+    return out
+
+# Matrices with runs of every length, literal stretches, and random data
+def rle_patterns(dtype) -> list:
+    rng = np.random.default_rng(1)
+    info = np.iinfo(dtype)
+    runs = np.repeat(np.arange(1, 300) % 7 - 3, np.arange(1, 300)).astype(dtype)
+    return [
+        np.zeros((1, 1), dtype=dtype),
+        np.zeros((64, 100), dtype=dtype),
+        np.full((3, 5000), info.min, dtype=dtype),
+        runs.reshape(1, -1),
+        np.arange(5000).astype(dtype).reshape(50, 100),
+        rng.integers(info.min, info.max, size=(40, 300), endpoint=True, dtype=dtype),
+        np.where(rng.random((30, 211)) < 0.8, 0, rng.integers(info.min, info.max, size=(30, 211), dtype=dtype)).astype(dtype),
+    ]
+
+def test_rle_constants_match_driver():
+    with open(os.path.join(os.path.dirname(__file__), '..', '..', 'external', 'lib', 'drivers', 'cdata', 'cdata.h')) as f:
+        header = f.read()
+    assert int(re.search(r'#define CDATA_RLE_RUN\s+(\w+)', header).group(1), 0) == c_gen.RLE_RUN
+    assert int(re.search(r'#define CDATA_RLE_MIN_RUN\s+(\w+)', header).group(1), 0) == c_gen.RLE_MIN_RUN
+    assert re.search(r'CDATA_RAW = 0,\s*CDATA_RLE = 1,', header) is not None
+    assert c_gen.COMPRESSION_BLOCK_SIZE % 4 == 0 and c_gen.COMPRESSION_BLOCK_SIZE <= 0xffff
+
+def test_rle_encode():
+    gen = CFileGen(data_format='text')
+    def encode(values):
+        return gen.rle_encode(np.array(values, dtype=np.uint8))
+    assert encode([5, 5, 5]) == bytes([c_gen.RLE_RUN, 5])
+    assert encode([1, 2]) == bytes([1, 1, 2])
+    # Runs shorter than RLE_MIN_RUN are literals
+    assert encode([1, 1, 2]) == bytes([2, 1, 1, 2])
+    assert encode([7] * c_gen.RLE_MAX_RUN) == bytes([0xff, 7])
+    # The tail of a long run shorter than RLE_MIN_RUN is a literal
+    assert encode([7] * (c_gen.RLE_MAX_RUN + 1)) == bytes([0xff, 7, 0, 7])
+    assert encode([7] * (c_gen.RLE_MAX_RUN + c_gen.RLE_MIN_RUN)) == bytes([0xff, 7, c_gen.RLE_RUN, 7])
+    # Literal groups of at most RLE_MAX_LITERAL elements
+    literals = list(range(c_gen.RLE_MAX_LITERAL + 1))
+    assert encode(literals) == bytes([c_gen.RLE_MAX_LITERAL - 1] + literals[:-1] + [0, literals[-1]])
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_rle_round_trip(dtype):
+    gen = CFileGen(data_format='text', compression='rle')
+    for matrix in rle_patterns(dtype):
+        stream, blocks = gen.compress_matrix(matrix)
+        size = matrix.size * matrix.itemsize
+        assert ref_load(stream, blocks, size, matrix.itemsize) == matrix.astype(matrix.dtype.newbyteorder('<')).tobytes()
+
+        # Blocks start at increasing 4-byte aligned offsets, and are stored
+        # raw when they do not compress
+        offsets = [offset for offset, _, _ in blocks]
+        assert offsets == sorted(offsets) and all(offset % 4 == 0 for offset in offsets)
+        assert len(stream) % 4 == 0
+        for i, (_, csize, method) in enumerate(blocks):
+            block_size = min(c_gen.COMPRESSION_BLOCK_SIZE, size - i * c_gen.COMPRESSION_BLOCK_SIZE)
+            assert csize < block_size if method == 'CDATA_RLE' else csize == block_size
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_rle_methods(dtype):
+    gen = CFileGen(data_format='text', compression='rle')
+    _, blocks = gen.compress_matrix(np.zeros((64, 100), dtype=dtype))
+    assert {method for _, _, method in blocks} == {'CDATA_RLE'}
+    info = np.iinfo(dtype)
+    _, blocks = gen.compress_matrix(np.random.default_rng(0).integers(info.min, info.max, size=(40, 300), dtype=dtype))
+    assert {method for _, _, method in blocks} == {'CDATA_RAW'}
+
+def test_compressed_matrix_definition():
+    gen = CFileGen(data_format='text', compression='rle')
+    matrix = np.zeros((16, 600), dtype=np.int16)
+    stream, blocks = gen.compress_matrix(matrix)
+    text = ''.join(gen.iter_matrix_def(matrix, "A"))
+    assert f"#define A_CSIZE {len(stream)}\n" in text
+    assert "int32_t A_cstream [] = {\n" in text
+    assert text.count("CDATA_RLE}") == len(blocks)
+    assert f"const cdata_t A_cdata = {{(const uint8_t *) A_cstream, A_cblocks, {len(blocks)}, CDATA_BLOCK_SIZE, {matrix.size * 2}, 2}};\n" in text